@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Certification, CertificationType
+from .models import Certification, CertificationType, OfficerQueueDepth
 
 
 @admin.register(CertificationType)
@@ -31,3 +31,13 @@ class CertificationAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+@admin.register(OfficerQueueDepth)
+class OfficerQueueDepthAdmin(admin.ModelAdmin):
+    list_display = ('officer', 'queue', 'depth', 'updated_at')
+    list_filter = ('queue',)
+    readonly_fields = ('officer', 'queue', 'depth', 'updated_at')
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,121 @@
+"""
+Bulk certificate export as a streamed ZIP.
+
+Approved certificates are read in issue-date order with ``.iterator()`` and
+handled in windows of ``EXPORT_WINDOW``:
+
+* a stored PDF whose hash still matches (see ``pdf.pdf_is_current``) is
+  copied into the archive as is;
+* missing or stale PDFs are rendered on a process pool (ReportLab is CPU
+  bound, so threads would serialize on the GIL) from plain field snapshots,
+  then stored back so the next export or download reuses them.
+
+Entries are written with ``ZIP_STORED`` (PDFs are already compressed) into
+an in-memory sink that is drained after every entry, so memory stays at
+about one window of PDFs regardless of how many certificates match.
+Set CERTIFICATE_EXPORT_WORKERS = 0 to render inside the request process.
+
+A download can run for many minutes when PDFs are missing; gunicorn's
+gthread workers (``gunicorn_config.py``) are not killed by ``timeout``
+while it streams. Selections too large to finish within gunicorn's
+``graceful_timeout`` across a restart are written offline with
+``python manage.py export_certificates``.
+"""
+import logging
+import multiprocessing
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+
+from city_corporation.list_export import ZipSink
+from .models import Certification
+from .pdf import build_certificate_pdf, certificate_fields, fields_hash, store_certificate_pdf, PDF_READY
+
+
+logger = logging.getLogger(__name__)
+
+EXPORT_WINDOW = 32
+
+
+def export_queryset(certification_type=None, date_from=None, date_to=None):
+    """Approved certifications to export, optionally by type and issue-date range."""
+    queryset = Certification.objects.filter(status='approved').select_related('citizen', 'certification_type')
+    if certification_type:
+        queryset = queryset.filter(certification_type=certification_type)
+    if date_from:
+        queryset = queryset.filter(issue_date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(issue_date__lte=date_to)
+    return queryset.order_by('issue_date', 'pk')
+
+
+def archive_name(certification):
+    """File name of a certificate inside the archive."""
+    return 'certificate_%s.pdf' % re.sub(r'[^A-Za-z0-9._-]+', '_', certification.certificate_number)
+
+
+def _windows(queryset, size):
+    window = []
+    for certification in queryset.iterator(chunk_size=size):
+        window.append(certification)
+        if len(window) >= size:
+            yield window
+            window = []
+    if window:
+        yield window
+
+
+def _render_pool(workers):
+    if workers <= 0:
+        return None
+    # spawn: forking a threaded web worker is unsafe
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup
+    )
+
+
+def _read_stored(certification):
+    with certification.pdf_file.open('rb') as stored:
+        return stored.read()
+
+
+def stream_certificate_zip(queryset, workers=None):
+    """Yield the bytes of a ZIP archive holding the PDF of every certificate in ``queryset``."""
+    if workers is None:
+        workers = getattr(settings, 'CERTIFICATE_EXPORT_WORKERS', 2)
+    sink = ZipSink()
+    pool = _render_pool(workers)
+    rendered = reused = 0
+    try:
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+            for window in _windows(queryset, EXPORT_WINDOW):
+                fields = [certificate_fields(certification) for certification in window]
+                hashes = [fields_hash(snapshot) for snapshot in fields]
+                stale = [
+                    index for index, certification in enumerate(window)
+                    if not (certification.pdf_file and certification.pdf_status == PDF_READY
+                            and certification.pdf_hash == hashes[index])
+                ]
+                snapshots = [fields[index] for index in stale]
+                pdfs = dict(zip(stale, pool.map(build_certificate_pdf, snapshots) if pool
+                                else map(build_certificate_pdf, snapshots)))
+
+                for index, certification in enumerate(window):
+                    if index in pdfs:
+                        pdf = pdfs.pop(index)
+                        store_certificate_pdf(certification, pdf, hashes[index])
+                        rendered += 1
+                    else:
+                        pdf = _read_stored(certification)
+                        reused += 1
+                    archive.writestr(archive_name(certification), pdf)
+                    del pdf
+                    yield sink.drain()
+        yield sink.drain()
+        logger.info('Exported %s certificates (%s rendered, %s reused)', rendered + reused, rendered, reused)
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
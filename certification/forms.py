@@ -1,4 +1,6 @@
 from django import forms
+from city_corporation.autocomplete import AutocompleteSelect
+from city_corporation.reference_data import ReferenceChoiceField
 from .models import Certification, CertificationType
 
 
@@ -27,9 +29,10 @@ class CertificationForm(forms.ModelForm):
             'certificate_number', 'citizen', 'certification_type',
             'issue_date', 'expiry_date', 'status', 'remarks'
         ]
+        field_classes = {'certification_type': ReferenceChoiceField}
         widgets = {
-            'certificate_number': forms.TextInput(attrs={'class': 'form-control', 'required': True}),
-            'citizen': forms.Select(attrs={'class': 'form-control', 'required': True}),
+            'certificate_number': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Leave blank to assign automatically'}),
+            'citizen': AutocompleteSelect('citizen:autocomplete', attrs={'class': 'form-control', 'required': True}),
             'certification_type': forms.Select(attrs={'class': 'form-control', 'required': True}),
             'issue_date': forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
             'expiry_date': forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
@@ -41,4 +44,3 @@ class CertificationForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         from citizen.models import Citizen
         self.fields['citizen'].queryset = Citizen.objects.filter(is_active=True)
-        self.fields['certification_type'].queryset = CertificationType.objects.filter(is_active=True)
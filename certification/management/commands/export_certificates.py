@@ -0,0 +1,64 @@
+"""
+Management command to write a ZIP of approved certificate PDFs to a file.
+
+The same archive as the certification list's ZIP export, built offline for
+selections too large to render within one download (tens of thousands of
+certificates with missing PDFs). Missing or stale PDFs are rendered on
+CERTIFICATE_EXPORT_WORKERS processes and stored for later downloads.
+
+    python manage.py export_certificates /srv/exports/certificates_2026.zip --from 2026-01-01
+    python manage.py export_certificates birth.zip --type 3 --workers 8
+"""
+import os
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from certification.export import export_queryset, stream_certificate_zip
+from certification.models import CertificationType
+
+
+class Command(BaseCommand):
+    help = 'Writes a ZIP of approved certificate PDFs, filtered by type and issue date'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='ZIP file to write')
+        parser.add_argument('--type', type=int, help='CertificationType id')
+        parser.add_argument('--from', dest='date_from', help='Issued on or after (YYYY-MM-DD)')
+        parser.add_argument('--to', dest='date_to', help='Issued on or before (YYYY-MM-DD)')
+        parser.add_argument('--workers', type=int, help='Render processes (default: CERTIFICATE_EXPORT_WORKERS)')
+
+    def handle(self, *args, **options):
+        filters = {}
+        if options['type']:
+            try:
+                filters['certification_type'] = CertificationType.objects.get(pk=options['type'])
+            except CertificationType.DoesNotExist:
+                raise CommandError(f"Certification type {options['type']} does not exist")
+        for name in ('date_from', 'date_to'):
+            if options[name]:
+                try:
+                    filters[name] = date.fromisoformat(options[name])
+                except ValueError:
+                    raise CommandError('--from and --to must be dates in YYYY-MM-DD format')
+
+        queryset = export_queryset(**filters)
+        count = queryset.count()
+        if not count:
+            raise CommandError('No approved certifications match the filters')
+
+        output = options['output']
+        tmp_path = f'{output}.tmp'
+        started = time.perf_counter()
+        try:
+            with open(tmp_path, 'wb') as archive:
+                for chunk in stream_certificate_zip(queryset, workers=options['workers']):
+                    archive.write(chunk)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        os.replace(tmp_path, output)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {count} certificates to {output} in {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,43 @@
+"""
+Management command to render queued certificate PDFs.
+
+Run it as a long-lived service next to gunicorn (see
+``systemd_worker_template.service``; several copies may run at once). It
+renders certificates whose PDF was requested from the web and also picks up
+renders lost with a killed web worker. With it running, set
+CERTIFICATE_PDF_WORKERS=0 so web processes only queue renders. Use --once
+from cron to render what is queued and exit.
+"""
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection
+from certification.pdf import pending_renders, render_and_store
+
+
+class Command(BaseCommand):
+    help = 'Renders queued certificate PDFs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to sleep when nothing is queued')
+        parser.add_argument('--once', action='store_true', help='Render the queued PDFs and exit')
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            pks = list(pending_renders().order_by('pdf_status_at', 'pk').values_list('pk', flat=True)[:options['batch_size']])
+            rendered = 0
+            for pk in pks:
+                try:
+                    rendered += render_and_store(pk)
+                except Exception:
+                    pass  # logged and recorded as 'failed'
+            total += rendered
+            if rendered:
+                continue
+            if options['once']:
+                break
+            connection.close()
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Rendered {total} certificate PDFs'))
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certification', '0002_add_certification_type'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certification',
+            index=models.Index(fields=['issue_date'], name='certificati_issue_d_91dee8_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certification', '0003_certification_certificati_issue_d_91dee8_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certification',
+            index=models.Index(fields=['created_at'], name='certificati_created_0064a9_idx'),
+        ),
+    ]
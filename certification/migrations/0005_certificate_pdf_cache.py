@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certification', '0004_list_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certification',
+            name='pdf_hash',
+            field=models.CharField(blank=True, max_length=64, verbose_name='PDF Content Hash'),
+        ),
+        migrations.AddField(
+            model_name='certification',
+            name='pdf_status',
+            field=models.CharField(blank=True, choices=[('queued', 'Queued'), ('rendering', 'Rendering'), ('ready', 'Ready'), ('failed', 'Failed')], max_length=20, verbose_name='PDF Status'),
+        ),
+    ]
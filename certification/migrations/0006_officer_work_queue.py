@@ -0,0 +1,56 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certification', '0005_certificate_pdf_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfficerQueueDepth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('queue', models.CharField(choices=[('certification', 'Certifications'), ('holdingtax', 'Holding Taxes')], max_length=20, verbose_name='Queue')),
+                ('depth', models.IntegerField(default=0, verbose_name='Claimed Items')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'Officer Queue Depth',
+                'verbose_name_plural': 'Officer Queue Depths',
+                'ordering': ['queue', '-depth'],
+            },
+        ),
+        migrations.AddField(
+            model_name='certification',
+            name='claim_expires_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Claim Expires At'),
+        ),
+        migrations.AddField(
+            model_name='certification',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='certifications_claimed', to=settings.AUTH_USER_MODEL, verbose_name='Claimed By'),
+        ),
+        migrations.AddIndex(
+            model_name='certification',
+            index=models.Index(fields=['status', 'claimed_by', 'created_at'], name='certificati_status_0664cd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='certification',
+            index=models.Index(fields=['claim_expires_at'], name='certificati_claim_e_b1eac4_idx'),
+        ),
+        migrations.AddField(
+            model_name='officerqueuedepth',
+            name='officer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='queue_depths', to=settings.AUTH_USER_MODEL, verbose_name='Officer'),
+        ),
+        migrations.AddConstraint(
+            model_name='officerqueuedepth',
+            constraint=models.UniqueConstraint(fields=('officer', 'queue'), name='unique_officer_queue'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certification', '0006_officer_work_queue'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='certification',
+            name='certificate_number',
+            field=models.CharField(blank=True, max_length=50, unique=True, verbose_name='Certificate Number'),
+        ),
+    ]
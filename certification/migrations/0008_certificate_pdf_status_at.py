@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certification', '0007_auto_reference_numbers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certification',
+            name='pdf_status_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='PDF Status Changed At'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
 from citizen.models import Citizen
+from sequences.allocator import CERTIFICATE, next_number
 
 
 class CertificationType(models.Model):
@@ -31,16 +32,28 @@ class Certification(models.Model):
         ('rejected', 'Rejected'),
     ]
 
+    PDF_STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('rendering', 'Rendering'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+
     citizen = models.ForeignKey(Citizen, on_delete=models.PROTECT, related_name='certifications')
     certification_type = models.ForeignKey(CertificationType, on_delete=models.PROTECT, related_name='certifications')
-    certificate_number = models.CharField(_("Certificate Number"), max_length=50, unique=True)
+    certificate_number = models.CharField(_("Certificate Number"), max_length=50, unique=True, blank=True)
     issue_date = models.DateField(_("Issue Date"), null=True, blank=True)
     expiry_date = models.DateField(_("Expiry Date"), null=True, blank=True)
     status = models.CharField(_("Status"), max_length=20, choices=STATUS_CHOICES, default='pending')
     remarks = models.TextField(_("Remarks"), blank=True)
     rejection_reason = models.TextField(_("Rejection Reason"), blank=True)
     pdf_file = models.FileField(_("PDF Certificate"), upload_to='certificates/%Y/%m/%d/', blank=True, null=True)
+    pdf_hash = models.CharField(_("PDF Content Hash"), max_length=64, blank=True)
+    pdf_status = models.CharField(_("PDF Status"), max_length=20, choices=PDF_STATUS_CHOICES, blank=True)
+    pdf_status_at = models.DateTimeField(_("PDF Status Changed At"), null=True, blank=True)
     issued_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='certifications_issued', verbose_name=_("Issued By"))
+    claimed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='certifications_claimed', verbose_name=_("Claimed By"))
+    claim_expires_at = models.DateTimeField(_("Claim Expires At"), null=True, blank=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='certifications_created', verbose_name=_("Created By"))
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
@@ -53,10 +66,19 @@ class Certification(models.Model):
             models.Index(fields=['certificate_number']),
             models.Index(fields=['citizen']),
             models.Index(fields=['status']),
+            models.Index(fields=['issue_date']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['status', 'claimed_by', 'created_at']),
+            models.Index(fields=['claim_expires_at']),
         ]
 
     def __str__(self):
         return f"{self.certification_type.name} - {self.citizen.full_name} ({self.certificate_number})"
+
+    def save(self, *args, **kwargs):
+        if not self.certificate_number:
+            self.certificate_number = next_number(CERTIFICATE)
+        super().save(*args, **kwargs)
     
     def is_expired(self):
         """Check if certificate is expired."""
@@ -68,3 +90,28 @@ class Certification(models.Model):
     def is_valid(self):
         """Check if certificate is valid (approved and not expired)."""
         return self.status == 'approved' and not self.is_expired()
+
+
+class OfficerQueueDepth(models.Model):
+    """Number of items an officer currently holds claimed in a work queue."""
+
+    QUEUE_CHOICES = [
+        ('certification', 'Certifications'),
+        ('holdingtax', 'Holding Taxes'),
+    ]
+
+    officer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='queue_depths', verbose_name=_("Officer"))
+    queue = models.CharField(_("Queue"), max_length=20, choices=QUEUE_CHOICES)
+    depth = models.IntegerField(_("Claimed Items"), default=0)
+    updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Officer Queue Depth")
+        verbose_name_plural = _("Officer Queue Depths")
+        ordering = ['queue', '-depth']
+        constraints = [
+            models.UniqueConstraint(fields=['officer', 'queue'], name='unique_officer_queue'),
+        ]
+
+    def __str__(self):
+        return f"{self.officer} - {self.get_queue_display()}: {self.depth}"
@@ -0,0 +1,99 @@
+"""
+Bulk approve / reject for the officer work queues.
+
+Each call handles a whole selection in one transaction:
+
+* the selected rows still awaiting review are locked and read with one
+  query (rows another officer handled in the meantime are left alone);
+* the transition is applied with ``UPDATE`` statements (certifications are
+  grouped by validity period, since ``expiry_date`` depends on it);
+* the officers' claims on the changed rows are released (see
+  ``work_queue``); rows leased to another officer are not touched;
+* one admin ``LogEntry`` per changed row is written with a single
+  ``bulk_create``, so the change shows up in each object's admin history.
+"""
+from datetime import timedelta
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.db import transaction
+from django.utils import timezone
+
+from city_corporation.caching import invalidate_on_commit
+from holdingtax.models import HoldingTax
+from .models import Certification
+from .work_queue import QUEUES, release_claims, visible_to
+
+
+# Upper bound on rows handled by one bulk request
+BULK_ACTION_LIMIT = 500
+
+APPROVE = 'approve'
+REJECT = 'reject'
+
+# Holding tax queue transitions (same as the single-item review)
+HOLDING_TAX_TRANSITIONS = {APPROVE: 'PAID', REJECT: 'OVERDUE'}
+
+
+def _log(user, queryset, fields):
+    LogEntry.objects.log_actions(
+        user_id=user.pk, queryset=queryset, action_flag=CHANGE,
+        change_message=[{'changed': {'fields': fields}}],
+    )
+
+
+def bulk_review_certifications(pks, action, user, rejection_reason=''):
+    """Approve or reject the pending certifications among ``pks``; returns the pks changed."""
+    today = timezone.now().date()
+    with transaction.atomic():
+        rows = list(
+            visible_to(Certification.objects.select_for_update(of=('self',)), user)
+            .filter(pk__in=list(pks)[:BULK_ACTION_LIMIT], status='pending')
+            .values_list('pk', 'certification_type__validity_days')
+        )
+        if not rows:
+            return []
+        changed = [pk for pk, _validity in rows]
+        pending = Certification.objects.filter(status='pending')
+
+        if action == APPROVE:
+            by_validity = {}
+            for pk, validity_days in rows:
+                by_validity.setdefault(validity_days, []).append(pk)
+            for validity_days, group in by_validity.items():
+                pending.filter(pk__in=group).update(
+                    status='approved', issue_date=today, expiry_date=today + timedelta(days=validity_days),
+                    issued_by=user, updated_at=timezone.now(),
+                )
+            fields = ['Status', 'Issue Date', 'Expiry Date', 'Issued By']
+        elif action == REJECT:
+            pending.filter(pk__in=changed).update(
+                status='rejected', rejection_reason=rejection_reason, updated_at=timezone.now(),
+            )
+            fields = ['Status', 'Rejection Reason']
+        else:
+            raise ValueError(f'Unknown action {action!r}')
+
+        release_claims(QUEUES['certification'], changed)
+        invalidate_on_commit('certification')
+        _log(user, Certification.objects.filter(pk__in=changed).select_related('citizen', 'certification_type'), fields)
+    return changed
+
+
+def bulk_review_holding_taxes(pks, action, user):
+    """Approve or reject the PENDING holding taxes among ``pks``; returns the pks changed."""
+    if action not in HOLDING_TAX_TRANSITIONS:
+        raise ValueError(f'Unknown action {action!r}')
+    with transaction.atomic():
+        changed = list(
+            visible_to(HoldingTax.objects.select_for_update(), user)
+            .filter(pk__in=list(pks)[:BULK_ACTION_LIMIT], status='PENDING')
+            .values_list('pk', flat=True)
+        )
+        if not changed:
+            return []
+        HoldingTax.objects.filter(pk__in=changed, status='PENDING').update(
+            status=HOLDING_TAX_TRANSITIONS[action], updated_at=timezone.now(),
+        )
+        release_claims(QUEUES['holdingtax'], changed)
+        invalidate_on_commit('holdingtax')
+        _log(user, HoldingTax.objects.filter(pk__in=changed).select_related('holding_property'), ['Status'])
+    return changed
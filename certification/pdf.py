@@ -0,0 +1,312 @@
+"""
+Certificate PDF rendering.
+
+* Paragraph and table styles are built once per process.
+* A rendered PDF is stored in ``Certification.pdf_file`` together with a
+  hash of every field that appears on it (``pdf_hash``); downloads serve the
+  stored file while the hash still matches and re-render only when the
+  certificate or the template changed.
+* First-time (or stale) renders are queued so web workers never block on
+  ReportLab; clients poll ``pdf_status`` until the file is ready. Queued
+  renders are picked up by ``python manage.py process_certificate_pdfs``
+  (a worker service outside gunicorn) and, unless CERTIFICATE_PDF_WORKERS
+  is 0, by a small thread pool in the web process that queued them. Set
+  CERTIFICATE_PDF_ASYNC = False to render inline.
+* ``pdf_status_at`` records when a render was queued or started. A render
+  still queued or rendering after ``PDF_RENDER_TIMEOUT`` was lost with the
+  process running it (a killed web worker): it counts as not pending, so
+  the next request or status poll queues it again.
+"""
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import lru_cache
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from .models import Certification
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout below changes so stored PDFs are re-rendered
+TEMPLATE_VERSION = '1'
+
+PDF_READY = 'ready'
+PDF_PENDING_STATUSES = ('queued', 'rendering')
+# A queued or running render older than this was lost and is queued again
+PDF_RENDER_TIMEOUT = timedelta(minutes=5)
+
+
+@lru_cache(maxsize=None)
+def certificate_styles():
+    """Paragraph and table styles shared by every certificate."""
+    styles = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#1a365d'),
+            spaceAfter=30,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        ),
+        'heading': ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=18,
+            textColor=colors.HexColor('#2d3748'),
+            spaceAfter=20,
+            alignment=TA_CENTER,
+            fontName='Helvetica-Bold'
+        ),
+        'normal': ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=12,
+            textColor=colors.HexColor('#4a5568'),
+            alignment=TA_LEFT,
+            spaceAfter=12
+        ),
+        'signature': TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'BOTTOM'),
+        ]),
+        'signature_labels': TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ]),
+    }
+
+
+HASHED_FIELDS = (
+    'certificate_number', 'type_name', 'full_name', 'national_id', 'date_of_birth',
+    'address', 'remarks', 'issue_date', 'expiry_date',
+)
+
+
+def certificate_fields(certification):
+    """Plain (picklable) snapshot of everything printed on the certificate."""
+    citizen = certification.citizen
+    return {
+        'certificate_number': certification.certificate_number,
+        'type_name': certification.certification_type.name,
+        'full_name': citizen.full_name,
+        'national_id': citizen.national_id or '',
+        'date_of_birth': citizen.date_of_birth,
+        'address': citizen.address or '',
+        'remarks': certification.remarks or '',
+        'issue_date': certification.issue_date,
+        'expiry_date': certification.expiry_date,
+    }
+
+
+def fields_hash(fields):
+    """Hash of the printed fields plus the template version."""
+    parts = [TEMPLATE_VERSION]
+    for name in HASHED_FIELDS:
+        value = fields[name]
+        parts.append(value.isoformat() if hasattr(value, 'isoformat') else value or '')
+    return hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+
+
+def certificate_content_hash(certification):
+    """Hash of everything printed on the certificate (plus the template version)."""
+    return fields_hash(certificate_fields(certification))
+
+
+def build_certificate_pdf(fields):
+    """Render a certificate from ``certificate_fields()`` output; returns the PDF bytes."""
+    styles = certificate_styles()
+    normal_style = styles['normal']
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+    elements = [
+        Paragraph("CERTIFICATE", styles['title']),
+        Spacer(1, 0.3*inch),
+        Paragraph(f"{fields['type_name'].upper()}", styles['heading']),
+        Spacer(1, 0.4*inch),
+        Paragraph(f"Certificate No: {fields['certificate_number']}", normal_style),
+        Spacer(1, 0.2*inch),
+    ]
+
+    content_text = f"""
+    This is to certify that <b>{fields['full_name']}</b>,
+    National ID: <b>{fields['national_id'] or 'N/A'}</b>,
+    """
+    if fields['date_of_birth']:
+        content_text += f"Date of Birth: <b>{fields['date_of_birth'].strftime('%B %d, %Y')}</b>, "
+    if fields['address']:
+        content_text += f"Residing at <b>{fields['address']}</b>, "
+    content_text += f"is hereby issued this {fields['type_name']}."
+    elements.append(Paragraph(content_text, normal_style))
+    elements.append(Spacer(1, 0.3*inch))
+
+    if fields['remarks']:
+        elements.append(Paragraph(f"Remarks: {fields['remarks']}", normal_style))
+        elements.append(Spacer(1, 0.2*inch))
+
+    issue_date = fields['issue_date'] or timezone.now().date()
+    elements.append(Paragraph(f"Issued on: {issue_date.strftime('%B %d, %Y')}", normal_style))
+    if fields['expiry_date']:
+        elements.append(Paragraph(f"Valid until: {fields['expiry_date'].strftime('%B %d, %Y')}", normal_style))
+    elements.append(Spacer(1, 0.5*inch))
+
+    signature_table = Table([['', ''], ['', ''], ['', '']], colWidths=[3*inch, 3*inch])
+    signature_table.setStyle(styles['signature'])
+    elements.append(signature_table)
+    elements.append(Spacer(1, 0.2*inch))
+
+    signature_label_table = Table([['Authorized Signatory', 'City Corporation']], colWidths=[3*inch, 3*inch])
+    signature_label_table.setStyle(styles['signature_labels'])
+    elements.append(signature_label_table)
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def render_certificate_pdf(certification):
+    """Render the certificate and return the PDF bytes."""
+    return build_certificate_pdf(certificate_fields(certification))
+
+
+def store_certificate_pdf(certification, pdf, content_hash):
+    """Save rendered PDF bytes as the certificate's current file."""
+    old_file = certification.pdf_file.name if certification.pdf_file else None
+    filename = f"certificate_{certification.certificate_number}.pdf"
+    certification.pdf_file.save(filename, ContentFile(pdf), save=False)
+    certification.pdf_hash = content_hash
+    certification.pdf_status = PDF_READY
+    certification.pdf_status_at = timezone.now()
+    Certification.objects.filter(pk=certification.pk).update(
+        pdf_file=certification.pdf_file.name, pdf_hash=content_hash, pdf_status=PDF_READY,
+        pdf_status_at=certification.pdf_status_at,
+    )
+    if old_file and old_file != certification.pdf_file.name:
+        certification.pdf_file.storage.delete(old_file)
+
+
+def pdf_is_current(certification):
+    """True when the stored PDF matches the certificate's current content."""
+    return bool(
+        certification.pdf_file
+        and certification.pdf_status == PDF_READY
+        and certification.pdf_hash == certificate_content_hash(certification)
+    )
+
+
+def _stale_before():
+    return timezone.now() - PDF_RENDER_TIMEOUT
+
+
+def pending_renders():
+    """Certifications whose render is queued, or was lost (pending past ``PDF_RENDER_TIMEOUT``)."""
+    return Certification.objects.filter(
+        Q(pdf_status='queued') | Q(pdf_status__in=PDF_PENDING_STATUSES, pdf_status_at__lt=_stale_before())
+        | Q(pdf_status__in=PDF_PENDING_STATUSES, pdf_status_at__isnull=True)
+    )
+
+
+def pdf_render_pending(certification):
+    """True while a render of ``certification`` is queued or running (and not lost)."""
+    return bool(
+        certification.pdf_status in PDF_PENDING_STATUSES
+        and certification.pdf_status_at and certification.pdf_status_at >= _stale_before()
+    )
+
+
+def _claim_render(pk):
+    """Mark a queued (or lost) render as rendering; False when another process has it."""
+    return bool(pending_renders().filter(pk=pk).exclude(
+        pdf_status='rendering', pdf_status_at__gte=_stale_before()
+    ).update(pdf_status='rendering', pdf_status_at=timezone.now()))
+
+
+def render_and_store(pk, issued_by_id=None, claim=True):
+    """
+    Render certificate ``pk`` and store the PDF; returns False when there was nothing to do.
+
+    With ``claim`` the render only runs if it is still queued (or was lost),
+    so several workers can share a queue.
+    """
+    if claim:
+        if not _claim_render(pk):
+            return False
+    else:
+        Certification.objects.filter(pk=pk).update(pdf_status='rendering', pdf_status_at=timezone.now())
+    try:
+        certification = Certification.objects.select_related('citizen', 'certification_type').get(pk=pk)
+        fields = certificate_fields(certification)
+        store_certificate_pdf(certification, build_certificate_pdf(fields), fields_hash(fields))
+        if issued_by_id:
+            Certification.objects.filter(pk=pk, issued_by__isnull=True).update(issued_by_id=issued_by_id)
+    except Exception:
+        logger.exception('Rendering certificate %s failed', pk)
+        Certification.objects.filter(pk=pk).update(pdf_status='failed', pdf_status_at=timezone.now())
+        raise
+    return True
+
+
+@lru_cache(maxsize=None)
+def _executor():
+    return ThreadPoolExecutor(
+        max_workers=getattr(settings, 'CERTIFICATE_PDF_WORKERS', 2), thread_name_prefix='certificate-pdf'
+    )
+
+
+def _run_in_worker(pk, issued_by_id):
+    try:
+        render_and_store(pk, issued_by_id)
+    except Exception:
+        pass  # logged and recorded as 'failed'
+    finally:
+        connection.close()
+
+
+def request_certificate_pdf(certification, user=None):
+    """
+    Make sure an up-to-date PDF exists or is being rendered; returns the status.
+
+    Sets the issue date on first issue (it is printed on the certificate).
+    A render is queued only if none is already queued or running; a lost
+    one (pending past ``PDF_RENDER_TIMEOUT``) is queued again.
+    """
+    if not certification.issue_date:
+        certification.issue_date = timezone.now().date()
+        Certification.objects.filter(pk=certification.pk).update(issue_date=certification.issue_date)
+
+    if pdf_is_current(certification):
+        return PDF_READY
+
+    issued_by_id = user.pk if user else None
+    if not getattr(settings, 'CERTIFICATE_PDF_ASYNC', True):
+        render_and_store(certification.pk, issued_by_id, claim=False)
+        certification.refresh_from_db()
+        return certification.pdf_status
+
+    now = timezone.now()
+    queued = Certification.objects.filter(pk=certification.pk).exclude(
+        pdf_status__in=PDF_PENDING_STATUSES, pdf_status_at__gte=_stale_before()
+    ).update(pdf_status='queued', pdf_status_at=now)
+    if queued:
+        if issued_by_id:
+            # Recorded now: the render may run in the worker service
+            Certification.objects.filter(pk=certification.pk, issued_by__isnull=True).update(issued_by_id=issued_by_id)
+        if getattr(settings, 'CERTIFICATE_PDF_WORKERS', 2) > 0:
+            transaction.on_commit(lambda: _executor().submit(_run_in_worker, certification.pk, issued_by_id))
+    certification.pdf_status, certification.pdf_status_at = 'queued', now
+    return 'queued'
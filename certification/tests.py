@@ -1,3 +1,84 @@
-from django.test import TestCase
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.utils import timezone
 
-# Create your tests here.
+from citizen.models import Citizen
+from city_corporation.testing import run_concurrently
+from .models import Certification, CertificationType, OfficerQueueDepth
+from .work_queue import QUEUES, claim_next, claimed_by_other, expire_leases, release_claims, visible_to
+
+
+QUEUE = QUEUES['certification']
+
+
+def create_certifications(count):
+    citizen = Citizen.objects.create(first_name='Test', last_name='Citizen', national_id='2000000001')
+    certification_type = CertificationType.objects.create(name='Residence', code='RES')
+    return [
+        Certification.objects.create(citizen=citizen, certification_type=certification_type)
+        for _ in range(count)
+    ]
+
+
+def depth(officer):
+    return OfficerQueueDepth.objects.filter(officer=officer, queue=QUEUE.name).values_list('depth', flat=True).first()
+
+
+@override_settings(OFFICER_QUEUE_CLAIM_SIZE=3)
+class WorkQueueTests(TestCase):
+    def setUp(self):
+        self.certifications = create_certifications(8)
+        self.alice = User.objects.create_user('alice')
+        self.bob = User.objects.create_user('bob')
+
+    def test_officers_claim_disjoint_oldest_items(self):
+        first = claim_next(QUEUE, self.alice)
+        second = claim_next(QUEUE, self.bob)
+        pks = [certification.pk for certification in self.certifications]
+        self.assertEqual(sorted(first), pks[:3])
+        self.assertEqual(sorted(second), pks[3:6])
+        self.assertEqual((depth(self.alice), depth(self.bob)), (3, 3))
+
+        visible = set(visible_to(Certification.objects.all(), self.bob).values_list('pk', flat=True))
+        self.assertEqual(visible, set(pks[3:]))
+        item = Certification.objects.get(pk=first[0])
+        self.assertTrue(claimed_by_other(item, self.bob))
+        self.assertFalse(claimed_by_other(item, self.alice))
+
+    def test_only_pending_items_are_claimed(self):
+        Certification.objects.filter(pk=self.certifications[0].pk).update(status='approved')
+        self.assertNotIn(self.certifications[0].pk, claim_next(QUEUE, self.alice, count=8))
+
+    def test_expired_leases_are_released(self):
+        claimed = claim_next(QUEUE, self.alice)
+        Certification.objects.filter(pk__in=claimed).update(claim_expires_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(expire_leases(QUEUE), 3)
+        self.assertEqual(depth(self.alice), 0)
+        self.assertEqual(sorted(claim_next(QUEUE, self.bob)), sorted(claimed))
+
+    def test_release_only_touches_the_officers_own_claims(self):
+        mine = claim_next(QUEUE, self.alice)
+        theirs = claim_next(QUEUE, self.bob)
+        self.assertEqual(release_claims(QUEUE, mine + theirs, officer=self.alice), 3)
+        self.assertEqual((depth(self.alice), depth(self.bob)), (0, 3))
+        self.assertEqual(Certification.objects.filter(claimed_by__isnull=True).count(), 5)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentWorkQueueTests(TransactionTestCase):
+    def test_concurrent_claims_never_overlap(self):
+        create_certifications(40)
+        officers = [User.objects.create_user(f'officer{n}') for n in range(6)]
+        claims = {}
+
+        def claim(officer):
+            claims[officer.pk] = claim_next(QUEUE, officer, count=5)
+
+        self.assertEqual(run_concurrently(claim, [(officer,) for officer in officers]), [])
+        claimed = [pk for pks in claims.values() for pk in pks]
+        self.assertEqual(len(claimed), len(set(claimed)))
+        self.assertEqual(len(claimed), 30)
+        for officer in officers:
+            self.assertEqual(depth(officer), len(claims[officer.pk]))
+            self.assertEqual(Certification.objects.filter(claimed_by=officer).count(), len(claims[officer.pk]))
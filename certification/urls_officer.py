@@ -10,6 +10,12 @@ urlpatterns = [
     path('dashboard/', views_officer.officer_dashboard, name='dashboard'),
     path('holding-taxes/', views_officer.officer_holdingtax_list, name='holdingtax_list'),
     path('holding-taxes/<int:pk>/approve/', views_officer.officer_holdingtax_approve, name='holdingtax_approve'),
+    path('holding-taxes/bulk/', views_officer.officer_holdingtax_bulk, name='holdingtax_bulk'),
+    path('holding-taxes/claim/', views_officer.officer_holdingtax_claim, name='holdingtax_claim'),
+    path('holding-taxes/release/', views_officer.officer_holdingtax_release, name='holdingtax_release'),
     path('certifications/', views_officer.officer_certification_list, name='certification_list'),
+    path('certifications/bulk/', views_officer.officer_certification_bulk, name='certification_bulk'),
+    path('certifications/claim/', views_officer.officer_certification_claim, name='certification_claim'),
+    path('certifications/release/', views_officer.officer_certification_release, name='certification_release'),
     path('certifications/<int:pk>/approve/', views_officer.officer_certification_approve, name='certification_approve'),
 ]
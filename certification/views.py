@@ -1,20 +1,18 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
+from city_corporation.list_summary import count_where, list_summary
+from city_corporation.pagination import KeysetPaginator
+from city_corporation.reference_data import reference_data
 from django.db.models import Q, Count
-from django.http import HttpResponse, FileResponse
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
-from datetime import timedelta
-from io import BytesIO
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from datetime import date, timedelta
 from .models import Certification, CertificationType
 from .forms import CertificationForm, CertificationTypeForm
+from .export import export_queryset, stream_certificate_zip
+from .pdf import PDF_PENDING_STATUSES, PDF_READY, pdf_is_current, pdf_render_pending, request_certificate_pdf
 
 
 @login_required
@@ -41,34 +39,61 @@ def certification_list(request):
     if type_filter:
         certifications = certifications.filter(certification_type_id=type_filter)
     
-    # Pagination
-    paginator = Paginator(certifications, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
     # Statistics
-    total_certifications = certifications.count()
-    pending_count = certifications.filter(status='pending').count()
-    approved_count = certifications.filter(status='approved').count()
-    rejected_count = certifications.filter(status='rejected').count()
+    summary = list_summary(
+        certifications, ('certification', 'citizen'), 'certifications',
+        {'search': search_query, 'status': status_filter, 'type': type_filter},
+        pending_count=count_where(status='pending'),
+        approved_count=count_where(status='approved'),
+        rejected_count=count_where(status='rejected'),
+    )
+    
+    # Pagination
+    paginator = KeysetPaginator(certifications, 20, total=summary['total'])
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     # Get certification types for filter
-    certification_types = CertificationType.objects.filter(is_active=True)
+    certification_types = reference_data.objects(CertificationType)
     
     context = {
         'certifications': page_obj,
         'search_query': search_query,
         'status_filter': status_filter,
         'type_filter': type_filter,
-        'total_count': total_certifications,
-        'pending_count': pending_count,
-        'approved_count': approved_count,
-        'rejected_count': rejected_count,
+        'total_count': paginator.display_count,
+        'pending_count': summary['pending_count'],
+        'approved_count': summary['approved_count'],
+        'rejected_count': summary['rejected_count'],
         'certification_types': certification_types,
     }
     return render(request, 'certification/list.html', context)
 
 
+@login_required
+def certification_export(request):
+    """Stream a ZIP of approved certificate PDFs, filtered by type and issue date."""
+    filters = {}
+    try:
+        if request.GET.get('type'):
+            filters['certification_type'] = CertificationType.objects.get(pk=int(request.GET['type']))
+        for name in ('date_from', 'date_to'):
+            if request.GET.get(name):
+                filters[name] = date.fromisoformat(request.GET[name])
+    except (ValueError, CertificationType.DoesNotExist):
+        messages.error(request, 'Invalid export filters.')
+        return redirect('certification:list')
+
+    queryset = export_queryset(**filters)
+    if not queryset.exists():
+        messages.info(request, 'No approved certifications match the export filters.')
+        return redirect('certification:list')
+
+    response = StreamingHttpResponse(stream_certificate_zip(queryset), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="certificates_{timezone.now():%Y%m%d_%H%M}.zip"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @login_required
 def certification_detail(request, pk):
     """View certification details."""
@@ -147,146 +172,49 @@ def certification_delete(request, pk):
 
 @login_required
 def generate_pdf(request, pk):
-    """Generate PDF certificate for a certification."""
+    """Download the certificate PDF, rendering it in the background when needed."""
     certification = get_object_or_404(
         Certification.objects.select_related('citizen', 'certification_type'),
         pk=pk
     )
-    
+
     if certification.status != 'approved':
         messages.error(request, 'Only approved certifications can generate PDF certificates.')
         return redirect('certification:detail', pk=pk)
-    
-    # Create PDF buffer
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
-    
-    # Container for the 'Flowable' objects
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1a365d'),
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=18,
-        textColor=colors.HexColor('#2d3748'),
-        spaceAfter=20,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=12,
-        textColor=colors.HexColor('#4a5568'),
-        alignment=TA_LEFT,
-        spaceAfter=12
+
+    status = request_certificate_pdf(certification, request.user)
+    if status == PDF_READY:
+        return FileResponse(
+            certification.pdf_file.open('rb'),
+            as_attachment=True,
+            filename=f"certificate_{certification.certificate_number}.pdf",
+            content_type='application/pdf',
+        )
+    if status == 'failed':
+        messages.error(request, 'The certificate PDF could not be generated. Please try again.')
+    else:
+        messages.info(request, 'The certificate PDF is being generated and will download when ready.')
+    return redirect('certification:detail', pk=pk)
+
+
+@login_required
+def pdf_status(request, pk):
+    """Poll endpoint for background certificate rendering."""
+    certification = get_object_or_404(
+        Certification.objects.select_related('citizen', 'certification_type'),
+        pk=pk
     )
-    
-    # Certificate Title
-    elements.append(Paragraph("CERTIFICATE", title_style))
-    elements.append(Spacer(1, 0.3*inch))
-    
-    # Certificate Type
-    elements.append(Paragraph(f"{certification.certification_type.name.upper()}", heading_style))
-    elements.append(Spacer(1, 0.4*inch))
-    
-    # Certificate Number
-    elements.append(Paragraph(f"Certificate No: {certification.certificate_number}", normal_style))
-    elements.append(Spacer(1, 0.2*inch))
-    
-    # Main content
-    content_text = f"""
-    This is to certify that <b>{certification.citizen.full_name}</b>, 
-    National ID: <b>{certification.citizen.national_id or 'N/A'}</b>,
-    """
-    
-    if certification.citizen.date_of_birth:
-        content_text += f"Date of Birth: <b>{certification.citizen.date_of_birth.strftime('%B %d, %Y')}</b>, "
-    
-    if certification.citizen.address:
-        content_text += f"Residing at <b>{certification.citizen.address}</b>, "
-    
-    content_text += f"is hereby issued this {certification.certification_type.name}."
-    
-    elements.append(Paragraph(content_text, normal_style))
-    elements.append(Spacer(1, 0.3*inch))
-    
-    # Additional remarks if any
-    if certification.remarks:
-        elements.append(Paragraph(f"Remarks: {certification.remarks}", normal_style))
-        elements.append(Spacer(1, 0.2*inch))
-    
-    # Issue date
-    issue_date = certification.issue_date or timezone.now().date()
-    elements.append(Paragraph(f"Issued on: {issue_date.strftime('%B %d, %Y')}", normal_style))
-    
-    # Expiry date if available
-    if certification.expiry_date:
-        elements.append(Paragraph(f"Valid until: {certification.expiry_date.strftime('%B %d, %Y')}", normal_style))
-    
-    elements.append(Spacer(1, 0.5*inch))
-    
-    # Signature section
-    signature_data = [
-        ['', ''],
-        ['', ''],
-        ['', ''],
-    ]
-    
-    signature_table = Table(signature_data, colWidths=[3*inch, 3*inch])
-    signature_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('VALIGN', (0, 0), (-1, -1), 'BOTTOM'),
-    ]))
-    elements.append(signature_table)
-    elements.append(Spacer(1, 0.2*inch))
-    
-    # Signature labels
-    signature_labels = [
-        ['Authorized Signatory', 'City Corporation']
-    ]
-    signature_label_table = Table(signature_labels, colWidths=[3*inch, 3*inch])
-    signature_label_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-    ]))
-    elements.append(signature_label_table)
-    
-    # Build PDF
-    doc.build(elements)
-    
-    # Get PDF value
-    pdf = buffer.getvalue()
-    buffer.close()
-    
-    # Save PDF to model if not already saved
-    if not certification.pdf_file:
-        from django.core.files.base import ContentFile
-        filename = f"certificate_{certification.certificate_number}.pdf"
-        certification.pdf_file.save(filename, ContentFile(pdf), save=True)
-        certification.issued_by = request.user
-        if not certification.issue_date:
-            certification.issue_date = timezone.now().date()
-        certification.save()
-    
-    # Return PDF response
-    response = HttpResponse(pdf, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="certificate_{certification.certificate_number}.pdf"'
-    return response
+    ready = pdf_is_current(certification)
+    status = PDF_READY if ready else (certification.pdf_status or 'missing')
+    if (not ready and status in PDF_PENDING_STATUSES and not pdf_render_pending(certification)
+            and certification.status == 'approved'):
+        # The process rendering it died; queue it again
+        status = request_certificate_pdf(certification, request.user)
+        ready = status == PDF_READY
+    return JsonResponse({
+        'status': status,
+        'download_url': reverse('certification:generate_pdf', args=[pk]) if ready else None,
+    })
 
 
 @login_required
@@ -2,16 +2,58 @@
 Views for Officer role - Officers can approve holding taxes and certificates.
 """
 from django.shortcuts import render, redirect, get_object_or_404
+from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
+from city_corporation.pagination import KeysetPaginator
 from django.db.models import Q
+from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
 from citizen.decorators import officer_required
 from holdingtax.models import HoldingTax
 from certification.models import Certification
 from tradelicense.models import TradeLicense
+from certification.models import OfficerQueueDepth
+from certification.officer_actions import (
+    APPROVE, BULK_ACTION_LIMIT, REJECT, bulk_review_certifications, bulk_review_holding_taxes,
+)
+from certification.work_queue import QUEUES, claim_next, claimed_by_other, release_claims, visible_to
+
+
+def _selected_pks(request):
+    """Primary keys ticked on an officer list (``selected`` checkboxes)."""
+    return [int(pk) for pk in request.POST.getlist('selected') if pk.isdigit()]
+
+
+def _queue_list(request, queue, queryset):
+    """Hide items leased to other officers; ``?mine=1`` shows only the officer's own claims."""
+    mine = request.GET.get('mine') == '1'
+    if mine:
+        queryset = queryset.filter(claimed_by=request.user, claim_expires_at__gte=timezone.now())
+    else:
+        queryset = visible_to(queryset, request.user)
+    depth = OfficerQueueDepth.objects.filter(officer=request.user, queue=queue.name).values_list('depth', flat=True).first()
+    return queryset, {'mine': mine, 'queue_depth': depth or 0}
+
+
+def _claim(request, queue, list_url):
+    count = request.POST.get('count', '')
+    claimed = claim_next(queue, request.user, int(count) if count.isdigit() else None)
+    if claimed:
+        messages.success(request, f'{len(claimed)} items claimed for you.')
+    else:
+        messages.info(request, 'There are no unclaimed items left in this queue.')
+    return redirect(f'{reverse(list_url)}?mine=1')
+
+
+def _release(request, queue, list_url):
+    pks = _selected_pks(request)
+    if not pks:
+        pks = queue.model.objects.filter(claimed_by=request.user).values_list('pk', flat=True)
+    released = release_claims(queue, list(pks), officer=request.user)
+    messages.success(request, f'{released} claimed items returned to the queue.')
+    return redirect(list_url)
 
 
 @officer_required
@@ -57,13 +99,14 @@ def officer_holdingtax_list(request):
             Q(holding_property__owner__last_name__icontains=search_query)
         )
     
-    paginator = Paginator(holding_taxes, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    holding_taxes, queue_context = _queue_list(request, QUEUES['holdingtax'], holding_taxes)
+    paginator = KeysetPaginator(holding_taxes, 20)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'page_obj': page_obj,
         'search_query': search_query,
+        **queue_context,
     }
     
     return render(request, 'officer/holdingtax_list.html', context)
@@ -73,6 +116,9 @@ def officer_holdingtax_list(request):
 def officer_holdingtax_approve(request, pk):
     """Approve a holding tax."""
     holding_tax = get_object_or_404(HoldingTax, pk=pk)
+    if claimed_by_other(holding_tax, request.user):
+        messages.error(request, f'Holding Tax {holding_tax.tax_number} is being reviewed by another officer.')
+        return redirect('officer:holdingtax_list')
     
     if request.method == 'POST':
         action = request.POST.get('action')
@@ -85,6 +131,7 @@ def officer_holdingtax_approve(request, pk):
             holding_tax.status = 'OVERDUE'  # Or add a rejected status
             holding_tax.save()
             messages.success(request, f'Holding Tax {holding_tax.tax_number} rejected.')
+        release_claims(QUEUES['holdingtax'], [holding_tax.pk])
         
         return redirect('officer:holdingtax_list')
     
@@ -95,6 +142,40 @@ def officer_holdingtax_approve(request, pk):
     return render(request, 'officer/holdingtax_approve.html', context)
 
 
+@officer_required
+@require_POST
+def officer_holdingtax_claim(request):
+    """Lease the next unclaimed pending holding taxes to the officer."""
+    return _claim(request, QUEUES['holdingtax'], 'officer:holdingtax_list')
+
+
+@officer_required
+@require_POST
+def officer_holdingtax_release(request):
+    """Return the selected (default: all) claimed holding taxes to the queue."""
+    return _release(request, QUEUES['holdingtax'], 'officer:holdingtax_list')
+
+
+@officer_required
+@require_POST
+def officer_holdingtax_bulk(request):
+    """Approve or reject the selected holding taxes in one go."""
+    pks = _selected_pks(request)
+    action = request.POST.get('action')
+    if not pks or action not in (APPROVE, REJECT):
+        messages.error(request, 'Select at least one holding tax and an action.')
+        return redirect('officer:holdingtax_list')
+    if len(pks) > BULK_ACTION_LIMIT:
+        messages.warning(request, f'Only the first {BULK_ACTION_LIMIT} selected holding taxes were processed.')
+
+    changed = bulk_review_holding_taxes(pks, action, request.user)
+    verb = 'approved' if action == APPROVE else 'rejected'
+    messages.success(request, f'{len(changed)} holding taxes {verb}.')
+    if len(changed) < min(len(pks), BULK_ACTION_LIMIT):
+        messages.info(request, f'{min(len(pks), BULK_ACTION_LIMIT) - len(changed)} were skipped (no longer pending or claimed by another officer).')
+    return redirect('officer:holdingtax_list')
+
+
 @officer_required
 def officer_certification_list(request):
     """List certifications pending approval."""
@@ -109,13 +190,14 @@ def officer_certification_list(request):
             Q(certification_type__name__icontains=search_query)
         )
     
-    paginator = Paginator(certifications, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    certifications, queue_context = _queue_list(request, QUEUES['certification'], certifications)
+    paginator = KeysetPaginator(certifications, 20)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'page_obj': page_obj,
         'search_query': search_query,
+        **queue_context,
     }
     
     return render(request, 'officer/certification_list.html', context)
@@ -125,6 +207,9 @@ def officer_certification_list(request):
 def officer_certification_approve(request, pk):
     """Approve a certification."""
     certification = get_object_or_404(Certification, pk=pk)
+    if claimed_by_other(certification, request.user):
+        messages.error(request, f'Certification {certification.certificate_number} is being reviewed by another officer.')
+        return redirect('officer:certification_list')
     
     if request.method == 'POST':
         action = request.POST.get('action')
@@ -141,6 +226,7 @@ def officer_certification_approve(request, pk):
             certification.rejection_reason = request.POST.get('rejection_reason', '')
             certification.save()
             messages.success(request, f'Certification {certification.certificate_number} rejected.')
+        release_claims(QUEUES['certification'], [certification.pk])
         
         return redirect('officer:certification_list')
     
@@ -149,3 +235,39 @@ def officer_certification_approve(request, pk):
     }
     
     return render(request, 'officer/certification_approve.html', context)
+
+
+@officer_required
+@require_POST
+def officer_certification_claim(request):
+    """Lease the next unclaimed pending certifications to the officer."""
+    return _claim(request, QUEUES['certification'], 'officer:certification_list')
+
+
+@officer_required
+@require_POST
+def officer_certification_release(request):
+    """Return the selected (default: all) claimed certifications to the queue."""
+    return _release(request, QUEUES['certification'], 'officer:certification_list')
+
+
+@officer_required
+@require_POST
+def officer_certification_bulk(request):
+    """Approve or reject the selected certifications in one go."""
+    pks = _selected_pks(request)
+    action = request.POST.get('action')
+    if not pks or action not in (APPROVE, REJECT):
+        messages.error(request, 'Select at least one certification and an action.')
+        return redirect('officer:certification_list')
+    if len(pks) > BULK_ACTION_LIMIT:
+        messages.warning(request, f'Only the first {BULK_ACTION_LIMIT} selected certifications were processed.')
+
+    changed = bulk_review_certifications(
+        pks, action, request.user, rejection_reason=request.POST.get('rejection_reason', '')
+    )
+    verb = 'approved' if action == APPROVE else 'rejected'
+    messages.success(request, f'{len(changed)} certifications {verb}.')
+    if len(changed) < min(len(pks), BULK_ACTION_LIMIT):
+        messages.info(request, f'{min(len(pks), BULK_ACTION_LIMIT) - len(changed)} were skipped (no longer pending or claimed by another officer).')
+    return redirect('officer:certification_list')
@@ -0,0 +1,130 @@
+"""
+Claim / lease mechanism for the officer work queues.
+
+An officer pulls the next N unclaimed pending items (oldest first); they
+are leased to that officer until ``claim_expires_at`` and hidden from the
+other officers' lists, so two people never work the same item.
+
+* On PostgreSQL (and other backends with ``SKIP LOCKED``) candidates are
+  selected with ``SELECT ... FOR UPDATE SKIP LOCKED``: concurrent claimers
+  skip each other's rows instead of waiting on them.
+* Elsewhere (SQLite) candidates are read without locks and taken with a
+  conditional ``UPDATE ... WHERE claimed_by IS NULL``; rows another officer
+  took in between are simply not ours, and the claim tops up from the next
+  candidates.
+* Expired leases are cleared before each claim. Counters in
+  ``OfficerQueueDepth`` move by the row counts the UPDATEs return, so they
+  stay exact under concurrency.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from holdingtax.models import HoldingTax
+from .models import Certification, OfficerQueueDepth
+
+
+@dataclass(frozen=True)
+class WorkQueue:
+    name: str
+    model: type
+    pending_status: str
+
+    def pending(self):
+        return self.model.objects.filter(status=self.pending_status)
+
+
+QUEUES = {
+    'certification': WorkQueue('certification', Certification, 'pending'),
+    'holdingtax': WorkQueue('holdingtax', HoldingTax, 'PENDING'),
+}
+
+CLAIM_ATTEMPTS = 3
+
+
+def lease_duration():
+    return timedelta(minutes=getattr(settings, 'OFFICER_QUEUE_LEASE_MINUTES', 30))
+
+
+def _adjust_depth(queue, officer_id, delta):
+    if not delta:
+        return
+    depth, _created = OfficerQueueDepth.objects.get_or_create(officer_id=officer_id, queue=queue.name)
+    OfficerQueueDepth.objects.filter(pk=depth.pk).update(depth=F('depth') + delta, updated_at=timezone.now())
+
+
+def _release_rows(queue, rows):
+    """Clear the claims on ``rows`` (a queryset), one UPDATE per claimant; returns the count."""
+    released = 0
+    claimants = rows.filter(claimed_by__isnull=False).order_by().values_list('claimed_by', flat=True).distinct()
+    for officer_id in list(claimants):
+        count = rows.filter(claimed_by=officer_id).update(claimed_by=None, claim_expires_at=None)
+        _adjust_depth(queue, officer_id, -count)
+        released += count
+    return released
+
+
+def expire_leases(queue, now=None):
+    """Release every lease in ``queue`` that has run out; returns the count."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        return _release_rows(queue, queue.model.objects.filter(claim_expires_at__lt=now))
+
+
+def release_claims(queue, pks, officer=None):
+    """Release the claims on ``pks`` (only ``officer``'s, when given); returns the count."""
+    rows = queue.model.objects.filter(pk__in=pks)
+    if officer is not None:
+        rows = rows.filter(claimed_by=officer)
+    with transaction.atomic():
+        return _release_rows(queue, rows)
+
+
+def claim_next(queue, officer, count=None):
+    """Lease the next ``count`` unclaimed pending items to ``officer``; returns their pks."""
+    count = count or getattr(settings, 'OFFICER_QUEUE_CLAIM_SIZE', 10)
+    now = timezone.now()
+    expire_leases(queue, now)
+    expires_at = now + lease_duration()
+    skip_locked = connection.features.has_select_for_update_skip_locked
+
+    claimed = []
+    for _attempt in range(CLAIM_ATTEMPTS):
+        with transaction.atomic():
+            candidates = queue.pending().filter(claimed_by__isnull=True).order_by('created_at', 'pk')
+            if skip_locked:
+                candidates = candidates.select_for_update(skip_locked=True)
+            pks = list(candidates.values_list('pk', flat=True)[:count - len(claimed)])
+            if not pks:
+                break
+            taken = queue.model.objects.filter(pk__in=pks, claimed_by__isnull=True).update(
+                claimed_by=officer, claim_expires_at=expires_at
+            )
+            if taken:
+                claimed += list(queue.model.objects.filter(
+                    pk__in=pks, claimed_by=officer, claim_expires_at=expires_at
+                ).values_list('pk', flat=True))
+                _adjust_depth(queue, officer.pk, taken)
+        if len(claimed) >= count:
+            break
+    return claimed
+
+
+def visible_to(queryset, officer, now=None):
+    """Filter ``queryset`` to items not under another officer's active lease."""
+    now = now or timezone.now()
+    return queryset.filter(
+        Q(claimed_by__isnull=True) | Q(claimed_by=officer) | Q(claim_expires_at__lt=now)
+    )
+
+
+def claimed_by_other(item, officer, now=None):
+    """True when ``item`` is leased to an officer other than ``officer``."""
+    now = now or timezone.now()
+    return bool(
+        item.claimed_by_id and item.claimed_by_id != officer.pk
+        and item.claim_expires_at and item.claim_expires_at >= now
+    )
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class CitizenConfig(AppConfig):
     name = 'citizen'
+
+    def ready(self):
+        # Connect role cache invalidation signals
+        from . import roles  # noqa: F401
@@ -5,6 +5,7 @@ from functools import wraps
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from .roles import CITIZEN, FIELD_OFFICER, OFFICER, SUPERADMIN, has_role
 
 
 def group_required(*group_names):
@@ -18,8 +19,7 @@ def group_required(*group_names):
             if request.user.is_superuser:
                 return view_func(request, *args, **kwargs)
             
-            user_groups = request.user.groups.values_list('name', flat=True)
-            if any(group_name in user_groups for group_name in group_names):
+            if has_role(request.user, *group_names):
                 return view_func(request, *args, **kwargs)
             
             messages.error(request, 'You do not have permission to access this page.')
@@ -35,7 +35,7 @@ def superadmin_required(view_func):
     @wraps(view_func)
     @login_required
     def wrapper(request, *args, **kwargs):
-        if request.user.is_superuser or request.user.groups.filter(name='SuperAdmin').exists():
+        if request.user.is_superuser or has_role(request.user, SUPERADMIN):
             return view_func(request, *args, **kwargs)
         
         messages.error(request, 'You do not have permission to access this page.')
@@ -53,7 +53,7 @@ def citizen_required(view_func):
         if request.user.is_superuser:
             return view_func(request, *args, **kwargs)
         
-        if request.user.groups.filter(name='citizen').exists():
+        if has_role(request.user, CITIZEN):
             return view_func(request, *args, **kwargs)
         
         messages.error(request, 'You do not have permission to access this page.')
@@ -71,7 +71,7 @@ def field_officer_required(view_func):
         if request.user.is_superuser:
             return view_func(request, *args, **kwargs)
         
-        if request.user.groups.filter(name='Holding Tax Field Officer').exists():
+        if has_role(request.user, FIELD_OFFICER):
             return view_func(request, *args, **kwargs)
         
         messages.error(request, 'You do not have permission to access this page.')
@@ -89,7 +89,7 @@ def officer_required(view_func):
         if request.user.is_superuser:
             return view_func(request, *args, **kwargs)
         
-        if request.user.groups.filter(name='Officer').exists():
+        if has_role(request.user, OFFICER):
             return view_func(request, *args, **kwargs)
         
         messages.error(request, 'You do not have permission to access this page.')
@@ -0,0 +1,19 @@
+"""
+Management command to (re)create the citizen search indexes.
+
+Run it after restoring a database dump or if the SQLite full-text table
+got out of sync (e.g. after a table rebuild dropped its triggers).
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection
+from citizen.search import install_search_structures, remove_search_structures
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the citizen search indexes (pg_trgm on PostgreSQL, FTS5 on SQLite)'
+
+    def handle(self, *args, **options):
+        with connection.schema_editor() as schema_editor:
+            remove_search_structures(schema_editor)
+            install_search_structures(schema_editor)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt citizen search indexes ({connection.vendor})'))
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('citizen', '0003_citizen_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='citizen',
+            index=models.Index(fields=['created_at'], name='citizen_cit_created_1b3f03_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def install_search(apps, schema_editor):
+    from citizen.search import install_search_structures
+    install_search_structures(schema_editor)
+
+
+def remove_search(apps, schema_editor):
+    from citizen.search import remove_search_structures
+    remove_search_structures(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('citizen', '0004_citizen_citizen_cit_created_1b3f03_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='citizen',
+            index=models.Index(fields=['phone_number'], name='citizen_cit_phone_n_6518df_idx'),
+        ),
+        migrations.RunPython(install_search, remove_search),
+    ]
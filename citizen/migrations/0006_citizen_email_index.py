@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('citizen', '0005_citizen_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='citizen',
+            index=models.Index(fields=['email'], name='citizen_cit_email_91119b_idx'),
+        ),
+    ]
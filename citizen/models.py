@@ -96,6 +96,9 @@ class Citizen(models.Model):
         indexes = [
             models.Index(fields=["national_id"]),
             models.Index(fields=["last_name", "first_name"]),
+            models.Index(fields=["created_at"]),
+            models.Index(fields=["phone_number"]),
+            models.Index(fields=["email"]),
         ]
 
     def __str__(self):
@@ -0,0 +1,100 @@
+"""
+Role resolution for role-based access control.
+
+A user's group names are loaded once per request (memoised on the user
+object) and, when the cache is shared by all workers (see
+``city_corporation.caching.cache_is_shared``), cached across requests in
+the Django cache, so warm authorization checks cost no queries. Cache
+entries are dropped whenever the user's group membership changes, once the
+change commits. A per-process cache could not drop the entries of other
+workers, so with one roles are only memoised per request.
+"""
+from functools import partial
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+
+from city_corporation.caching import cache_is_shared
+
+
+CITIZEN = 'citizen'
+FIELD_OFFICER = 'Holding Tax Field Officer'
+OFFICER = 'Officer'
+SUPERADMIN = 'SuperAdmin'
+
+_REQUEST_ATTR = '_role_groups'
+
+
+def _cache_key(user_pk):
+    return f'roles:user:{user_pk}'
+
+
+def get_user_groups(user):
+    """Return the frozenset of group names the user belongs to."""
+    if user is None or not user.is_authenticated:
+        return frozenset()
+
+    groups = getattr(user, _REQUEST_ATTR, None)
+    if groups is not None:
+        return groups
+
+    if not cache_is_shared():
+        groups = frozenset(user.groups.values_list('name', flat=True))
+        setattr(user, _REQUEST_ATTR, groups)
+        return groups
+
+    key = _cache_key(user.pk)
+    groups = cache.get(key)
+    if groups is None:
+        groups = frozenset(user.groups.values_list('name', flat=True))
+        cache.set(key, groups, getattr(settings, 'ROLE_CACHE_TIMEOUT', 3600))
+
+    setattr(user, _REQUEST_ATTR, groups)
+    return groups
+
+
+def has_role(user, *group_names):
+    """Check if the user belongs to any of the given groups."""
+    return not get_user_groups(user).isdisjoint(group_names)
+
+
+def invalidate_user_roles(*user_pks):
+    """Drop cached group names for the given users."""
+    cache.delete_many([_cache_key(pk) for pk in user_pks])
+
+
+def _invalidate_on_commit(*user_pks):
+    # Dropping them before the commit would let another request cache the old groups again
+    if user_pks:
+        transaction.on_commit(partial(invalidate_user_roles, *user_pks))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate cached roles when group membership changes (from either side)."""
+    if not reverse:
+        # user.groups.add/remove/clear(...)
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            instance.__dict__.pop(_REQUEST_ATTR, None)
+            _invalidate_on_commit(instance.pk)
+        return
+
+    # group.user_set.add/remove/clear(...)
+    if action == 'pre_clear':
+        instance._role_cleared_user_pks = list(instance.user_set.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove') and pk_set:
+        _invalidate_on_commit(*pk_set)
+    elif action == 'post_clear':
+        _invalidate_on_commit(*getattr(instance, '_role_cleared_user_pks', []))
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_changed(sender, instance, created=False, **kwargs):
+    """Invalidate members' cached roles when a group is renamed or deleted."""
+    if created:
+        return
+    _invalidate_on_commit(*instance.user_set.values_list('pk', flat=True))
@@ -0,0 +1,227 @@
+"""
+Citizen search backends.
+
+The list views used to OR five ``icontains`` predicates, which no index can
+serve. Searches now go through ``search_citizens()``:
+
+* exact national ID, phone number and email lookups hit their b-tree
+  indexes first;
+* otherwise a ranked, indexed backend is used - pg_trgm GIN indexes on
+  PostgreSQL or an FTS5 trigram table on SQLite - with the old ``icontains``
+  filter as a fallback for other databases or very short queries.
+
+The backend is picked from the database vendor unless CITIZEN_SEARCH_BACKEND
+is set to 'postgres', 'sqlite' or 'basic'.
+"""
+import re
+from django.conf import settings
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest
+
+
+SEARCH_FIELDS = ['first_name', 'last_name', 'national_id', 'phone_number', 'email']
+
+NID_RE = re.compile(r'^\d{10}$|^\d{13}$|^\d{17}$')
+PHONE_RE = re.compile(r'^(?:\+?88)?(01\d{9})$')
+
+FTS_TABLE = 'citizen_citizen_fts'
+
+
+def phone_variants(query):
+    """Return the stored spellings of a Bangladeshi mobile number, or []."""
+    match = PHONE_RE.match(query.replace(' ', '').replace('-', ''))
+    if not match:
+        return []
+    local = match.group(1)
+    return [f'+88{local}', f'88{local}', local]
+
+
+class BasicCitizenSearch:
+    """Unindexed ``icontains`` search (original behaviour)."""
+
+    min_length = 0
+
+    def search(self, queryset, query):
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f'{field}__icontains': query})
+        return queryset.filter(condition)
+
+
+class PostgresCitizenSearch(BasicCitizenSearch):
+    """Trigram word-similarity search served by GIN (gin_trgm_ops) indexes."""
+
+    min_length = 3
+
+    def search(self, queryset, query):
+        if len(query) < self.min_length:
+            return super().search(queryset, query)
+
+        from django.contrib.postgres.lookups import TrigramWordSimilar
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        from django.db.models import F
+
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(TrigramWordSimilar(F(field), query))
+        rank = Greatest(*[TrigramWordSimilarity(query, field) for field in SEARCH_FIELDS])
+        return queryset.filter(condition).annotate(search_rank=rank).order_by('-search_rank', '-created_at')
+
+
+class SQLiteCitizenSearch(BasicCitizenSearch):
+    """
+    FTS5 (trigram tokenizer) search ranked by bm25.
+
+    The FTS table is queried inside the citizen query, so the caller's
+    filters and pagination apply to every match rather than to a top-N
+    fetched beforehand.
+    """
+
+    min_length = 3
+
+    def search(self, queryset, query):
+        if len(query) < self.min_length or not sqlite_fts_installed():
+            return super().search(queryset, query)
+
+        phrase = '"' + query.replace('"', '""') + '"'
+        table = queryset.model._meta.db_table
+        matches = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [phrase])
+        rank = RawSQL(
+            f'SELECT rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = "{table}"."id"',
+            [phrase], output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matches).annotate(search_rank=rank).order_by('search_rank', '-created_at')
+
+
+BACKENDS = {
+    'basic': BasicCitizenSearch,
+    'postgres': PostgresCitizenSearch,
+    'sqlite': SQLiteCitizenSearch,
+}
+
+VENDOR_BACKENDS = {
+    'postgresql': 'postgres',
+    'sqlite': 'sqlite',
+}
+
+
+def get_search_backend():
+    """Return the configured citizen search backend."""
+    name = getattr(settings, 'CITIZEN_SEARCH_BACKEND', 'auto')
+    if name == 'auto':
+        name = VENDOR_BACKENDS.get(connection.vendor, 'basic')
+    return BACKENDS[name]()
+
+
+def search_citizens(queryset, query):
+    """Filter and rank a Citizen queryset by a free-text search query."""
+    query = query.strip()
+    if not query:
+        return queryset
+
+    # Fast paths: exact matches on indexed columns
+    if NID_RE.match(query):
+        exact = queryset.filter(national_id=query)
+        if exact.exists():
+            return exact
+
+    phones = phone_variants(query)
+    if phones:
+        exact = queryset.filter(phone_number__in=phones)
+        if exact.exists():
+            return exact
+
+    if '@' in query and ' ' not in query:
+        exact = queryset.filter(email=query)
+        if exact.exists():
+            return exact
+
+    return get_search_backend().search(queryset, query)
+
+
+# Index / full-text table maintenance (called from migrations and
+# the rebuild_citizen_search management command)
+
+POSTGRES_INDEX_SQL = ['CREATE EXTENSION IF NOT EXISTS pg_trgm'] + [
+    f'CREATE INDEX IF NOT EXISTS citizen_{field}_trgm_idx '
+    f'ON citizen_citizen USING gin ({field} gin_trgm_ops)'
+    for field in SEARCH_FIELDS
+]
+
+POSTGRES_DROP_SQL = [f'DROP INDEX IF EXISTS citizen_{field}_trgm_idx' for field in SEARCH_FIELDS]
+
+_FTS_COLUMNS = ', '.join(SEARCH_FIELDS)
+_FTS_NEW = ', '.join(f'new.{field}' for field in SEARCH_FIELDS)
+_FTS_OLD = ', '.join(f'old.{field}' for field in SEARCH_FIELDS)
+
+SQLITE_FTS_SQL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"{_FTS_COLUMNS}, content='citizen_citizen', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON citizen_citizen BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_FTS_COLUMNS}) VALUES (new.id, {_FTS_NEW}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON citizen_citizen BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_FTS_COLUMNS}) VALUES ('delete', old.id, {_FTS_OLD}); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON citizen_citizen BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_FTS_COLUMNS}) VALUES ('delete', old.id, {_FTS_OLD}); "
+    f"INSERT INTO {FTS_TABLE}(rowid, {_FTS_COLUMNS}) VALUES (new.id, {_FTS_NEW}); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_SQL = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+
+def sqlite_supports_trigram_fts(conn):
+    """FTS5's trigram tokenizer needs SQLite 3.34+ built with FTS5."""
+    import sqlite3
+    if sqlite3.sqlite_version_info < (3, 34, 0):
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any(row[0] == 'ENABLE_FTS5' for row in cursor.fetchall())
+
+
+def sqlite_fts_installed():
+    """Check (once per connection) that the FTS table and its triggers exist."""
+    cached = getattr(connection, '_citizen_fts_installed', None)
+    if cached is None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+                [FTS_TABLE, f'{FTS_TABLE}_ai', f'{FTS_TABLE}_ad', f'{FTS_TABLE}_au'],
+            )
+            cached = cursor.fetchone()[0] == 4
+        connection._citizen_fts_installed = cached
+    return cached
+
+
+def install_search_structures(schema_editor):
+    """Create the vendor-specific search indexes / full-text table."""
+    conn = schema_editor.connection
+    if conn.vendor == 'postgresql':
+        for sql in POSTGRES_INDEX_SQL:
+            schema_editor.execute(sql)
+    elif conn.vendor == 'sqlite' and sqlite_supports_trigram_fts(conn):
+        for sql in SQLITE_FTS_SQL:
+            schema_editor.execute(sql)
+    conn.__dict__.pop('_citizen_fts_installed', None)
+
+
+def remove_search_structures(schema_editor):
+    """Drop the vendor-specific search indexes / full-text table."""
+    conn = schema_editor.connection
+    if conn.vendor == 'postgresql':
+        sql_list = POSTGRES_DROP_SQL
+    elif conn.vendor == 'sqlite':
+        sql_list = SQLITE_DROP_SQL
+    else:
+        sql_list = []
+    for sql in sql_list:
+        schema_editor.execute(sql)
+    conn.__dict__.pop('_citizen_fts_installed', None)
@@ -1,3 +1,51 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from city_corporation.pagination import KeysetPaginator
+from .models import Citizen
+from .search import search_citizens, sqlite_fts_installed
+
+
+def create_citizen(n, first_name='Rahim', **kwargs):
+    fields = {'first_name': first_name, 'last_name': f'Uddin{n}', 'national_id': f'{n:010d}'}
+    return Citizen.objects.create(**{**fields, **kwargs})
+
+
+class CitizenSearchTests(TestCase):
+    def test_exact_national_id_and_phone_lookups(self):
+        citizen = create_citizen(1234567890, phone_number='+8801712345678')
+        create_citizen(1, last_name='1234567890')
+        self.assertEqual(list(search_citizens(Citizen.objects.all(), '1234567890')), [citizen])
+        self.assertEqual(list(search_citizens(Citizen.objects.all(), '01712345678')), [citizen])
+
+    @override_settings(CITIZEN_SEARCH_BACKEND='basic')
+    def test_basic_backend_matches_substrings(self):
+        karim = create_citizen(1, first_name='Karim')
+        create_citizen(2)
+        self.assertEqual(list(search_citizens(Citizen.objects.all(), 'ari')), [karim])
+
+    def test_callers_filters_apply_to_every_match(self):
+        if not sqlite_fts_installed():
+            self.skipTest('needs the SQLite FTS5 citizen table')
+        for n in range(30):
+            create_citizen(n, is_active=False)
+        active = create_citizen(99)
+        create_citizen(100, first_name='Karim')
+
+        found = search_citizens(Citizen.objects.filter(is_active=True), 'Rahim')
+        self.assertEqual(list(found), [active])
+
+    def test_search_results_page_with_cursors(self):
+        if not sqlite_fts_installed():
+            self.skipTest('needs the SQLite FTS5 citizen table')
+        citizens = {create_citizen(n).pk for n in range(25)}
+        paginator = KeysetPaginator(search_citizens(Citizen.objects.all(), 'Rahim'), 10)
+
+        seen = []
+        page = paginator.get_page()
+        while True:
+            seen.extend(citizen.pk for citizen in page)
+            if not page.has_next():
+                break
+            page = paginator.get_page(page.next_cursor)
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(set(seen), citizens)
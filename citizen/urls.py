@@ -8,6 +8,7 @@ urlpatterns = [
     # Admin routes (for admin users)
     path('', views.citizen_list, name='list'),
     path('create/', views.citizen_create, name='create'),
+    path('autocomplete/', views.citizen_autocomplete, name='autocomplete'),
     path('<int:pk>/', views.citizen_detail, name='detail'),
     path('<int:pk>/update/', views.citizen_update, name='update'),
     path('<int:pk>/delete/', views.citizen_delete, name='delete'),
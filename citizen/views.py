@@ -1,10 +1,11 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Q
+from city_corporation.autocomplete import autocomplete_response
+from city_corporation.pagination import KeysetPaginator
 from .models import Citizen, CitizenDocument
 from .forms import CitizenForm, CitizenDocumentForm
+from .search import search_citizens
 
 
 @login_required
@@ -15,27 +16,28 @@ def citizen_list(request):
     # Search functionality
     search_query = request.GET.get('search', '')
     if search_query:
-        citizens = citizens.filter(
-            Q(first_name__icontains=search_query) |
-            Q(last_name__icontains=search_query) |
-            Q(national_id__icontains=search_query) |
-            Q(phone_number__icontains=search_query) |
-            Q(email__icontains=search_query)
-        )
+        citizens = search_citizens(citizens, search_query)
     
     # Pagination
-    paginator = Paginator(citizens, 20)  # Show 20 citizens per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(citizens, 20)  # Show 20 citizens per page
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'citizens': page_obj,
         'search_query': search_query,
-        'total_count': citizens.count(),
+        'total_count': paginator.display_count,
     }
     return render(request, 'citizen/list.html', context)
 
 
+@login_required
+def citizen_autocomplete(request):
+    """JSON search endpoint for citizen pickers."""
+    citizens = Citizen.objects.filter(is_active=True).only('first_name', 'last_name', 'national_id')
+    citizens = search_citizens(citizens, request.GET.get('q', ''))
+    return autocomplete_response(citizens, str)
+
+
 @login_required
 def citizen_detail(request, pk):
     """View citizen details."""
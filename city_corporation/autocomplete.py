@@ -0,0 +1,84 @@
+"""
+Remote autocomplete for foreign-key pickers.
+
+A plain ``Select`` renders one ``<option>`` per row of the field's queryset
+(calling ``__str__`` - and often a related lookup - for each), which does not
+scale to hundreds of thousands of citizens or properties. ``AutocompleteSelect``
+renders only the currently selected option and lets ``static/js/autocomplete.js``
+fetch matches from a JSON endpoint as the user types. Form validation is
+unchanged: the field still checks the submitted pk against its queryset.
+
+Endpoints return ``{"results": [{"id": ..., "text": ...}], "more": bool}``
+and are built with ``autocomplete_response()``.
+"""
+from django import forms
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.urls import reverse
+
+
+AUTOCOMPLETE_LIMIT = 20
+AUTOCOMPLETE_MIN_LENGTH = 2
+
+
+class AutocompleteSelect(forms.Select):
+    """Select widget that renders only the selected option and searches remotely.
+
+    ``url_name`` is the endpoint's URL name. ``forward`` maps query parameters
+    to other form field names whose current values are sent along, e.g.
+    ``{'area': 'area'}`` to restrict streets to the chosen area.
+    """
+
+    class Media:
+        js = ['js/autocomplete.js']
+
+    def __init__(self, url_name, attrs=None, forward=None, min_length=AUTOCOMPLETE_MIN_LENGTH):
+        super().__init__(attrs)
+        self.url_name = url_name
+        self.forward = forward or {}
+        self.min_length = min_length
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-autocomplete-url'] = reverse(self.url_name)
+        attrs['data-autocomplete-min-length'] = self.min_length
+        if self.forward:
+            attrs['data-autocomplete-forward'] = ','.join(
+                f'{param}:{field}' for param, field in self.forward.items()
+            )
+        return attrs
+
+    def _selected_choices(self, value):
+        """Return (value, label) pairs for the selected pks only."""
+        selected = [v for v in value if v not in ('', None)]
+        choices = getattr(self.choices, 'queryset', None)
+        if not selected or choices is None:
+            return []
+        try:
+            objects = list(self.choices.queryset.filter(pk__in=selected))
+        except (ValueError, TypeError, ValidationError):
+            return []
+        return [self.choices.choice(obj) for obj in objects]
+
+    def optgroups(self, name, value, attrs=None):
+        choices = []
+        field = getattr(self.choices, 'field', None)
+        if field is not None and field.empty_label is not None:
+            choices.append(('', field.empty_label))
+        choices.extend(self._selected_choices(value))
+
+        groups = []
+        for index, (option_value, option_label) in enumerate(choices):
+            selected = str(option_value) in value
+            option = self.create_option(name, option_value, option_label, selected, index, attrs=attrs)
+            groups.append((None, [option], index))
+        return groups
+
+
+def autocomplete_response(queryset, label, limit=AUTOCOMPLETE_LIMIT):
+    """JSON response with up to ``limit`` results labelled by ``label(obj)``."""
+    rows = list(queryset[:limit + 1])
+    return JsonResponse({
+        'results': [{'id': obj.pk, 'text': label(obj)} for obj in rows[:limit]],
+        'more': len(rows) > limit,
+    })
@@ -0,0 +1,161 @@
+"""
+Namespaced, versioned caching on top of the Django cache.
+
+Cached values belong to one or more namespaces, one per app
+(``holdingtax``, ``certification``, ``complaint``, ...). Every namespace has
+a version number stored in the cache, and the versions of a value's
+namespaces are part of its key. Saving or deleting any model of an app
+bumps that app's version once the transaction commits, so everything
+derived from it is recomputed on the next read; stale entries are never
+read again and simply expire.
+
+Code that writes with ``QuerySet.update()`` or ``bulk_create()`` sends no
+signals and must call ``invalidate_on_commit()`` itself.
+
+Versions only reach other worker processes through a shared backend
+(``file`` or ``redis``). With a per-process backend (``locmem``) a write
+invalidates the worker that made it, and the others serve their copies
+until CACHE_TIMEOUT; ``cache_is_shared()`` tells callers which case they
+are in, and the ``caching.W001`` check warns about it outside DEBUG.
+
+Helpers:
+
+* ``get_or_set(namespaces, name, compute)`` for any picklable value;
+* ``cached_queryset``, ``cached_aggregate`` and ``cached_count``;
+* ``cached_page`` for ``Paginator`` pages (count and rows both cached);
+* the ``{% namespace_version %}`` template tag (``cache_namespaces``
+  library) to use as a ``{% cache %}`` fragment vary-on argument.
+"""
+import hashlib
+import random
+import time
+from functools import partial
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+# App labels whose models invalidate their namespace when written
+NAMESPACES = (
+    'citizen', 'holdingtax', 'tradelicense', 'certification', 'tender',
+    'citizencharter', 'complaint', 'contact',
+)
+
+_VERSION_KEY = 'ns:{}:version'
+
+# Backends whose entries live in one process only
+_PER_PROCESS_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def _new_version():
+    # Never reuses an old version, or entries cached under it would become
+    # readable again; the random part keeps two bumps in the same
+    # millisecond apart
+    return int(time.time() * 1000) * 1000 + random.randrange(1000)
+
+
+def default_timeout():
+    return getattr(settings, 'CACHE_TIMEOUT', 300)
+
+
+def cache_is_shared():
+    """Whether the default cache is seen by every worker process (not ``locmem``)."""
+    return settings.CACHES['default']['BACKEND'] not in _PER_PROCESS_BACKENDS
+
+
+def namespace_versions(namespaces):
+    """Current version of each namespace, in order."""
+    keys = [_VERSION_KEY.format(name) for name in namespaces]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, _new_version(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def invalidate(*namespaces):
+    """
+    Bump the versions of ``namespaces`` now.
+
+    Each bump writes a fresh version rather than incrementing: ``incr`` is a
+    get-then-set on the file backend, so two concurrent bumps could both
+    write the same successor. With fresh versions the last write wins and
+    either one still differs from every version read before.
+    """
+    cache.set_many({_VERSION_KEY.format(name): _new_version() for name in namespaces}, timeout=None)
+
+
+def invalidate_on_commit(*namespaces):
+    """Bump the versions of ``namespaces`` when the current transaction commits."""
+    transaction.on_commit(partial(invalidate, *namespaces))
+
+
+def make_key(namespaces, name, *parts):
+    """Cache key for ``name`` and ``parts`` under the current namespace versions."""
+    versions = '.'.join(f'{ns}{version}' for ns, version in zip(namespaces, namespace_versions(namespaces)))
+    key = f'{name}:{versions}'
+    if parts:
+        key += ':' + hashlib.md5(repr(parts).encode()).hexdigest()
+    return key
+
+
+def get_or_set(namespaces, name, compute, *parts, timeout=None):
+    """Cached value of ``compute()``, recomputed after a write to any of ``namespaces``."""
+    key = make_key(namespaces, name, *parts)
+    missing = object()
+    value = cache.get(key, missing)
+    if value is missing:
+        value = compute()
+        cache.set(key, value, default_timeout() if timeout is None else timeout)
+    return value
+
+
+def cached_queryset(namespaces, name, queryset, *parts, timeout=None):
+    """The rows of ``queryset`` as a list."""
+    return get_or_set(namespaces, name, lambda: list(queryset), *parts, timeout=timeout)
+
+
+def cached_aggregate(namespaces, name, queryset, *parts, timeout=None, **aggregates):
+    """``queryset.aggregate(**aggregates)``."""
+    return get_or_set(namespaces, name, lambda: queryset.aggregate(**aggregates), *parts, timeout=timeout)
+
+
+def cached_count(namespaces, name, queryset, *parts, timeout=None):
+    return get_or_set(namespaces, name, queryset.count, *parts, timeout=timeout)
+
+
+def cached_page(namespaces, name, queryset, per_page, number, *parts, timeout=None):
+    """``Paginator(queryset, per_page).get_page(number)`` with the count and the page's rows cached."""
+    paginator = Paginator(queryset, per_page)
+    paginator.count = cached_count(namespaces, f'{name}:count', queryset, *parts, timeout=timeout)
+    page = paginator.get_page(number)
+    page.object_list = cached_queryset(
+        namespaces, f'{name}:page', page.object_list, page.number, *parts, timeout=timeout
+    )
+    return page
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.DEBUG or cache_is_shared():
+        return []
+    return [checks.Warning(
+        'The default cache is per process, so invalidation does not reach other workers.',
+        hint="Set CACHE_BACKEND to 'file' or 'redis' when running more than one worker.",
+        id='caching.W001',
+    )]
+
+
+@receiver(post_save, dispatch_uid='caching_invalidate_on_save')
+@receiver(post_delete, dispatch_uid='caching_invalidate_on_delete')
+def invalidate_model_namespace(sender, **kwargs):
+    if sender._meta.app_label in NAMESPACES:
+        invalidate_on_commit(sender._meta.app_label)
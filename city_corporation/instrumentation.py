@@ -0,0 +1,430 @@
+"""
+Per-request SQL and latency instrumentation.
+
+``RequestMetricsMiddleware`` wraps every database connection with an
+execute wrapper for the duration of a request and records:
+
+* the number of queries and the total time spent in the database;
+* duplicate queries: the same SQL run more than once with the same
+  parameters, and repeated fingerprints (the same SQL with different
+  parameters, the usual shape of an N+1);
+* the time spent rendering templates (needs the ``TimedDjangoTemplates``
+  backend; queries run lazily from a template count towards both);
+* the total response time.
+
+Each request is written as one JSON log line on this module's logger
+(WARNING when it runs more than REQUEST_METRICS_QUERY_WARNING queries or
+repeats a query, INFO otherwise), returned as ``X-DB-*`` response headers
+when REQUEST_METRICS_HEADERS is on (the default with DEBUG), and
+aggregated per URL name for the Prometheus ``/metrics`` endpoint.
+
+Each worker process keeps its metrics in memory and writes them, at most
+once a second, to its own file in METRICS_DIR (one directory per host).
+``/metrics`` sums the files of every worker, so a scrape sees the whole
+host whichever worker answers it. The file of a worker that has exited
+(gunicorn recycles them after ``max_requests``) is folded into
+``retired.json`` first, so totals never go down between scrapes.
+"""
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from contextlib import ExitStack
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+# Fingerprints listed in a log line
+TOP_FINGERPRINTS = 5
+# Seconds between writes of a worker's metrics file
+FLUSH_INTERVAL = 1.0
+RETIRED_FILE = 'retired.json'
+
+_current = ContextVar('request_metrics', default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """SQL with literals and IN-lists collapsed, so repeats differing only in values match."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """Execute wrapper collecting the queries run while it is installed."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.render_duration = 0.0
+        self.rendering = 0
+        self.fingerprints = {}
+        self.exact = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            key = fingerprint(sql)
+            self.fingerprints[key] = self.fingerprints.get(key, 0) + 1
+            exact = (sql, repr(params))
+            self.exact[exact] = self.exact.get(exact, 0) + 1
+
+    def record(self):
+        """Installs the recorder on every database connection (a context manager)."""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+    @property
+    def duplicate_count(self):
+        """Queries that repeat an earlier query with the same parameters."""
+        return sum(count - 1 for count in self.exact.values())
+
+    @property
+    def similar_count(self):
+        """Queries that repeat an earlier fingerprint."""
+        return sum(count - 1 for count in self.fingerprints.values())
+
+    def repeated(self, limit=TOP_FINGERPRINTS):
+        """Most repeated fingerprints as ``[{'id', 'count', 'sql'}]``."""
+        repeated = sorted(
+            ((count, sql) for sql, count in self.fingerprints.items() if count > 1), reverse=True
+        )[:limit]
+        return [
+            {'id': hashlib.md5(sql.encode()).hexdigest()[:12], 'count': count, 'sql': sql[:300]}
+            for count, sql in repeated
+        ]
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        recorder = _current.get()
+        if recorder is None or recorder.rendering:
+            return super().render(context, request)
+        recorder.rendering += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            recorder.render_duration += time.perf_counter() - started
+            recorder.rendering -= 1
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Django template backend that reports render time to the current request's recorder."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+        self.total += 1
+        self.sum += value
+
+    def snapshot(self):
+        return [self.counts, self.total, self.sum]
+
+    def merge(self, snapshot):
+        counts, total, total_sum = snapshot
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, counts)]
+        self.total += total
+        self.sum += total_sum
+
+
+class MetricsRegistry:
+    """Request metrics keyed by URL name, shared by the workers of a host through METRICS_DIR."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.latency = {}
+        self.query_counts = {}
+        self.requests = {}
+        self.counters = {}
+        self._pid = os.getpid()
+        self._file = f'{self._pid}-{uuid.uuid4().hex[:8]}.json'
+        self._flushed = 0.0
+
+    def observe(self, view, method, status, duration, recorder):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked from a process that had already counted (preload_app)
+                self.reset()
+            self.latency.setdefault(view, _Histogram(LATENCY_BUCKETS)).observe(duration)
+            self.query_counts.setdefault(view, _Histogram(QUERY_COUNT_BUCKETS)).observe(recorder.count)
+            key = (view, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            totals = self.counters.setdefault(view, [0, 0.0, 0, 0.0])
+            totals[0] += recorder.count
+            totals[1] += recorder.duration
+            totals[2] += recorder.duplicate_count
+            totals[3] += recorder.render_duration
+            if time.monotonic() - self._flushed >= FLUSH_INTERVAL:
+                self._flush()
+
+    # Spool
+
+    def snapshot(self):
+        return {
+            'requests': [[*key, count] for key, count in self.requests.items()],
+            'latency': {view: histogram.snapshot() for view, histogram in self.latency.items()},
+            'query_counts': {view: histogram.snapshot() for view, histogram in self.query_counts.items()},
+            'counters': self.counters,
+        }
+
+    def merge(self, snapshot):
+        for view, method, status, count in snapshot['requests']:
+            key = (view, method, status)
+            self.requests[key] = self.requests.get(key, 0) + count
+        for histograms, buckets, name in (
+            (self.latency, LATENCY_BUCKETS, 'latency'),
+            (self.query_counts, QUERY_COUNT_BUCKETS, 'query_counts'),
+        ):
+            for view, histogram in snapshot[name].items():
+                histograms.setdefault(view, _Histogram(buckets)).merge(histogram)
+        for view, values in snapshot['counters'].items():
+            totals = self.counters.setdefault(view, [0, 0.0, 0, 0.0])
+            for index, value in enumerate(values):
+                totals[index] += value
+
+    def _flush(self):
+        """Write this worker's metrics to its file in METRICS_DIR (called with the lock held)."""
+        directory = metrics_dir()
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            _write_json(directory / self._file, self.snapshot())
+        except OSError:
+            logger.exception('Could not write request metrics to %s', directory)
+        self._flushed = time.monotonic()
+
+    def collect(self):
+        """A registry holding the sum of every worker's metrics on this host."""
+        with self._lock:
+            self._flush()
+        directory = metrics_dir()
+        total = MetricsRegistry()
+        with _locked(directory):
+            _retire_exited_workers(directory)
+            for path in directory.glob('*.json'):
+                snapshot = _read_json(path)
+                if snapshot is not None:
+                    total.merge(snapshot)
+        return total
+
+    def render(self):
+        """The metrics of every worker on this host in the Prometheus text exposition format."""
+        return self.collect().render_local()
+
+    def render_local(self):
+        """This registry's metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            lines += [
+                '# HELP rcc_http_requests_total Requests handled, by URL name, method and status.',
+                '# TYPE rcc_http_requests_total counter',
+            ]
+            for (view, method, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'rcc_http_requests_total{{view="{_label(view)}",method="{method}",status="{status}"}} {count}'
+                )
+            lines += _histogram_lines(
+                'rcc_http_request_duration_seconds', 'Response time by URL name.', self.latency
+            )
+            lines += _histogram_lines(
+                'rcc_db_queries_per_request', 'SQL queries per request by URL name.', self.query_counts
+            )
+            for index, name, kind, help_text in (
+                (0, 'rcc_db_queries_total', 'counter', 'SQL queries run, by URL name.'),
+                (1, 'rcc_db_query_seconds_total', 'counter', 'Time spent in the database, by URL name.'),
+                (2, 'rcc_db_duplicate_queries_total', 'counter', 'Queries repeating an earlier identical query.'),
+                (3, 'rcc_template_render_seconds_total', 'counter', 'Time spent rendering templates.'),
+            ):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+                for view, totals in sorted(self.counters.items()):
+                    lines.append(f'{name}{{view="{_label(view)}"}} {_number(totals[index])}')
+        return '\n'.join(lines) + '\n'
+
+
+def metrics_dir():
+    return Path(settings.METRICS_DIR)
+
+
+def _write_json(path, data):
+    temporary = path.with_suffix('.tmp')
+    temporary.write_text(json.dumps(data))
+    os.replace(temporary, path)
+
+
+def _read_json(path):
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+class _locked:
+    """Exclusive lock on METRICS_DIR, so two scrapes do not retire the same worker twice."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def __enter__(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.directory / '.lock', 'w')
+        fcntl.flock(self.file, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc_info):
+        fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _retire_exited_workers(directory):
+    """Fold the files of workers that have exited into RETIRED_FILE (called with the lock held)."""
+    exited = []
+    for path in directory.glob('*-*.json'):
+        pid = path.name.split('-', 1)[0]
+        if pid.isdigit() and not _is_running(int(pid)):
+            exited.append(path)
+    if not exited:
+        return
+    retired = MetricsRegistry()
+    snapshot = _read_json(directory / RETIRED_FILE)
+    if snapshot is not None:
+        retired.merge(snapshot)
+    for path in exited:
+        snapshot = _read_json(path)
+        if snapshot is not None:
+            retired.merge(snapshot)
+    _write_json(directory / RETIRED_FILE, retired.snapshot())
+    for path in exited:
+        path.unlink(missing_ok=True)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _histogram_lines(name, help_text, histograms):
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for view, histogram in sorted(histograms.items()):
+        label = _label(view)
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            lines.append(f'{name}_bucket{{view="{label}",le="{bound}"}} {count}')
+        lines.append(f'{name}_bucket{{view="{label}",le="+Inf"}} {histogram.total}')
+        lines.append(f'{name}_sum{{view="{label}"}} {_number(histogram.sum)}')
+        lines.append(f'{name}_count{{view="{label}"}} {histogram.total}')
+    return lines
+
+
+registry = MetricsRegistry()
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.headers = getattr(settings, 'REQUEST_METRICS_HEADERS', settings.DEBUG)
+        self.query_warning = getattr(settings, 'REQUEST_METRICS_QUERY_WARNING', 50)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        token = _current.set(recorder)
+        started = time.perf_counter()
+        try:
+            with recorder.record():
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        duration = time.perf_counter() - started
+
+        view = _view_name(request)
+        registry.observe(view, request.method, response.status_code, duration, recorder)
+        if self.headers:
+            response['X-DB-Query-Count'] = str(recorder.count)
+            response['X-DB-Time-Ms'] = f'{recorder.duration * 1000:.1f}'
+            response['X-DB-Duplicate-Queries'] = str(recorder.duplicate_count)
+            response['X-DB-Similar-Queries'] = str(recorder.similar_count)
+            response['X-Render-Time-Ms'] = f'{recorder.render_duration * 1000:.1f}'
+            response['X-Response-Time-Ms'] = f'{duration * 1000:.1f}'
+        self._log(request, response, view, duration, recorder)
+        return response
+
+    def _log(self, request, response, view, duration, recorder):
+        noisy = recorder.count > self.query_warning or recorder.duplicate_count > 0
+        level = logging.WARNING if noisy else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        line = {
+            'event': 'request',
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 1),
+            'queries': recorder.count,
+            'db_ms': round(recorder.duration * 1000, 1),
+            'duplicate_queries': recorder.duplicate_count,
+            'similar_queries': recorder.similar_count,
+            'render_ms': round(recorder.render_duration * 1000, 1),
+        }
+        if recorder.similar_count:
+            line['repeated'] = recorder.repeated()
+        logger.log(level, json.dumps(line))
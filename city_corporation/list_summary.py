@@ -0,0 +1,35 @@
+"""
+Summary totals for list pages.
+
+List pages show counters over the filtered set (pending, overdue, total
+fees, ...). Computed one ``count()`` or ``aggregate()`` at a time they cost
+a full scan each, on every page and every filter change. ``list_summary``
+computes all of a view's totals with a single ``aggregate()`` using
+filtered ``Count``s and ``Sum``s, and caches the result per view and filter
+parameters for LIST_SUMMARY_TIMEOUT seconds (or until a write to one of the
+cache namespaces). The summary's ``total`` is exact and can be handed to
+``KeysetPaginator`` so the page does not count the rows again.
+"""
+from django.conf import settings
+from django.db.models import Count, Q
+
+from .caching import cached_aggregate
+
+
+def count_where(*args, **kwargs):
+    """``Count`` of the rows matching ``Q(*args, **kwargs)``."""
+    return Count('pk', filter=Q(*args, **kwargs))
+
+
+def list_summary(queryset, namespaces, name, params, **aggregates):
+    """
+    ``queryset.aggregate(total=Count('pk'), **aggregates)`` in one query.
+
+    ``params`` are the request's filter parameters; each combination is
+    cached separately.
+    """
+    return cached_aggregate(
+        namespaces, f'list_summary:{name}', queryset, sorted(params.items()),
+        timeout=getattr(settings, 'LIST_SUMMARY_TIMEOUT', 60),
+        total=Count('pk'), **aggregates,
+    )
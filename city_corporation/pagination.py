@@ -0,0 +1,236 @@
+"""
+Keyset (cursor) pagination for list views.
+
+OFFSET paging makes deep pages scan and discard every earlier row, and
+Django's Paginator runs an exact COUNT(*) over the whole filtered set.
+KeysetPaginator instead seeks past the last row shown using the queryset's
+ordering columns (always ending with the primary key as a tie-breaker), so
+every page costs the same as the first. The total is optional: exact,
+capped (the default) or a planner estimate on PostgreSQL; a caller that
+already knows the exact total (see ``list_summary``) passes it as ``total``.
+
+Ordering columns must be non-null fields or annotations on the model. Cursor
+values are converted with their field's ``to_python()``; a cursor that does
+not convert (tampered with, or from an older ordering) shows the first page.
+"""
+import base64
+import binascii
+import json
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connection
+from django.db.models import Model, Q
+from django.utils.functional import cached_property
+
+
+def encode_cursor(payload):
+    """Encode a cursor payload as a URL-safe token."""
+    raw = json.dumps(payload, default=str, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Decode a cursor token; returns None for missing or malformed tokens."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(payload, dict) or payload.get('d') not in ('next', 'prev'):
+        return None
+    if not isinstance(payload.get('v'), list) or not isinstance(payload.get('n', 1), int):
+        return None
+    return payload
+
+
+class KeysetPage:
+    """One page of a KeysetPaginator (mirrors the parts of Django's Page the templates use)."""
+
+    def __init__(self, object_list, number, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<Page {self.number}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @cached_property
+    def next_cursor(self):
+        if not self._has_next:
+            return ''
+        return self.paginator.cursor_for(self.object_list[-1], 'next', self.number + 1)
+
+    @cached_property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return ''
+        return self.paginator.cursor_for(self.object_list[0], 'prev', self.number - 1)
+
+
+class KeysetPaginator:
+    """Cursor paginator keyed on the queryset's ordering columns."""
+
+    def __init__(self, queryset, per_page, ordering=None, count_mode=None, count_limit=None, total=None):
+        ordering = list(ordering or queryset.query.order_by or queryset.model._meta.ordering)
+        if any(not isinstance(name, str) for name in ordering):
+            raise ValueError('KeysetPaginator only supports field-name orderings')
+        if not ordering or ordering[-1].lstrip('-') not in ('pk', 'id'):
+            descending = bool(ordering) and ordering[-1].startswith('-')
+            ordering.append('-pk' if descending else 'pk')
+
+        self.ordering = ordering
+        self.keys = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+        self.queryset = queryset.order_by(*ordering)
+        self.per_page = int(per_page)
+        self.count_mode = count_mode or getattr(settings, 'LIST_COUNT_MODE', 'capped')
+        self.count_limit = count_limit or getattr(settings, 'LIST_COUNT_LIMIT', 10000)
+        self.total = total
+
+    def _key_values(self, obj):
+        values = []
+        for field, _descending in self.keys:
+            value = obj
+            for part in field.split('__'):
+                value = getattr(value, part)
+            values.append(value.pk if isinstance(value, Model) else value)
+        return values
+
+    def _key_field(self, name):
+        annotation = self.queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        model = self.queryset.model
+        field = None
+        for part in name.split('__'):
+            field = model._meta.pk if part == 'pk' else model._meta.get_field(part)
+            model = field.related_model
+        return field.target_field if field.is_relation else field
+
+    def _cursor_values(self, values):
+        """The cursor's key values converted by their fields, or None when any is invalid."""
+        if len(values) != len(self.keys):
+            return None
+        converted = []
+        try:
+            for (name, _descending), value in zip(self.keys, values):
+                field = self._key_field(name)
+                if value is None or isinstance(value, (dict, list)):
+                    return None
+                converted.append(field.to_python(value))
+        except (FieldDoesNotExist, ValidationError, TypeError, ValueError):
+            return None
+        return converted
+
+    def cursor_for(self, obj, direction, number):
+        return encode_cursor({'v': self._key_values(obj), 'd': direction, 'n': number})
+
+    def _seek(self, values, forward):
+        """Q matching rows strictly after (forward) or before the given key values."""
+        condition = Q()
+        equal = {}
+        for (field, descending), value in zip(self.keys, values):
+            lookup = 'lt' if descending == forward else 'gt'
+            condition |= Q(**equal, **{f'{field}__{lookup}': value})
+            equal[field] = value
+        return condition
+
+    def get_page(self, cursor=None):
+        """Return the page addressed by ``cursor`` (the first page when empty or invalid)."""
+        payload = decode_cursor(cursor)
+        values = self._cursor_values(payload['v']) if payload is not None else None
+        if values is None:
+            rows = list(self.queryset[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], 1, self, len(rows) > self.per_page, False)
+
+        number = max(int(payload.get('n') or 1), 1)
+        if payload['d'] == 'next':
+            queryset = self.queryset.filter(self._seek(values, forward=True))
+            rows = list(queryset[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], number, self, len(rows) > self.per_page, True)
+
+        queryset = self.queryset.filter(self._seek(values, forward=False)).reverse()
+        rows = list(queryset[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page and number > 1
+        return KeysetPage(rows[:self.per_page][::-1], number, self, True, has_previous)
+
+    # Totals
+
+    def _estimated_count(self):
+        """Planner row estimate for an unfiltered PostgreSQL table, or None."""
+        if connection.vendor != 'postgresql' or self.queryset.query.where:
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [self.queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < 0:
+            return None
+        return row[0]
+
+    @cached_property
+    def _count(self):
+        """Return (count, kind) where kind is 'exact', 'capped', 'estimate' or None."""
+        if self.count_mode == 'none':
+            return None, None
+        if self.total is not None:
+            return self.total, 'exact'
+        if self.count_mode == 'exact':
+            return self.queryset.count(), 'exact'
+        if self.count_mode == 'approximate':
+            estimate = self._estimated_count()
+            if estimate is not None:
+                return estimate, 'estimate'
+        count = self.queryset.order_by()[:self.count_limit + 1].count()
+        if count > self.count_limit:
+            return self.count_limit, 'capped'
+        return count, 'exact'
+
+    @property
+    def count(self):
+        return self._count[0]
+
+    @property
+    def count_is_exact(self):
+        return self._count[1] == 'exact'
+
+    @property
+    def display_count(self):
+        """Total for display: '10000+' when capped, '~1234567' when estimated."""
+        count, kind = self._count
+        if kind == 'capped':
+            return f'{count}+'
+        if kind == 'estimate':
+            return f'~{count}'
+        return '' if count is None else count
+
+    @property
+    def num_pages(self):
+        count, kind = self._count
+        if count is None:
+            return ''
+        pages = max((count + self.per_page - 1) // self.per_page, 1)
+        return pages if kind == 'exact' else f'{pages}+'
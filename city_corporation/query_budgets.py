@@ -0,0 +1,260 @@
+"""
+Query budgets for the list, detail and dashboard views.
+
+Templates dereference foreign keys (``holding_tax.holding_property.owner``)
+and several ``__str__`` methods chain them (``Street``, ``Property``,
+``HoldingTax``, ``Certification``, ``PropertyAttachment``), so a missing
+``select_related`` turns a page into one query per row. ``check_budgets``
+seeds ``rows`` objects of every kind, renders each view in ``BUDGETS`` as a
+superuser and reports a view as failing when it
+
+* runs more queries than its declared budget, or
+* repeats one query fingerprint more than ``repeat_limit`` times (a query
+  per row: pages show at least 12 seeded rows, far above the limit).
+
+Everything runs inside a transaction that is rolled back and against a
+private file cache in a temporary directory, so the check can be pointed at a development
+database (``python manage.py check_query_budgets``) without touching the
+cache the running site shares. When a view legitimately needs more queries, raise
+its budget here in the same change.
+"""
+import tempfile
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from certification.models import CertificationType, Certification
+from citizen.models import Citizen, CitizenDocument
+from citizencharter.models import CitizenCharter
+from complaint.models import Complaint, ComplaintCluster
+from holdingtax.models import (
+    Area, Street, PropertyType, Property, TaxPeriod, HoldingTax, TaxPayment,
+    AttachmentType, PropertyAttachment,
+)
+from tender.models import Tender
+from tradelicense.models import TradeLicense
+from .caching import NAMESPACES, invalidate
+from .instrumentation import QueryRecorder
+from .reference_data import invalidate_reference_tables, reference_data
+
+
+DEFAULT_ROWS = 30
+DEFAULT_REPEAT_LIMIT = 5
+SEED_PREFIX = 'QB'
+
+
+@dataclass(frozen=True)
+class ViewBudget:
+    url_name: str
+    budget: int
+    # Seeded object whose pk is passed as the URL's ``pk``
+    obj: str = ''
+    repeat_limit: int = DEFAULT_REPEAT_LIMIT
+    query: dict = field(default_factory=dict)
+
+    def url(self, objects):
+        kwargs = {'pk': objects[self.obj].pk} if self.obj else None
+        return reverse(self.url_name, kwargs=kwargs)
+
+
+BUDGETS = [
+    ViewBudget('home', 2),
+    ViewBudget('dashboard', 10),
+    ViewBudget('public_tender_list', 4),
+    ViewBudget('public_citizencharter_list', 4),
+    ViewBudget('citizen:list', 4),
+    ViewBudget('citizen:detail', 5, obj='citizen'),
+    ViewBudget('holdingtax:list', 4),
+    ViewBudget('holdingtax:detail', 8, obj='holding_tax'),
+    ViewBudget('holdingtax:property_list', 4),
+    ViewBudget('holdingtax:property_detail', 7, obj='property'),
+    ViewBudget('tradelicense:list', 4),
+    ViewBudget('tradelicense:detail', 3, obj='trade_license'),
+    ViewBudget('certification:list', 5),
+    ViewBudget('certification:detail', 3, obj='certification'),
+    ViewBudget('tender:list', 11),
+    ViewBudget('tender:detail', 3, obj='tender'),
+    ViewBudget('complaint:list', 4),
+    ViewBudget('complaint:detail', 3, obj='complaint'),
+    ViewBudget('complaint:cluster_list', 4),
+    ViewBudget('complaint:cluster_detail', 5, obj='cluster'),
+    ViewBudget('citizencharter:list', 7),
+    ViewBudget('citizencharter:detail', 3, obj='charter'),
+    # The citizen, field officer and officer portal views have no templates
+    # yet; add them here together with their templates.
+]
+
+
+@dataclass
+class BudgetResult:
+    view: ViewBudget
+    url: str
+    status: int
+    queries: int
+    repeated: list
+
+    @property
+    def over_budget(self):
+        return self.queries > self.view.budget
+
+    @property
+    def per_row(self):
+        """Fingerprints repeated more often than the view allows."""
+        return [entry for entry in self.repeated if entry['count'] > self.view.repeat_limit]
+
+    @property
+    def failed(self):
+        return self.status != 200 or self.over_budget or bool(self.per_row)
+
+
+def seed(user, rows=DEFAULT_ROWS):
+    """Create ``rows`` objects of each kind; returns one sample of each by name."""
+    today = timezone.localdate()
+    now = timezone.now()
+    p = SEED_PREFIX
+
+    Citizen.objects.bulk_create([
+        Citizen(
+            citizen_id=f'{p}-C{n}', first_name=f'Budget{n}', last_name='Citizen',
+            national_id=f'{p}{n:010d}', email=f'budget{n}@example.com', created_by=user,
+        ) for n in range(rows)
+    ])
+    citizens = list(Citizen.objects.filter(citizen_id__startswith=f'{p}-C').order_by('pk'))
+    owner = citizens[0]
+    Citizen.objects.filter(pk=owner.pk).update(user=user)
+    CitizenDocument.objects.bulk_create([
+        CitizenDocument(citizen=owner, document_type='ID', document_number=f'{p}{n}', file=f'citizens/documents/{p}{n}.pdf')
+        for n in range(rows)
+    ])
+
+    area = Area.objects.create(name=f'{p} Area', code=f'{p}-A')
+    Street.objects.bulk_create([
+        Street(name=f'{p} Street {n}', code=f'{p}-S{n}', area=area) for n in range(rows)
+    ])
+    streets = list(Street.objects.filter(code__startswith=f'{p}-S').order_by('pk'))
+    property_type = PropertyType.objects.create(name=f'{p} Residential', code=f'{p}-RES')
+    attachment_type = AttachmentType.objects.create(name=f'{p} Deed', code=f'{p}-DEED')
+    Property.objects.bulk_create([
+        Property(
+            property_number=f'{p}-P{n}', property_type=property_type,
+            # Half the properties belong to the logged-in citizen, for the citizen views
+            owner=owner if n % 2 else citizens[n], address=f'{n} Budget Road', area=area,
+            street=streets[n], area_sqft=Decimal('1200.00'), assessed_value=Decimal('900000.00'),
+            tax_rate=Decimal('1.50'), status='PENDING_APPROVAL' if n % 3 else 'APPROVED',
+            created_by=user, submitted_by=user,
+        ) for n in range(rows)
+    ])
+    properties = list(Property.objects.filter(property_number__startswith=f'{p}-P').order_by('pk'))
+    PropertyAttachment.objects.bulk_create([
+        PropertyAttachment(
+            property=properties[1], attachment_type=attachment_type, title=f'Deed {n}',
+            file=f'properties/{p}{n}.pdf', uploaded_by=user,
+        ) for n in range(rows)
+    ])
+
+    period = TaxPeriod.objects.create(name=f'{p} Period', start_date=today - timedelta(days=180), end_date=today + timedelta(days=185))
+    HoldingTax.objects.bulk_create([
+        HoldingTax(
+            tax_number=f'{p}-T{n}', holding_property=properties[n], tax_period=period,
+            tax_amount=Decimal('13500.00'), due_date=period.end_date,
+            status='PENDING' if n % 2 else 'PARTIAL', created_by=user,
+        ) for n in range(rows)
+    ])
+    holding_taxes = list(HoldingTax.objects.filter(tax_number__startswith=f'{p}-T').order_by('pk'))
+    TaxPayment.objects.bulk_create([
+        TaxPayment(
+            payment_number=f'{p}-PAY{n}', holding_tax=holding_taxes[0], payment_date=today,
+            amount=Decimal('100.00'), payment_method='CASH', received_by=user,
+        ) for n in range(rows)
+    ])
+
+    TradeLicense.objects.bulk_create([
+        TradeLicense(
+            citizen=owner if n % 2 else citizens[n], license_number=f'{p}-L{n}',
+            business_name=f'Budget Shop {n}', business_type='Retail', business_address=f'{n} Market Road',
+            issue_date=today, expiry_date=today + timedelta(days=365), license_fee=Decimal('2500.00'),
+        ) for n in range(rows)
+    ])
+    certification_type = CertificationType.objects.create(name=f'{p} Residence', code=f'{p}-RES')
+    Certification.objects.bulk_create([
+        Certification(
+            citizen=owner if n % 2 else citizens[n], certification_type=certification_type,
+            certificate_number=f'{p}-CERT{n}', status='pending', created_by=user,
+        ) for n in range(rows)
+    ])
+    Tender.objects.bulk_create([
+        Tender(
+            title=f'Budget Tender {n}', description='Road resurfacing', tender_number=f'{p}-TN{n}',
+            opening_date=now, closing_date=now + timedelta(days=30), estimated_value=Decimal('5000000.00'),
+            status='published',
+        ) for n in range(rows)
+    ])
+    CitizenCharter.objects.bulk_create([
+        CitizenCharter(
+            title=f'Budget Service {n}', service_type='tax', description='Service description',
+            processing_time='7 working days', required_documents='National ID',
+        ) for n in range(rows)
+    ])
+    Complaint.objects.bulk_create([
+        Complaint(
+            complaint_number=f'{p}-COMP{n}', citizen=citizens[n], subject=f'Budget complaint {n}',
+            description='Streetlight not working', category='Streetlights',
+        ) for n in range(rows)
+    ])
+    complaints = list(Complaint.objects.filter(complaint_number__startswith=f'{p}-COMP').order_by('pk'))
+    cluster = ComplaintCluster.objects.create(representative=complaints[0], category='Streetlights', size=rows)
+    Complaint.objects.filter(pk__in=[complaint.pk for complaint in complaints]).update(cluster=cluster)
+
+    return {
+        'citizen': owner,
+        'property': properties[1],
+        'holding_tax': holding_taxes[0],
+        'trade_license': TradeLicense.objects.filter(license_number=f'{p}-L1').get(),
+        'certification': Certification.objects.filter(certificate_number=f'{p}-CERT1').get(),
+        'tender': Tender.objects.filter(tender_number=f'{p}-TN0').get(),
+        'charter': CitizenCharter.objects.filter(title='Budget Service 0').get(),
+        'complaint': complaints[0],
+        'cluster': cluster,
+    }
+
+
+def measure(client, view, objects):
+    """Render one view, with cold caches, and record its queries (only under check_budgets' private cache)."""
+    url = view.url(objects)
+    invalidate(*NAMESPACES)
+    invalidate_reference_tables()
+    recorder = QueryRecorder()
+    with recorder.record():
+        response = client.get(url, view.query)
+    return BudgetResult(view, url, response.status_code, recorder.count, recorder.repeated(limit=None))
+
+
+def check_budgets(views=None, rows=DEFAULT_ROWS):
+    """Seed data, render ``views`` (default: all of ``BUDGETS``) and roll back; returns the results."""
+    views = BUDGETS if views is None else views
+    # The test client's requests come from 'testserver'
+    hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+    # A shared backend like the site's, so roles and reference data are cached the same way
+    with tempfile.TemporaryDirectory(prefix='query-budgets-') as cache_dir, override_settings(
+        ALLOWED_HOSTS=hosts,
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': cache_dir}},
+    ), transaction.atomic():
+        reference_data.clear()
+        user = User.objects.create_superuser(f'{SEED_PREFIX.lower()}-budget', f'{SEED_PREFIX.lower()}@example.com', None)
+        objects = seed(user, rows)
+        client = Client(raise_request_exception=False)
+        client.force_login(user)
+        # Warm per-process caches (content types, roles) so they do not count
+        client.get(reverse('home'))
+        results = [measure(client, view, objects) for view in views]
+        transaction.set_rollback(True)
+    # Drop the rolled-back rows from this process's reference tables
+    reference_data.clear()
+    return results
@@ -0,0 +1,171 @@
+"""
+In-process registry of the active rows of small lookup tables.
+
+Property types, areas, streets, tax periods, certification types and
+attachment types change rarely but are read on every form render (one
+``<option>`` per row) and validated on every submit. ``reference_data``
+loads the active rows of each table once per worker process and keeps them
+in ``Meta.ordering`` order with a pk index, so rendering and validating a
+``ReferenceChoiceField`` runs no query.
+
+Saving or deleting a reference row bumps the table's version in the cache
+(``city_corporation.caching``) when the transaction commits; workers
+compare that version on access and reload the table when it has changed.
+Tables whose labels include another table (streets show their area) are
+reloaded with it. Only a shared cache backend carries the version to other
+workers; with a per-process one (``locmem``) each worker also reloads its
+tables once they are CACHE_TIMEOUT seconds old, so rows added or
+deactivated elsewhere are picked up within that time.
+"""
+import copy
+import threading
+import time
+from django import forms
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import cache_is_shared, default_timeout, invalidate, invalidate_on_commit, namespace_versions
+
+
+# Model label -> related tables joined for __str__
+REFERENCE_TABLES = {
+    'holdingtax.PropertyType': (),
+    'holdingtax.Area': (),
+    'holdingtax.Street': ('area',),
+    'holdingtax.TaxPeriod': (),
+    'holdingtax.AttachmentType': (),
+    'certification.CertificationType': (),
+}
+
+
+def _namespace(label):
+    return f'reference:{label}'
+
+
+def _dependents(label):
+    """Tables to reload when a row of ``label`` is written."""
+    model = apps.get_model(label)
+    return [label] + [
+        other for other, related in REFERENCE_TABLES.items()
+        if any(apps.get_model(other)._meta.get_field(name).related_model is model for name in related)
+    ]
+
+
+class ReferenceTable:
+    """The active rows of one table, in order, with a pk index and choice labels."""
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.loaded = time.monotonic()
+        self.rows = rows
+        self.by_pk = {row.pk: row for row in rows}
+        self.choices = [(row.pk, str(row)) for row in rows]
+
+
+class ReferenceData:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables = {}
+
+    def _is_current(self, table, version):
+        if table is None or table.version != version:
+            return False
+        # Other workers' writes never reach a per-process cache
+        return cache_is_shared() or time.monotonic() - table.loaded < default_timeout()
+
+    def table(self, model):
+        label = model._meta.label
+        if label not in REFERENCE_TABLES:
+            raise LookupError(f'{label} is not a reference table')
+        version = namespace_versions([_namespace(label)])[0]
+        table = self._tables.get(label)
+        if not self._is_current(table, version):
+            with self._lock:
+                table = self._tables.get(label)
+                if not self._is_current(table, version):
+                    rows = model._default_manager.filter(is_active=True)
+                    if REFERENCE_TABLES[label]:
+                        rows = rows.select_related(*REFERENCE_TABLES[label])
+                    table = self._tables[label] = ReferenceTable(version, list(rows))
+        return table
+
+    def objects(self, model):
+        """Active rows of ``model`` in display order (shared; do not modify)."""
+        return self.table(model).rows
+
+    def choices(self, model):
+        """``[(pk, label)]`` of the active rows of ``model``."""
+        return self.table(model).choices
+
+    def get(self, model, pk):
+        """A copy of the active row ``pk`` of ``model``, or None."""
+        row = self.table(model).by_pk.get(pk)
+        return copy.copy(row) if row is not None else None
+
+    def clear(self):
+        """Forget every loaded table in this process (other workers keep theirs)."""
+        with self._lock:
+            self._tables.clear()
+
+
+reference_data = ReferenceData()
+
+
+def invalidate_reference_tables(*labels):
+    """Make workers reload ``labels`` (default: all tables) now; for writes that send no signals."""
+    invalidate(*(_namespace(label) for label in labels or REFERENCE_TABLES))
+
+
+class ReferenceChoiceIterator(forms.models.ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for obj in reference_data.objects(self.queryset.model):
+            yield self.choice(obj)
+
+    def __len__(self):
+        return len(reference_data.objects(self.queryset.model)) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(reference_data.objects(self.queryset.model))
+
+
+class ReferenceChoiceField(forms.ModelChoiceField):
+    """``ModelChoiceField`` over the active rows of a reference table, served from ``reference_data``.
+
+    Use it through ``Meta.field_classes`` on a ModelForm; the queryset is
+    narrowed to active rows so widgets that query it (``AutocompleteSelect``)
+    agree with the choices.
+    """
+
+    iterator = ReferenceChoiceIterator
+
+    def __init__(self, queryset, **kwargs):
+        super().__init__(queryset.filter(is_active=True), **kwargs)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        self.validate_no_null_characters(value)
+        model = self.queryset.model
+        if isinstance(value, model):
+            value = value.pk
+        try:
+            obj = reference_data.get(model, model._meta.pk.to_python(value))
+        except ValidationError:
+            obj = None
+        if obj is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value},
+            )
+        return obj
+
+
+@receiver(post_save, dispatch_uid='reference_data_on_save')
+@receiver(post_delete, dispatch_uid='reference_data_on_delete')
+def invalidate_reference_table(sender, **kwargs):
+    label = sender._meta.label
+    if label in REFERENCE_TABLES:
+        invalidate_on_commit(*(_namespace(dependent) for dependent in _dependents(label)))
@@ -46,9 +46,12 @@ INSTALLED_APPS = [
     'citizencharter',
     'complaint',
     'contact',
+    'dashboard',
+    'sequences',
 ]
 
 MIDDLEWARE = [
+    'city_corporation.instrumentation.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -62,7 +65,8 @@ ROOT_URLCONF = 'city_corporation.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to RequestMetricsMiddleware
+        'BACKEND': 'city_corporation.instrumentation.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -72,6 +76,9 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'libraries': {
+                'cache_namespaces': 'city_corporation.templatetags.cache_namespaces',
+            },
         },
     },
 ]
@@ -139,4 +146,137 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Login URLs
 LOGIN_URL = '/admin/login/'
 LOGIN_REDIRECT_URL = '/'  # Will be handled by redirect_user_by_role
-LOGOUT_REDIRECT_URL = '/'
\ No newline at end of file
+LOGOUT_REDIRECT_URL = '/'
+
+# List views use keyset pagination; totals are 'capped' at LIST_COUNT_LIMIT
+# rows by default ('exact', 'approximate' (PostgreSQL estimate) or 'none').
+LIST_COUNT_MODE = config('LIST_COUNT_MODE', default='capped')
+LIST_COUNT_LIMIT = config('LIST_COUNT_LIMIT', default=10000, cast=int)
+# Seconds the summary counters of the holding tax, trade license, certification
+# and complaint lists stay cached per filter (city_corporation.list_summary);
+# writes to the listed app clear them sooner.
+LIST_SUMMARY_TIMEOUT = config('LIST_SUMMARY_TIMEOUT', default=60, cast=int)
+
+# Citizen search: 'auto' picks pg_trgm on PostgreSQL and FTS5 on SQLite;
+# 'postgres', 'sqlite' or 'basic' (unindexed icontains) force a backend.
+CITIZEN_SEARCH_BACKEND = config('CITIZEN_SEARCH_BACKEND', default='auto')
+
+# Cache
+# CACHE_BACKEND: 'file' (the default; shared by the workers of one host,
+# CACHE_LOCATION is a directory), 'redis' (Redis or a compatible server such
+# as Valkey or KeyDB shared by several hosts, CACHE_LOCATION is a redis:// URL;
+# needs the redis package) or 'locmem'. Cached pages and counters are
+# invalidated when their app's models are written (city_corporation.caching)
+# and otherwise expire after CACHE_TIMEOUT seconds.
+# 'locmem' keeps a separate cache in every process: invalidation only reaches
+# the worker that made the write, so with several gunicorn workers the others
+# serve stale pages, roles and lookup choices for up to CACHE_TIMEOUT. Only use
+# it with a single process (runserver, tests); the system checks warn about
+# it when DEBUG is off (caching.W001).
+CACHE_BACKEND = config('CACHE_BACKEND', default='file')
+CACHE_TIMEOUT = config('CACHE_TIMEOUT', default=300, cast=int)
+_CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'rcc'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / 'cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+CACHES = {
+    'default': {
+        'BACKEND': _CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': config('CACHE_LOCATION', default=_CACHE_BACKENDS[CACHE_BACKEND][1]),
+        'TIMEOUT': CACHE_TIMEOUT,
+        'KEY_PREFIX': 'rcc',
+        'OPTIONS': {'MAX_ENTRIES': 10000} if CACHE_BACKEND != 'redis' else {},
+    },
+}
+
+# Seconds a user's group names stay cached (invalidated on membership changes;
+# only with a shared CACHE_BACKEND, otherwise they are looked up per request)
+ROLE_CACHE_TIMEOUT = config('ROLE_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Dashboard statistics
+# 'live' computes counters on every request (one aggregate query per model);
+# 'summary' reads the DashboardStat table, refreshed when older than
+# DASHBOARD_SUMMARY_MAX_AGE seconds or by `manage.py refresh_dashboard_stats`.
+DASHBOARD_STATS_SOURCE = config('DASHBOARD_STATS_SOURCE', default='live')
+DASHBOARD_SUMMARY_MAX_AGE = config('DASHBOARD_SUMMARY_MAX_AGE', default=300, cast=int)
+# Daily chart rollups: today's buckets are recomputed when older than this many
+# seconds; `manage.py update_daily_rollups` keeps them current from cron.
+DASHBOARD_ROLLUP_MAX_AGE = config('DASHBOARD_ROLLUP_MAX_AGE', default=300, cast=int)
+# Parquet/Arrow analytics snapshots (`manage.py export_analytics_snapshot`,
+# needs the pyarrow package) are written here.
+ANALYTICS_SNAPSHOT_DIR = config('ANALYTICS_SNAPSHOT_DIR', default=str(BASE_DIR / 'analytics'))
+
+# Holding tax overdue sweep (`manage.py sweep_overdue_taxes`): unpaid demands
+# are marked OVERDUE once HOLDING_TAX_GRACE_DAYS past the due date and charged
+# a penalty of FLAT + MONTHLY_RATE % of the tax per started month overdue,
+# capped at CAP % of the tax (0 = no cap).
+HOLDING_TAX_GRACE_DAYS = config('HOLDING_TAX_GRACE_DAYS', default=0, cast=int)
+HOLDING_TAX_PENALTY_FLAT = config('HOLDING_TAX_PENALTY_FLAT', default='0.00')
+HOLDING_TAX_PENALTY_MONTHLY_RATE = config('HOLDING_TAX_PENALTY_MONTHLY_RATE', default='0.00')
+HOLDING_TAX_PENALTY_CAP = config('HOLDING_TAX_PENALTY_CAP', default='0.00')
+
+# Certificate PDFs are rendered in the background: by `manage.py
+# process_certificate_pdfs` (worker service) and by a pool of
+# CERTIFICATE_PDF_WORKERS threads in the web process that queued them; set it
+# to 0 once the worker service runs. Set CERTIFICATE_PDF_ASYNC=False to render
+# inside the request.
+CERTIFICATE_PDF_WORKERS = config('CERTIFICATE_PDF_WORKERS', default=2, cast=int)
+
+# Bulk ZIP exports render missing certificate PDFs on a process pool of this
+# size (0 = render inside the request process).
+CERTIFICATE_EXPORT_WORKERS = config('CERTIFICATE_EXPORT_WORKERS', default=2, cast=int)
+
+# Officer work queues: "claim next" leases this many pending items to an
+# officer for OFFICER_QUEUE_LEASE_MINUTES; unfinished leases then expire.
+OFFICER_QUEUE_CLAIM_SIZE = config('OFFICER_QUEUE_CLAIM_SIZE', default=10, cast=int)
+OFFICER_QUEUE_LEASE_MINUTES = config('OFFICER_QUEUE_LEASE_MINUTES', default=30, cast=int)
+
+# Reference numbers (COMP-2026-000123, ...) are reserved in blocks of this
+# size per worker process; 1 keeps numbers in order at the cost of one write
+# to the sequence row per number.
+NUMBER_SEQUENCE_BLOCK_SIZE = config('NUMBER_SEQUENCE_BLOCK_SIZE', default=50, cast=int)
+
+# Public complaint submissions are inserted inside the request by default.
+# With COMPLAINT_INTAKE_QUEUE=True they are spooled to COMPLAINT_INTAKE_DIR and
+# inserted by `manage.py process_complaint_intake`; only enable it once that
+# worker service runs (rcc-worker@process_complaint_intake, see
+# VPS_DEPLOYMENT.md), or spooled complaints are never inserted.
+COMPLAINT_INTAKE_QUEUE = config('COMPLAINT_INTAKE_QUEUE', default=False, cast=bool)
+COMPLAINT_INTAKE_DIR = config('COMPLAINT_INTAKE_DIR', default=str(BASE_DIR / 'complaint_intake'))
+
+# Estimated text similarity (0-1) at which a new complaint joins the
+# duplicate cluster of an open complaint.
+COMPLAINT_DUPLICATE_THRESHOLD = config('COMPLAINT_DUPLICATE_THRESHOLD', default=0.6, cast=float)
+
+# Request instrumentation (city_corporation.instrumentation): query counts,
+# DB and render time per request are logged as JSON lines on the
+# "city_corporation.instrumentation" logger and exported at /metrics.
+# X-DB-* debug headers are added when REQUEST_METRICS_HEADERS is on; requests
+# running more than REQUEST_METRICS_QUERY_WARNING queries (or repeating one)
+# are logged as warnings. Each worker writes its metrics to METRICS_DIR and
+# /metrics sums them; it answers only requests carrying
+# "Authorization: Bearer <METRICS_TOKEN>" (the Prometheus scrape job's
+# credentials) and is disabled while METRICS_TOKEN is empty.
+REQUEST_METRICS_HEADERS = config('REQUEST_METRICS_HEADERS', default=DEBUG, cast=bool)
+REQUEST_METRICS_QUERY_WARNING = config('REQUEST_METRICS_QUERY_WARNING', default=50, cast=int)
+REQUEST_METRICS_LOG_LEVEL = config('REQUEST_METRICS_LOG_LEVEL', default='WARNING')
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_DIR = config('METRICS_DIR', default=str(BASE_DIR / 'metrics'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'city_corporation.instrumentation': {
+            'handlers': ['console'],
+            'level': REQUEST_METRICS_LOG_LEVEL,
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,18 @@
+"""
+Template tag for caching fragments until their data changes.
+
+    {% load cache cache_namespaces %}
+    {% namespace_version 'citizencharter' as charters_version %}
+    {% cache 600 public_charters charters_version page_obj.number %}...{% endcache %}
+"""
+from django import template
+from city_corporation.caching import namespace_versions
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def namespace_version(*namespaces):
+    """Combined version of ``namespaces``; changes whenever one of them is written."""
+    return '.'.join(str(version) for version in namespace_versions(namespaces))
@@ -0,0 +1,32 @@
+"""
+Helpers shared by the apps' test suites.
+"""
+import threading
+from django.db import connection
+
+
+def run_concurrently(target, calls):
+    """
+    Call ``target(*args)`` for every ``args`` in ``calls``, each in its own
+    thread (and so on its own database connection), and wait for all of
+    them; returns the exceptions raised, for the test to assert empty.
+
+    Threads only contend on real row locks against PostgreSQL; tests using
+    this are marked ``@skipUnlessDBFeature('has_select_for_update')``.
+    """
+    errors = []
+
+    def run(args):
+        try:
+            target(*args)
+        except Exception as exc:  # returned to the test
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=run, args=(args,)) for args in calls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
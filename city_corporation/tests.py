@@ -0,0 +1,166 @@
+import csv
+import io
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+from unittest import mock
+from xml.etree import ElementTree
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from contact.models import Contact
+from . import caching, list_export
+from .pagination import KeysetPaginator, encode_cursor
+
+
+class CachingTests(TestCase):
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        cache_override = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location,
+        }})
+        cache_override.enable()
+        self.addCleanup(cache_override.disable)
+        self.computed = 0
+
+    def compute(self):
+        self.computed += 1
+        return self.computed
+
+    def test_value_is_recomputed_after_invalidation(self):
+        self.assertEqual(caching.get_or_set(['contact'], 'value', self.compute), 1)
+        self.assertEqual(caching.get_or_set(['contact'], 'value', self.compute), 1)
+        caching.invalidate('contact')
+        self.assertEqual(caching.get_or_set(['contact'], 'value', self.compute), 2)
+        caching.invalidate('citizen')
+        self.assertEqual(caching.get_or_set(['contact'], 'value', self.compute), 2)
+
+    def test_every_bump_writes_a_new_version(self):
+        seen = set(caching.namespace_versions(['contact']))
+        for _ in range(20):
+            caching.invalidate('contact')
+            version, = caching.namespace_versions(['contact'])
+            self.assertNotIn(version, seen)
+            seen.add(version)
+
+    def test_recreated_version_does_not_revive_old_entries(self):
+        caching.get_or_set(['contact'], 'value', self.compute)
+        cache.delete('ns:contact:version')
+        self.assertEqual(caching.get_or_set(['contact'], 'value', self.compute), 2)
+
+    def test_model_writes_invalidate_their_app_on_commit(self):
+        caching.get_or_set(['contact'], 'value', self.compute)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Contact.objects.create(name='Resident', email='resident@example.com', message='Hello')
+        self.assertEqual(caching.get_or_set(['contact'], 'value', self.compute), 1)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(caching.get_or_set(['contact'], 'value', self.compute), 2)
+
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        Contact.objects.bulk_create([
+            Contact(name=f'Resident {n}', email='resident@example.com', message='Hello') for n in range(25)
+        ])
+        # Ties on created_at are broken by the primary key
+        now = timezone.now()
+        for n, pk in enumerate(Contact.objects.order_by('pk').values_list('pk', flat=True)):
+            Contact.objects.filter(pk=pk).update(created_at=now - timedelta(minutes=n // 4))
+        self.expected = list(Contact.objects.order_by('-created_at', '-pk').values_list('pk', flat=True))
+
+    def walk(self, paginator):
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        return pages
+
+    def test_pages_cover_every_row_once_in_order(self):
+        pages = self.walk(KeysetPaginator(Contact.objects.all(), 10))
+        self.assertEqual([page.number for page in pages], [1, 2, 3])
+        self.assertEqual([contact.pk for page in pages for contact in page], self.expected)
+
+    def test_previous_cursor_returns_the_earlier_page(self):
+        paginator = KeysetPaginator(Contact.objects.all(), 10)
+        first, second, third = self.walk(paginator)
+        back = paginator.get_page(third.previous_cursor)
+        self.assertEqual(back.number, 2)
+        self.assertEqual([contact.pk for contact in back], [contact.pk for contact in second])
+        back = paginator.get_page(back.previous_cursor)
+        self.assertEqual([contact.pk for contact in back], [contact.pk for contact in first])
+        self.assertFalse(back.has_previous())
+
+    def test_malformed_or_stale_cursors_show_the_first_page(self):
+        paginator = KeysetPaginator(Contact.objects.all(), 10)
+        for cursor in ['garbage', encode_cursor({'v': ['not a date', 1], 'd': 'next'}),
+                       encode_cursor({'v': [1], 'd': 'next'})]:
+            page = paginator.get_page(cursor)
+            self.assertEqual(page.number, 1)
+            self.assertEqual([contact.pk for contact in page], self.expected[:10])
+
+    def test_capped_and_exact_counts(self):
+        self.assertEqual(KeysetPaginator(Contact.objects.all(), 10, count_limit=20).display_count, '20+')
+        paginator = KeysetPaginator(Contact.objects.all(), 10, count_mode='exact')
+        self.assertEqual((paginator.display_count, paginator.num_pages), (25, 3))
+
+
+EXPORT_COLUMNS = [('Name', 'name'), ('Subject', 'subject'), ('Phone', 'phone'), ('Read', 'is_read')]
+SHEET_NS = {'x': list_export._MAIN_NS}
+
+
+class ListExportTests(TestCase):
+    def setUp(self):
+        Contact.objects.create(name='=HYPERLINK("x")', email='a@example.com', subject='complaint', message='m')
+        Contact.objects.create(name='Karim', email='b@example.com', phone='01712345678', message='m', is_read=True)
+        self.contacts = Contact.objects.order_by('pk')
+
+    def content(self, response):
+        return b''.join(chunk if isinstance(chunk, bytes) else chunk.encode() for chunk in response.streaming_content)
+
+    def test_csv_escapes_formulas_and_exports_choice_labels(self):
+        response = list_export.export_response(self.contacts, EXPORT_COLUMNS, 'contacts')
+        self.assertEqual(response['Content-Type'], list_export.CSV_CONTENT_TYPE)
+        self.assertRegex(response['Content-Disposition'], r'filename="contacts_\d{8}_\d{4}\.csv"')
+        text = self.content(response).decode()
+        self.assertTrue(text.startswith('\ufeff'))
+        self.assertEqual(list(csv.reader(io.StringIO(text[1:]))), [
+            ['Name', 'Subject', 'Phone', 'Read'],
+            ["'=HYPERLINK(\"x\")", 'Complaint', '', 'False'],
+            ['Karim', 'General Inquiry', '01712345678', 'True'],
+        ])
+
+    def sheets(self, content):
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+            names = [sheet.get('name') for sheet in workbook.iterfind('x:sheets/x:sheet', SHEET_NS)]
+            sheets = []
+            for n in range(1, len(names) + 1):
+                sheet = ElementTree.fromstring(archive.read(f'xl/worksheets/sheet{n}.xml'))
+                sheets.append([
+                    [''.join(cell.itertext()) for cell in row] for row in sheet.iterfind('x:sheetData/x:row', SHEET_NS)
+                ])
+        return names, sheets
+
+    def test_xlsx_workbook_holds_every_row(self):
+        response = list_export.export_response(self.contacts, EXPORT_COLUMNS, 'contacts', 'xlsx')
+        self.assertEqual(response['Content-Type'], list_export.XLSX_CONTENT_TYPE)
+        names, sheets = self.sheets(self.content(response))
+        self.assertEqual(names, ['Sheet1'])
+        self.assertEqual(sheets[0], [
+            ['Name', 'Subject', 'Phone', 'Read'],
+            ['=HYPERLINK("x")', 'Complaint', '', '0'],
+            ['Karim', 'General Inquiry', '01712345678', '1'],
+        ])
+
+    @mock.patch.object(list_export, 'XLSX_MAX_ROWS', 2)
+    def test_xlsx_continues_on_further_sheets(self):
+        Contact.objects.create(name='Rahim', email='c@example.com', message='m')
+        response = list_export.export_response(self.contacts, EXPORT_COLUMNS[:1], 'contacts', 'xlsx')
+        names, sheets = self.sheets(self.content(response))
+        self.assertEqual(names, ['Sheet1', 'Sheet2', 'Sheet3'])
+        self.assertEqual([rows[1:] for rows in sheets], [[['=HYPERLINK("x")']], [['Karim']], [['Rahim']]])
+        self.assertTrue(all(rows[0] == ['Name'] for rows in sheets))
@@ -48,6 +48,7 @@ urlpatterns = [
     path('tenders/', views.public_tender_list, name='public_tender_list'),
     path('citizen-charters/', views.public_citizencharter_list, name='public_citizencharter_list'),
     path('django-admin/', admin.site.urls),
+    path('metrics', views.metrics, name='metrics'),
 ]
 
 # Serve media files in development
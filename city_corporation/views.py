@@ -2,24 +2,26 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import logout, authenticate, login
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
-from django.http import JsonResponse
-from django.db.models import Count, Q
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse
+from django.db.models import Q
 from django.utils import timezone
-from datetime import timedelta, datetime
-import json
+from django.utils.crypto import constant_time_compare
+from datetime import timedelta
 
-# Import all models
 from citizen.models import Citizen
-from holdingtax.models import HoldingTax
-from tradelicense.models import TradeLicense
-from certification.models import Certification
 from tender.models import Tender
 from citizencharter.models import CitizenCharter
 from complaint.models import Complaint
 from complaint.forms import PublicComplaintForm
-from tender.models import Tender
-from citizencharter.models import CitizenCharter
-from contact.models import Contact
+from complaint.intake import enqueue_complaint, is_queued
+from citizen.roles import CITIZEN, FIELD_OFFICER, OFFICER, SUPERADMIN, has_role
+from dashboard.stats import get_dashboard_counts, build_dashboard_context
+from dashboard.rollups import (
+    ROLLUP_SERIES, DEFAULT_SERIES, ALLOWED_WINDOWS, DEFAULT_WINDOW, get_daily_series
+)
+from .caching import cached_page
+from .instrumentation import registry
 
 
 def home(request):
@@ -47,13 +49,13 @@ def admin_login(request):
 
 def redirect_user_by_role(request):
     """Redirect user based on their group/role."""
-    if request.user.is_superuser or request.user.groups.filter(name='SuperAdmin').exists():
+    if request.user.is_superuser or has_role(request.user, SUPERADMIN):
         return redirect('dashboard')
-    elif request.user.groups.filter(name='citizen').exists():
+    elif has_role(request.user, CITIZEN):
         return redirect('citizen:citizen_dashboard')
-    elif request.user.groups.filter(name='Holding Tax Field Officer').exists():
+    elif has_role(request.user, FIELD_OFFICER):
         return redirect('field_officer:dashboard')
-    elif request.user.groups.filter(name='Officer').exists():
+    elif has_role(request.user, OFFICER):
         return redirect('officer:dashboard')
     else:
         return redirect('dashboard')  # Default to admin dashboard
@@ -71,69 +73,8 @@ def logout_view(request):
 @login_required
 def dashboard(request):
     """Custom admin dashboard"""
-    # Get counts for all models
-    stats = {
-        'citizens': Citizen.objects.count(),
-        'holding_taxes': HoldingTax.objects.count(),
-        'trade_licenses': TradeLicense.objects.count(),
-        'certifications': Certification.objects.count(),
-        'tenders': Tender.objects.count(),
-        'citizen_charters': CitizenCharter.objects.count(),
-        'complaints': Complaint.objects.count(),
-        'contacts': Contact.objects.count(),
-    }
-    
-    # Payment status counts
-    tax_stats = {
-        'pending': HoldingTax.objects.filter(status='PENDING').count(),
-        'paid': HoldingTax.objects.filter(status='PAID').count(),
-        'partial': HoldingTax.objects.filter(status='PARTIAL').count(),
-        'overdue': HoldingTax.objects.filter(status='OVERDUE').count(),
-        'waived': HoldingTax.objects.filter(status='WAIVED').count(),
-    }
-    
-    # License status counts
-    license_stats = {
-        'pending': TradeLicense.objects.filter(status='pending').count(),
-        'approved': TradeLicense.objects.filter(status='approved').count(),
-        'expired': TradeLicense.objects.filter(status='expired').count(),
-        'rejected': TradeLicense.objects.filter(status='rejected').count(),
-    }
-    
-    # Complaint status counts
-    complaint_stats = {
-        'submitted': Complaint.objects.filter(status='submitted').count(),
-        'in_progress': Complaint.objects.filter(status='in_progress').count(),
-        'resolved': Complaint.objects.filter(status='resolved').count(),
-        'closed': Complaint.objects.filter(status='closed').count(),
-    }
-    
-    # Certification status counts
-    cert_stats = {
-        'pending': Certification.objects.filter(status='pending').count(),
-        'approved': Certification.objects.filter(status='approved').count(),
-        'rejected': Certification.objects.filter(status='rejected').count(),
-    }
-    
-    # Recent activities (last 7 days)
-    seven_days_ago = timezone.now() - timedelta(days=7)
-    recent_citizens = Citizen.objects.filter(created_at__gte=seven_days_ago).count()
-    recent_complaints = Complaint.objects.filter(submitted_at__gte=seven_days_ago).count()
-    recent_licenses = TradeLicense.objects.filter(created_at__gte=seven_days_ago).count()
-    recent_certifications = Certification.objects.filter(created_at__gte=seven_days_ago).count()
-    
-    context = {
-        'stats': stats,
-        'tax_stats': tax_stats,
-        'license_stats': license_stats,
-        'complaint_stats': complaint_stats,
-        'cert_stats': cert_stats,
-        'recent_citizens': recent_citizens,
-        'recent_complaints': recent_complaints,
-        'recent_licenses': recent_licenses,
-        'recent_certifications': recent_certifications,
-        'user': request.user,
-    }
+    context = build_dashboard_context(get_dashboard_counts())
+    context['user'] = request.user
     
     return render(request, 'admin/dashboard.html', context)
 
@@ -141,34 +82,20 @@ def dashboard(request):
 @login_required
 def dashboard_stats_api(request):
     """API endpoint for dashboard statistics charts"""
-    # Get data for last 30 days
-    days = 30
-    dates = []
-    citizen_data = []
-    complaint_data = []
-    license_data = []
+    # Window in days (?days=7|30|90|365) and series (?series=citizens,payments,...)
+    try:
+        days = int(request.GET.get('days', DEFAULT_WINDOW))
+    except ValueError:
+        days = DEFAULT_WINDOW
+    if days not in ALLOWED_WINDOWS:
+        days = DEFAULT_WINDOW
     
-    for i in range(days):
-        date = timezone.now() - timedelta(days=days-i-1)
-        dates.append(date.strftime('%Y-%m-%d'))
-        
-        # Count for each day
-        citizen_data.append(
-            Citizen.objects.filter(created_at__date=date.date()).count()
-        )
-        complaint_data.append(
-            Complaint.objects.filter(submitted_at__date=date.date()).count()
-        )
-        license_data.append(
-            TradeLicense.objects.filter(created_at__date=date.date()).count()
-        )
+    series = [name for name in request.GET.get('series', '').split(',') if name in ROLLUP_SERIES]
+    dates, data = get_daily_series(series or DEFAULT_SERIES, days)
     
-    return JsonResponse({
-        'dates': dates,
-        'citizens': citizen_data,
-        'complaints': complaint_data,
-        'licenses': license_data,
-    })
+    response = {'dates': [day.strftime('%Y-%m-%d') for day in dates]}
+    response.update(data)
+    return JsonResponse(response)
 
 
 def public_complaint_create(request):
@@ -176,12 +103,13 @@ def public_complaint_create(request):
     if request.method == 'POST':
         form = PublicComplaintForm(request.POST)
         if form.is_valid():
+            if getattr(settings, 'COMPLAINT_INTAKE_QUEUE', False):
+                # Citizen matching and the insert happen in process_complaint_intake
+                complaint_number = enqueue_complaint(form.cleaned_data)
+                return redirect('public_complaint_success', complaint_number=complaint_number)
+
             complaint = form.save(commit=False)
             
-            # Auto-generate complaint number
-            timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-            complaint.complaint_number = f'COMP-{timestamp}'
-            
             # Set default status
             complaint.status = 'submitted'
             
@@ -215,8 +143,11 @@ def public_complaint_create(request):
 
 def public_complaint_success(request, complaint_number):
     """Success page after public complaint submission."""
-    from django.shortcuts import get_object_or_404
-    complaint = get_object_or_404(Complaint, complaint_number=complaint_number)
+    complaint = Complaint.objects.filter(complaint_number=complaint_number).first()
+    if complaint is None:
+        if not is_queued(complaint_number):
+            raise Http404('No complaint with this number')
+        complaint = Complaint(complaint_number=complaint_number)
     context = {
         'complaint': complaint,
     }
@@ -237,11 +168,9 @@ def public_tender_list(request):
             Q(description__icontains=search_query)
         )
     
-    # Pagination
-    from django.core.paginator import Paginator
-    paginator = Paginator(tenders, 12)
+    # Pagination (cached until a tender is saved)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = cached_page(('tender',), 'public_tenders', tenders, 12, page_number, search_query)
     
     # Get current time for status checking
     now = timezone.now()
@@ -273,11 +202,11 @@ def public_citizencharter_list(request):
     if service_filter:
         charters = charters.filter(service_type=service_filter)
     
-    # Pagination
-    from django.core.paginator import Paginator
-    paginator = Paginator(charters, 12)
+    # Pagination (cached until a charter is saved)
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = cached_page(
+        ('citizencharter',), 'public_charters', charters, 12, page_number, search_query, service_filter
+    )
     
     context = {
         'page_obj': page_obj,
@@ -285,3 +214,11 @@ def public_citizencharter_list(request):
         'service_filter': service_filter,
     }
     return render(request, 'citizencharter/public_list.html', context)
+
+
+def metrics(request):
+    """Prometheus metrics of every worker on this host (requires ``Authorization: Bearer <METRICS_TOKEN>``)."""
+    token = settings.METRICS_TOKEN
+    if not token or not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        raise Http404
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
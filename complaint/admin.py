@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Complaint
+from .models import Complaint, ComplaintCluster
 
 
 @admin.register(Complaint)
@@ -22,4 +22,15 @@ class ComplaintAdmin(admin.ModelAdmin):
             'fields': ('submitted_at', 'updated_at'),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(ComplaintCluster)
+class ComplaintClusterAdmin(admin.ModelAdmin):
+    list_display = ('id', 'representative', 'category', 'size', 'created_at', 'updated_at')
+    list_filter = ('category',)
+    search_fields = ('representative__complaint_number', 'representative__subject')
+    readonly_fields = ('representative', 'category', 'size', 'created_at', 'updated_at')
+
+    def has_add_permission(self, request):
+        return False
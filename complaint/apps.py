@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ComplaintConfig(AppConfig):
     name = 'complaint'
+
+    def ready(self):
+        # Connect the cluster bookkeeping for deleted complaints
+        from . import duplicates  # noqa: F401
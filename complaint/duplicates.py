@@ -0,0 +1,223 @@
+"""
+Near-duplicate complaint clustering with MinHash and LSH.
+
+A complaint's text (category, subject, description) is normalised and cut
+into character shingles; its MinHash signature (``NUM_PERM`` values) is
+stored on the row. Two signatures agree in a fraction of positions that
+estimates the Jaccard similarity of the shingle sets.
+
+The signature is split into ``BANDS`` bands of ``ROWS`` values and each
+band is hashed into a ``ComplaintLSHBucket`` key. Complaints sharing any
+bucket key are candidates, so finding the neighbours of a new complaint is
+a handful of index lookups plus a comparison with at most
+``MAX_CANDIDATES`` signatures, however large the table grows. With 16
+bands of 4 rows, pairs at 0.6 similarity become candidates ~90% of the
+time and pairs at 0.8 almost always.
+
+On insert a complaint joins the cluster of its most similar open
+(not resolved or closed) candidate when the estimated similarity reaches
+COMPLAINT_DUPLICATE_THRESHOLD; a cluster is created on the first match.
+Only unclustered complaints and cluster representatives have bucket rows:
+a complaint that joins a cluster is found through its representative, so
+a report repeated a thousand times does not crowd the candidate limit.
+"""
+import hashlib
+import random
+import re
+import struct
+import zlib
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from city_corporation.caching import invalidate_on_commit
+from .models import Complaint, ComplaintCluster, ComplaintLSHBucket
+
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+MAX_CANDIDATES = 200
+CLOSED_STATUSES = ['resolved', 'closed']
+
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 32) - 1
+_rng = random.Random(20240611)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_SIGNATURE = struct.Struct(f'<{NUM_PERM}I')
+_NON_WORD = re.compile(r'[^\w]+')
+
+
+def complaint_text(complaint):
+    return f'{complaint.category} {complaint.subject} {complaint.description}'
+
+
+def shingles(text):
+    """Set of character shingles of the normalised text."""
+    text = _NON_WORD.sub(' ', text.lower()).strip()
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    """MinHash signature (a tuple of NUM_PERM 32-bit ints) of ``text``."""
+    hashes = [zlib.crc32(shingle.encode()) for shingle in shingles(text)]
+    return tuple(
+        min(((a * value + b) % _PRIME) & _MASK for value in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def pack_signature(signature):
+    return _SIGNATURE.pack(*signature)
+
+
+def unpack_signature(data):
+    return _SIGNATURE.unpack(bytes(data))
+
+
+def band_keys(signature):
+    """One signed 64-bit bucket key per band."""
+    keys = []
+    for band in range(BANDS):
+        chunk = struct.pack(f'<I{ROWS}I', band, *signature[band * ROWS:(band + 1) * ROWS])
+        keys.append(int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), 'big', signed=True))
+    return keys
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for a, b in zip(first, second) if a == b) / NUM_PERM
+
+
+def duplicate_threshold():
+    return float(getattr(settings, 'COMPLAINT_DUPLICATE_THRESHOLD', 0.6))
+
+
+def find_best_match(signature, keys, exclude_pk=None, threshold=None):
+    """Most similar open complaint sharing a bucket with ``signature``: ``(pk, cluster_id, score)`` or None."""
+    threshold = duplicate_threshold() if threshold is None else threshold
+    candidates = ComplaintLSHBucket.objects.filter(key__in=keys).exclude(complaint__status__in=CLOSED_STATUSES)
+    if exclude_pk:
+        candidates = candidates.exclude(complaint_id=exclude_pk)
+    candidate_ids = list(
+        candidates.order_by('-complaint_id').values_list('complaint_id', flat=True).distinct()[:MAX_CANDIDATES]
+    )
+    if not candidate_ids:
+        return None
+
+    best = None
+    rows = Complaint.objects.filter(pk__in=candidate_ids, minhash__isnull=False).values_list(
+        'pk', 'cluster_id', 'minhash'
+    )
+    for pk, cluster_id, packed in rows:
+        score = similarity(signature, unpack_signature(packed))
+        if score >= threshold and (best is None or score > best[2]):
+            best = (pk, cluster_id, score)
+    return best
+
+
+def _join_cluster(match_pk, complaint):
+    """Put ``complaint`` in the cluster of ``match_pk`` (creating it); returns the cluster pk."""
+    match_cluster_id = Complaint.objects.select_for_update().filter(pk=match_pk).values_list(
+        'cluster_id', flat=True
+    ).first()
+    if match_cluster_id is None:
+        cluster = ComplaintCluster.objects.create(representative_id=match_pk, category=complaint.category, size=1)
+        Complaint.objects.filter(pk=match_pk).update(cluster=cluster)
+        match_cluster_id = cluster.pk
+    ComplaintCluster.objects.filter(pk=match_cluster_id).update(size=F('size') + 1, updated_at=timezone.now())
+    return match_cluster_id
+
+
+def _store_buckets(complaint_pk, keys):
+    ComplaintLSHBucket.objects.filter(complaint_id=complaint_pk).delete()
+    ComplaintLSHBucket.objects.bulk_create(
+        [ComplaintLSHBucket(key=key, complaint_id=complaint_pk) for key in keys]
+    )
+
+
+def promote_representative(cluster_id):
+    """Make the oldest remaining member represent a cluster whose representative was deleted."""
+    member = Complaint.objects.filter(cluster_id=cluster_id).order_by('pk').values_list('pk', 'minhash').first()
+    if member is None:
+        return
+    pk, packed = member
+    ComplaintCluster.objects.filter(pk=cluster_id).update(representative_id=pk)
+    if packed is not None:
+        _store_buckets(pk, band_keys(unpack_signature(packed)))
+
+
+@receiver(post_delete, sender=Complaint, dispatch_uid='complaint_leave_cluster_on_delete')
+def leave_cluster(sender, instance, **kwargs):
+    """
+    Take a deleted complaint out of its cluster's size, handing the cluster
+    to another member if it was the representative. A signal rather than
+    ``Complaint.delete()`` so queryset and cascade deletes are counted too.
+    """
+    if not instance.cluster_id:
+        return
+    ComplaintCluster.objects.filter(pk=instance.cluster_id).update(size=F('size') - 1, updated_at=timezone.now())
+    if not ComplaintCluster.objects.filter(pk=instance.cluster_id, representative__isnull=False).exists():
+        promote_representative(instance.cluster_id)
+
+
+def index_complaint(complaint):
+    """
+    (Re)index a saved complaint and cluster it with its near-duplicates.
+
+    Does nothing when the text is unchanged. A complaint keeps its cluster
+    when its text is edited; only unclustered complaints look for a match.
+    """
+    signature = minhash(complaint_text(complaint))
+    packed = pack_signature(signature)
+    if complaint.minhash is not None and bytes(complaint.minhash) == packed:
+        return complaint.cluster_id
+
+    keys = band_keys(signature)
+    with transaction.atomic():
+        cluster_id = complaint.cluster_id
+        if cluster_id is None:
+            match = find_best_match(signature, keys, exclude_pk=complaint.pk)
+            if match:
+                cluster_id = _join_cluster(match[0], complaint)
+        if cluster_id is None or ComplaintCluster.objects.filter(
+            pk=cluster_id, representative_id=complaint.pk
+        ).exists():
+            _store_buckets(complaint.pk, keys)
+        else:
+            ComplaintLSHBucket.objects.filter(complaint=complaint).delete()
+        Complaint.objects.filter(pk=complaint.pk).update(minhash=packed, cluster_id=cluster_id)
+    complaint.minhash = packed
+    complaint.cluster_id = cluster_id
+    return cluster_id
+
+
+def index_complaints(queryset):
+    """Index every complaint in ``queryset`` in pk order; returns how many are in a cluster."""
+    clustered = 0
+    for complaint in queryset.order_by('pk').iterator(chunk_size=500):
+        if index_complaint(complaint):
+            clustered += 1
+    return clustered
+
+
+def update_cluster_status(cluster, status, resolution=''):
+    """Set ``status`` on every complaint of ``cluster`` not already in it; returns the count."""
+    now = timezone.now()
+    with transaction.atomic():
+        complaints = Complaint.objects.filter(cluster=cluster).exclude(status=status)
+        if status in CLOSED_STATUSES:
+            complaints.filter(resolved_at__isnull=True).update(resolved_at=now)
+        changes = {'status': status, 'updated_at': now}
+        if resolution:
+            changes['resolution'] = resolution
+        updated = complaints.update(**changes)
+        ComplaintCluster.objects.filter(pk=cluster.pk).update(updated_at=now)
+        invalidate_on_commit('complaint')
+    return updated
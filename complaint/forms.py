@@ -1,4 +1,5 @@
 from django import forms
+from city_corporation.autocomplete import AutocompleteSelect
 from .models import Complaint
 
 
@@ -12,8 +13,8 @@ class ComplaintForm(forms.ModelForm):
             'category', 'status', 'priority', 'resolution'
         ]
         widgets = {
-            'complaint_number': forms.TextInput(attrs={'class': 'form-control', 'required': True}),
-            'citizen': forms.Select(attrs={'class': 'form-control'}),
+            'complaint_number': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Leave blank to assign automatically'}),
+            'citizen': AutocompleteSelect('citizen:autocomplete', attrs={'class': 'form-control'}),
             'subject': forms.TextInput(attrs={'class': 'form-control', 'required': True}),
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 5, 'required': True}),
             'category': forms.TextInput(attrs={'class': 'form-control', 'required': True}),
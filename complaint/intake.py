@@ -0,0 +1,217 @@
+"""
+Write-behind intake queue for public complaint submissions.
+
+The public form only validates the submission, takes a complaint number
+from the sequence allocator (normally from the worker's in-memory block,
+so no database write) and spools the submission as one JSON file in
+COMPLAINT_INTAKE_DIR. The file is fsynced and renamed into place, so an
+acknowledged submission survives a crash.
+
+``process_intake()`` (run by ``python manage.py process_complaint_intake``)
+drains the spool in batches:
+
+1. files are claimed by renaming them into ``processing/``; a rename only
+   succeeds for one worker, so several workers can drain the same spool;
+2. citizens are matched with one query per batch for e-mails and one for
+   phone numbers (the newest active match, in ``Citizen.Meta.ordering``
+   like the synchronous path's ``.first()``);
+3. complaints are inserted with one ``bulk_create``, ignoring numbers that
+   are already present, so a batch interrupted after the insert is simply
+   replayed; ``submitted_at`` is then set back to when the submission was
+   spooled (one UPDATE per second present in the batch), so a backlog
+   does not date complaints by when the worker caught up;
+4. the new complaints are clustered with their near-duplicates (see
+   ``duplicates``);
+5. the claimed files are deleted.
+
+Claimed files older than ``STALE_CLAIM_SECONDS`` (a worker died mid-batch)
+are put back in the queue. Files that are not valid JSON, or lack a
+submission field, are renamed to ``*.bad`` and logged, so one bad file
+never holds up its batch.
+"""
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from django.conf import settings
+from django.utils import timezone
+
+from city_corporation.caching import invalidate_on_commit
+from citizen.models import Citizen
+from sequences.allocator import COMPLAINT, next_number
+from .duplicates import index_complaints
+from .models import Complaint
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+STALE_CLAIM_SECONDS = 600
+SUBMISSION_FIELDS = ['subject', 'description', 'category', 'priority', 'citizen_email', 'citizen_phone']
+
+
+def intake_dir():
+    return Path(getattr(settings, 'COMPLAINT_INTAKE_DIR', settings.BASE_DIR / 'complaint_intake'))
+
+
+def _processing_dir():
+    return intake_dir() / 'processing'
+
+
+def enqueue_complaint(cleaned_data):
+    """Spool a validated public submission; returns its complaint number."""
+    spool = intake_dir()
+    spool.mkdir(parents=True, exist_ok=True)
+    complaint_number = next_number(COMPLAINT)
+    record = {name: cleaned_data.get(name) or '' for name in SUBMISSION_FIELDS}
+    record['complaint_number'] = complaint_number
+    record['submitted_at'] = timezone.now().replace(microsecond=0).isoformat()
+
+    fd, tmp_path = tempfile.mkstemp(dir=spool, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as tmp:
+            json.dump(record, tmp)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_path, spool / f'{complaint_number}.json')
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return complaint_number
+
+
+def is_queued(complaint_number):
+    """True while a submission is still waiting to be inserted."""
+    name = f'{complaint_number}.json'
+    return (intake_dir() / name).exists() or (_processing_dir() / name).exists()
+
+
+def recover_stale_claims(max_age=STALE_CLAIM_SECONDS):
+    """Return files claimed by a worker that died back to the queue; returns the count."""
+    processing = _processing_dir()
+    if not processing.is_dir():
+        return 0
+    recovered = 0
+    cutoff = time.time() - max_age
+    for path in processing.glob('*.json'):
+        try:
+            if path.stat().st_mtime < cutoff:
+                os.replace(path, intake_dir() / path.name)
+                recovered += 1
+        except FileNotFoundError:
+            continue
+    return recovered
+
+
+def _claim_batch(batch_size):
+    spool, processing = intake_dir(), _processing_dir()
+    if not spool.is_dir():
+        return []
+    processing.mkdir(exist_ok=True)
+    claimed = []
+    for name in sorted(entry.name for entry in os.scandir(spool) if entry.name.endswith('.json')):
+        target = processing / name
+        try:
+            os.replace(spool / name, target)
+        except FileNotFoundError:
+            continue  # another worker took it
+        os.utime(target)
+        claimed.append(target)
+        if len(claimed) >= batch_size:
+            break
+    return claimed
+
+
+def _match_citizens(records):
+    emails = {record['citizen_email'] for record in records if record['citizen_email']}
+    phones = {record['citizen_phone'] for record in records if record['citizen_phone']}
+    by_email, by_phone = {}, {}
+    # The first row per value in Citizen's default ordering, as .first() picks
+    citizens = Citizen.objects.filter(is_active=True).order_by(*Citizen._meta.ordering)
+    if emails:
+        for email, pk in citizens.filter(email__in=emails).values_list('email', 'pk'):
+            by_email.setdefault(email, pk)
+    if phones:
+        for phone, pk in citizens.filter(phone_number__in=phones).values_list('phone_number', 'pk'):
+            by_phone.setdefault(phone, pk)
+    return by_email, by_phone
+
+
+def _submitted_at(record):
+    """When the record was spooled; None for records spooled before it was stored."""
+    if 'submitted_at' not in record:
+        return None
+    try:
+        submitted_at = datetime.fromisoformat(record['submitted_at'])
+    except (TypeError, ValueError):
+        raise ValueError('invalid submitted_at')
+    return submitted_at if timezone.is_aware(submitted_at) else timezone.make_aware(submitted_at)
+
+
+def _is_valid_record(record):
+    if not isinstance(record, dict) or not all(
+        isinstance(record.get(name), str) for name in SUBMISSION_FIELDS + ['complaint_number']
+    ) or not record['complaint_number']:
+        return False
+    try:
+        record['submitted_at'] = _submitted_at(record)
+    except ValueError:
+        return False
+    return True
+
+
+def process_intake(batch_size=DEFAULT_BATCH_SIZE):
+    """Insert one batch of spooled complaints; returns the number of files handled."""
+    paths = _claim_batch(batch_size)
+    if not paths:
+        return 0
+
+    records = []
+    for path in paths:
+        try:
+            with open(path) as spooled:
+                record = json.load(spooled)
+        except (OSError, ValueError):
+            logger.exception('Unreadable complaint intake file %s', path)
+            os.replace(path, path.with_suffix('.bad'))
+            continue
+        if not _is_valid_record(record):
+            logger.error('Invalid complaint intake file %s', path)
+            os.replace(path, path.with_suffix('.bad'))
+            continue
+        records.append(record)
+    by_email, by_phone = _match_citizens(records)
+
+    Complaint.objects.bulk_create([
+        Complaint(
+            complaint_number=record['complaint_number'],
+            citizen_id=by_email.get(record['citizen_email']) or by_phone.get(record['citizen_phone']),
+            subject=record['subject'],
+            description=record['description'],
+            category=record['category'],
+            priority=record['priority'] or 'medium',
+            status='submitted',
+        )
+        for record in records
+    ], batch_size=batch_size, ignore_conflicts=True)
+    by_submitted_at = {}
+    for record in records:
+        if record['submitted_at'] is not None:
+            by_submitted_at.setdefault(record['submitted_at'], []).append(record['complaint_number'])
+    for submitted_at, numbers in by_submitted_at.items():
+        Complaint.objects.filter(complaint_number__in=numbers).update(submitted_at=submitted_at)
+    invalidate_on_commit('complaint')
+    # bulk_create skips save(), so cluster the new rows here
+    index_complaints(Complaint.objects.filter(
+        complaint_number__in=[record['complaint_number'] for record in records], minhash__isnull=True
+    ))
+
+    for path in paths:
+        if path.exists():
+            path.unlink()
+    logger.info('Inserted %s queued complaints', len(records))
+    return len(paths)
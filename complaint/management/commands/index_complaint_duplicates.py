@@ -0,0 +1,26 @@
+"""
+Management command to index existing complaints for duplicate detection.
+
+New complaints are indexed when saved; run this once after upgrading to
+compute the MinHash signatures of older complaints and cluster them.
+Complaints that are already in a cluster stay in it.
+"""
+from django.core.management.base import BaseCommand
+from complaint.duplicates import index_complaints
+from complaint.models import Complaint
+
+
+class Command(BaseCommand):
+    help = 'Computes MinHash signatures and duplicate clusters for existing complaints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-index complaints that already have a signature')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            # Unchanged signatures are skipped, so clear them first
+            Complaint.objects.update(minhash=None)
+        pending = Complaint.objects.filter(minhash__isnull=True)
+        total = pending.count()
+        clustered = index_complaints(pending)
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} complaints, {clustered} in duplicate clusters'))
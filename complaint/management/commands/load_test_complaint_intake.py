@@ -0,0 +1,82 @@
+"""
+Management command to load-test public complaint intake.
+
+Posts the public complaint form from --threads concurrent clients for
+--seconds and reports sustained submissions per second, then drains the
+queue with the intake worker and reports the insert rate:
+
+    python manage.py load_test_complaint_intake --threads 8 --seconds 10
+
+Submissions are real complaints (subject "Load test"); run it against a
+scratch database.
+"""
+import threading
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from complaint.intake import process_intake
+
+
+class Command(BaseCommand):
+    help = 'Measures sustained public complaint submissions per second'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=10.0)
+        parser.add_argument('--no-drain', action='store_true', help='Leave the submissions queued')
+
+    def handle(self, *args, **options):
+        if options['threads'] < 1 or options['seconds'] <= 0:
+            raise CommandError('--threads and --seconds must be positive')
+
+        url = reverse('public_complaint_create')
+        deadline = time.monotonic() + options['seconds']
+        counts, failures = [0] * options['threads'], [0] * options['threads']
+
+        def submit(slot):
+            client = Client()
+            try:
+                while time.monotonic() < deadline:
+                    response = client.post(url, {
+                        'subject': 'Load test', 'description': 'Streetlight out on the main road',
+                        'category': 'Street Lighting', 'priority': 'medium',
+                        'citizen_email': f'load{slot}@example.com',
+                    })
+                    if response.status_code == 302:
+                        counts[slot] += 1
+                    else:
+                        failures[slot] += 1
+            finally:
+                connection.close()
+
+        with override_settings(ALLOWED_HOSTS=['testserver'], COMPLAINT_INTAKE_QUEUE=True):
+            started = time.perf_counter()
+            threads = [threading.Thread(target=submit, args=(slot,)) for slot in range(options['threads'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+        submitted = sum(counts)
+        self.stdout.write(
+            f'Submitted {submitted} complaints in {elapsed:.1f}s ({submitted / elapsed:,.0f}/s), '
+            f'{sum(failures)} failed'
+        )
+        if options['no_drain']:
+            return
+
+        started = time.perf_counter()
+        inserted = 0
+        while True:
+            handled = process_intake()
+            if not handled:
+                break
+            inserted += handled
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Inserted {inserted} queued complaints in {elapsed:.1f}s ({inserted / max(elapsed, 1e-9):,.0f}/s)'
+        ))
@@ -0,0 +1,45 @@
+"""
+Management command to drain the public complaint intake queue.
+
+Run it as a long-lived service next to gunicorn (several copies may run at
+once); it inserts queued submissions in batches and sleeps while the queue
+is empty. Use --once from cron or after a deploy to drain what is queued
+and exit.
+"""
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from complaint.intake import DEFAULT_BATCH_SIZE, process_intake, recover_stale_claims
+
+
+class Command(BaseCommand):
+    help = 'Inserts queued public complaint submissions in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--once', action='store_true', help='Drain the queue and exit')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        total = 0
+        last_recovery = 0
+        while True:
+            if time.monotonic() - last_recovery > 60:
+                recovered = recover_stale_claims()
+                if recovered:
+                    self.stderr.write(f'Requeued {recovered} stale claimed submissions')
+                last_recovery = time.monotonic()
+
+            handled = process_intake(options['batch_size'])
+            total += handled
+            if handled:
+                continue
+            if options['once']:
+                break
+            connection.close()
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f'Inserted {total} queued complaints'))
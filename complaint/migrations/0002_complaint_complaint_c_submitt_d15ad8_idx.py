@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('citizen', '0004_citizen_citizen_cit_created_1b3f03_idx'),
+        ('complaint', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['submitted_at'], name='complaint_c_submitt_d15ad8_idx'),
+        ),
+    ]
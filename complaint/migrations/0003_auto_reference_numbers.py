@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaint', '0002_complaint_complaint_c_submitt_d15ad8_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='complaint',
+            name='complaint_number',
+            field=models.CharField(blank=True, max_length=50, unique=True),
+        ),
+    ]
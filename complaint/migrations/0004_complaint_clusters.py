@@ -0,0 +1,56 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaint', '0003_auto_reference_numbers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaint',
+            name='minhash',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ComplaintCluster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=100)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('representative', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='complaint.complaint')),
+            ],
+            options={
+                'verbose_name': 'Complaint Cluster',
+                'verbose_name_plural': 'Complaint Clusters',
+                'ordering': ['-updated_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='cluster',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='complaints', to='complaint.complaintcluster'),
+        ),
+        migrations.CreateModel(
+            name='ComplaintLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+                ('complaint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='complaint.complaint')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='complaintcluster',
+            index=models.Index(fields=['updated_at'], name='complaint_c_updated_5ab10e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaintlshbucket',
+            index=models.Index(fields=['key'], name='complaint_c_key_8ecd98_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 07:05
+
+from django.db import migrations
+from django.db.models import F
+
+
+def prune_member_buckets(apps, schema_editor):
+    # Cluster members are found through their representative's buckets
+    ComplaintLSHBucket = apps.get_model('complaint', 'ComplaintLSHBucket')
+    ComplaintLSHBucket.objects.filter(complaint__cluster__isnull=False).exclude(
+        complaint__cluster__representative_id=F('complaint_id')
+    ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('complaint', '0004_complaint_clusters'),
+    ]
+
+    operations = [
+        migrations.RunPython(prune_member_buckets, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from citizen.models import Citizen
+from sequences.allocator import COMPLAINT, next_number
 
 
 class Complaint(models.Model):
@@ -18,7 +19,7 @@ class Complaint(models.Model):
     ]
 
     citizen = models.ForeignKey(Citizen, on_delete=models.CASCADE, related_name='complaints', null=True, blank=True)
-    complaint_number = models.CharField(max_length=50, unique=True)
+    complaint_number = models.CharField(max_length=50, unique=True, blank=True)
     subject = models.CharField(max_length=200)
     description = models.TextField()
     category = models.CharField(max_length=100)
@@ -28,11 +29,59 @@ class Complaint(models.Model):
     submitted_at = models.DateTimeField(auto_now_add=True)
     resolved_at = models.DateTimeField(null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True)
+    cluster = models.ForeignKey(
+        'ComplaintCluster', on_delete=models.SET_NULL, related_name='complaints', null=True, blank=True
+    )
+    minhash = models.BinaryField(null=True, blank=True, editable=False)
 
     class Meta:
         verbose_name = "Complaint"
         verbose_name_plural = "Complaints"
         ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['submitted_at']),
+        ]
 
     def __str__(self):
         return f"{self.complaint_number} - {self.subject}"
+
+    def save(self, *args, **kwargs):
+        from .duplicates import index_complaint
+
+        if not self.complaint_number:
+            self.complaint_number = next_number(COMPLAINT)
+        super().save(*args, **kwargs)
+        index_complaint(self)
+
+
+class ComplaintCluster(models.Model):
+    """Near-duplicate complaints (typically one incident reported many times)."""
+
+    representative = models.ForeignKey(Complaint, on_delete=models.SET_NULL, related_name='+', null=True)
+    category = models.CharField(max_length=100)
+    size = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Complaint Cluster"
+        verbose_name_plural = "Complaint Clusters"
+        ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
+
+    def __str__(self):
+        return f"Cluster {self.pk}: {self.category} ({self.size} complaints)"
+
+
+class ComplaintLSHBucket(models.Model):
+    """One LSH band of a complaint's MinHash signature (see ``complaint.duplicates``)."""
+
+    key = models.BigIntegerField()
+    complaint = models.ForeignKey(Complaint, on_delete=models.CASCADE, related_name='lsh_buckets')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['key']),
+        ]
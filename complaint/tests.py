@@ -1,3 +1,160 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
 
-# Create your tests here.
+from citizen.models import Citizen
+from .intake import _processing_dir, enqueue_complaint, intake_dir, is_queued, process_intake, recover_stale_claims
+from .duplicates import update_cluster_status
+from .models import Complaint, ComplaintCluster, ComplaintLSHBucket
+
+
+SUBMISSION = {
+    'subject': 'Broken streetlight', 'description': 'Dark at night near the market', 'category': 'Streetlights',
+    'priority': 'high', 'citizen_email': 'resident@example.com', 'citizen_phone': '',
+}
+
+
+class IntakeQueueTests(TestCase):
+    def setUp(self):
+        self.spool = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool)
+        settings_override = override_settings(COMPLAINT_INTAKE_DIR=self.spool)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def spooled(self, number):
+        with open(intake_dir() / f'{number}.json') as spooled:
+            return json.load(spooled)
+
+    def respool(self, number, **changes):
+        record = {**self.spooled(number), **changes}
+        with open(intake_dir() / f'{number}.json', 'w') as spooled:
+            json.dump(record, spooled)
+
+    def test_spooled_submission_is_inserted_with_its_submission_time(self):
+        Citizen.objects.create(first_name='Old', last_name='Match', national_id='1', email='resident@example.com')
+        newest = Citizen.objects.create(first_name='New', last_name='Match', national_id='2', email='resident@example.com')
+        Citizen.objects.exclude(pk=newest.pk).update(created_at=timezone.now() - timedelta(days=3))
+
+        number = enqueue_complaint(SUBMISSION)
+        self.assertTrue(is_queued(number))
+        self.assertFalse(Complaint.objects.filter(complaint_number=number).exists())
+        submitted_at = timezone.now().replace(microsecond=0) - timedelta(hours=5)
+        self.respool(number, submitted_at=submitted_at.isoformat())
+
+        self.assertEqual(process_intake(), 1)
+        complaint = Complaint.objects.get(complaint_number=number)
+        self.assertEqual(complaint.submitted_at, submitted_at)
+        self.assertEqual(complaint.citizen_id, newest.pk)
+        self.assertEqual((complaint.subject, complaint.priority, complaint.status), ('Broken streetlight', 'high', 'submitted'))
+        self.assertFalse(is_queued(number))
+
+    def test_records_spooled_without_a_time_are_still_inserted(self):
+        number = enqueue_complaint(SUBMISSION)
+        record = self.spooled(number)
+        del record['submitted_at']
+        with open(intake_dir() / f'{number}.json', 'w') as spooled:
+            json.dump(record, spooled)
+        process_intake()
+        self.assertTrue(Complaint.objects.filter(complaint_number=number).exists())
+
+    def test_bad_records_are_set_aside_without_blocking_the_batch(self):
+        good = enqueue_complaint(SUBMISSION)
+        missing = enqueue_complaint(SUBMISSION)
+        self.respool(missing, subject=None)
+        bad_time = enqueue_complaint(SUBMISSION)
+        self.respool(bad_time, submitted_at='yesterday')
+        (intake_dir() / 'garbage.json').write_text('{not json')
+
+        with self.assertLogs('complaint.intake', 'ERROR'):
+            self.assertEqual(process_intake(), 4)
+        self.assertEqual(list(Complaint.objects.values_list('complaint_number', flat=True)), [good])
+        self.assertEqual(
+            sorted(os.listdir(_processing_dir())),
+            sorted(f'{name}.bad' for name in (missing, bad_time, 'garbage')),
+        )
+
+    def test_replayed_batch_inserts_nothing_twice(self):
+        number = enqueue_complaint(SUBMISSION)
+        record = self.spooled(number)
+        process_intake()
+        with open(intake_dir() / f'{number}.json', 'w') as spooled:
+            json.dump(record, spooled)
+        process_intake()
+        self.assertEqual(Complaint.objects.filter(complaint_number=number).count(), 1)
+
+    def test_stale_claims_return_to_the_queue(self):
+        number = enqueue_complaint(SUBMISSION)
+        _processing_dir().mkdir()
+        claimed = _processing_dir() / f'{number}.json'
+        os.replace(intake_dir() / f'{number}.json', claimed)
+        old = (datetime.now() - timedelta(hours=1)).timestamp()
+        os.utime(claimed, (old, old))
+
+        self.assertEqual(recover_stale_claims(), 1)
+        self.assertTrue((intake_dir() / f'{number}.json').exists())
+
+
+def create_complaint(subject='Streetlight out on Lake Road', **kwargs):
+    fields = {
+        'subject': subject, 'category': 'Streetlights',
+        'description': 'The streetlight outside house 12 on Lake Road has been dark for a week.',
+    }
+    return Complaint.objects.create(**{**fields, **kwargs})
+
+
+class DuplicateClusteringTests(TestCase):
+    def test_repeated_reports_share_one_cluster(self):
+        first = create_complaint()
+        second = create_complaint()
+        third = create_complaint(subject='Streetlight out on Lake Road again')
+        other = create_complaint(subject='Garbage not collected', category='Waste',
+                                 description='Bins on Market Street have not been emptied since Monday.')
+
+        first.refresh_from_db()
+        cluster = ComplaintCluster.objects.get()
+        self.assertEqual(
+            (first.cluster_id, second.cluster_id, third.cluster_id, other.cluster_id),
+            (cluster.pk, cluster.pk, cluster.pk, None),
+        )
+        self.assertEqual((cluster.representative_id, cluster.size), (first.pk, 3))
+        # Only the representative and unclustered complaints are in the buckets
+        self.assertEqual(
+            set(ComplaintLSHBucket.objects.values_list('complaint_id', flat=True)), {first.pk, other.pk},
+        )
+
+    def test_joining_a_cluster_moves_it_up_the_list(self):
+        create_complaint()
+        create_complaint()
+        ComplaintCluster.objects.update(updated_at=timezone.now() - timedelta(days=1))
+        before = ComplaintCluster.objects.get().updated_at
+        create_complaint()
+        self.assertGreater(ComplaintCluster.objects.get().updated_at, before)
+
+    def test_closed_complaints_are_not_matched(self):
+        create_complaint(status='closed')
+        self.assertIsNone(create_complaint().cluster_id)
+
+    def test_queryset_delete_updates_size_and_representative(self):
+        first = create_complaint()
+        second = create_complaint()
+        third = create_complaint()
+
+        Complaint.objects.filter(pk__in=[first.pk, third.pk]).delete()
+
+        cluster = ComplaintCluster.objects.get()
+        self.assertEqual((cluster.representative_id, cluster.size), (second.pk, 1))
+        self.assertTrue(ComplaintLSHBucket.objects.filter(complaint=second).exists())
+        self.assertEqual(create_complaint().cluster_id, cluster.pk)
+
+    def test_cluster_status_update_reaches_every_member(self):
+        create_complaint()
+        create_complaint()
+        cluster = ComplaintCluster.objects.get()
+        self.assertEqual(update_cluster_status(cluster, 'resolved', 'Lamp replaced'), 2)
+        self.assertFalse(Complaint.objects.filter(resolved_at__isnull=True).exists())
+        self.assertEqual(set(Complaint.objects.values_list('resolution', flat=True)), {'Lamp replaced'})
@@ -6,6 +6,10 @@ app_name = 'complaint'
 urlpatterns = [
     path('', views.complaint_list, name='list'),
     path('create/', views.complaint_create, name='create'),
+    path('export/', views.complaint_export, name='export'),
+    path('clusters/', views.cluster_list, name='cluster_list'),
+    path('clusters/<int:pk>/', views.cluster_detail, name='cluster_detail'),
+    path('clusters/<int:pk>/status/', views.cluster_update_status, name='cluster_update_status'),
     path('<int:pk>/', views.complaint_detail, name='detail'),
     path('<int:pk>/update/', views.complaint_update, name='update'),
     path('<int:pk>/delete/', views.complaint_delete, name='delete'),
@@ -1,16 +1,33 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
+from city_corporation.list_export import export_response
+from city_corporation.list_summary import count_where, list_summary
+from city_corporation.pagination import KeysetPaginator
 from django.db.models import Q, Count
 from django.utils import timezone
-from .models import Complaint
+from django.views.decorators.http import require_POST
+from .duplicates import CLOSED_STATUSES, update_cluster_status
+from .models import Complaint, ComplaintCluster
 from .forms import ComplaintForm
 
 
-@login_required
-def complaint_list(request):
-    """List all complaints with search and pagination."""
+COMPLAINT_EXPORT_COLUMNS = [
+    ('Complaint Number', 'complaint_number'),
+    ('Subject', 'subject'),
+    ('Category', 'category'),
+    ('Priority', 'priority'),
+    ('Status', 'status'),
+    ('Citizen First Name', 'citizen__first_name'),
+    ('Citizen Last Name', 'citizen__last_name'),
+    ('Citizen NID', 'citizen__national_id'),
+    ('Submitted At', 'submitted_at'),
+    ('Resolved At', 'resolved_at'),
+]
+
+
+def _filtered_complaints(request):
+    """Complaints matching the list's search, status and priority filters."""
     complaints = Complaint.objects.select_related('citizen').all()
     
     # Search functionality
@@ -34,35 +51,51 @@ def complaint_list(request):
     
     if priority_filter:
         complaints = complaints.filter(priority=priority_filter)
-    
-    # Pagination
-    paginator = Paginator(complaints, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    return complaints, search_query, status_filter, priority_filter
+
+
+@login_required
+def complaint_list(request):
+    """List all complaints with search and pagination."""
+    complaints, search_query, status_filter, priority_filter = _filtered_complaints(request)
     
     # Statistics
-    total_complaints = complaints.count()
-    submitted_count = complaints.filter(status='submitted').count()
-    in_progress_count = complaints.filter(status='in_progress').count()
-    resolved_count = complaints.filter(status='resolved').count()
-    closed_count = complaints.filter(status='closed').count()
-    urgent_count = complaints.filter(priority='urgent').count()
+    summary = list_summary(
+        complaints, ('complaint', 'citizen'), 'complaints',
+        {'search': search_query, 'status': status_filter, 'priority': priority_filter},
+        submitted_count=count_where(status='submitted'),
+        in_progress_count=count_where(status='in_progress'),
+        resolved_count=count_where(status='resolved'),
+        closed_count=count_where(status='closed'),
+        urgent_count=count_where(priority='urgent'),
+    )
+    
+    # Pagination
+    paginator = KeysetPaginator(complaints, 20, total=summary['total'])
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'complaints': page_obj,
         'search_query': search_query,
         'status_filter': status_filter,
         'priority_filter': priority_filter,
-        'total_count': total_complaints,
-        'submitted_count': submitted_count,
-        'in_progress_count': in_progress_count,
-        'resolved_count': resolved_count,
-        'closed_count': closed_count,
-        'urgent_count': urgent_count,
+        'total_count': paginator.display_count,
+        'submitted_count': summary['submitted_count'],
+        'in_progress_count': summary['in_progress_count'],
+        'resolved_count': summary['resolved_count'],
+        'closed_count': summary['closed_count'],
+        'urgent_count': summary['urgent_count'],
     }
     return render(request, 'complaint/list.html', context)
 
 
+@login_required
+def complaint_export(request):
+    """Download the filtered complaints as CSV or XLSX."""
+    complaints = _filtered_complaints(request)[0]
+    return export_response(complaints, COMPLAINT_EXPORT_COLUMNS, 'complaints', request.GET.get('format'))
+
+
 @login_required
 def complaint_detail(request, pk):
     """View complaint details."""
@@ -135,3 +168,57 @@ def complaint_delete(request, pk):
         'complaint': complaint,
     }
     return render(request, 'complaint/delete.html', context)
+
+
+@login_required
+def cluster_list(request):
+    """Clusters of near-duplicate complaints, most recently active first."""
+    clusters = ComplaintCluster.objects.select_related('representative').filter(size__gt=1).annotate(
+        open_count=Count('complaints', filter=~Q(complaints__status__in=CLOSED_STATUSES))
+    )
+    if request.GET.get('open', '1') == '1':
+        clusters = clusters.filter(open_count__gt=0)
+
+    paginator = KeysetPaginator(clusters, 20, ordering=['-updated_at'])
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+
+    context = {
+        'clusters': page_obj,
+        'open_only': request.GET.get('open', '1') == '1',
+        'total_count': paginator.display_count,
+    }
+    return render(request, 'complaint/cluster_list.html', context)
+
+
+@login_required
+def cluster_detail(request, pk):
+    """Complaints in one near-duplicate cluster, with a bulk status update."""
+    cluster = get_object_or_404(ComplaintCluster.objects.select_related('representative'), pk=pk)
+    complaints = cluster.complaints.select_related('citizen')
+
+    paginator = KeysetPaginator(complaints, 50, ordering=['-submitted_at'])
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    status_counts = dict(cluster.complaints.order_by().values_list('status').annotate(count=Count('pk')))
+
+    context = {
+        'cluster': cluster,
+        'complaints': page_obj,
+        'status_counts': [(label, status_counts.get(value, 0)) for value, label in Complaint.STATUS_CHOICES],
+        'status_choices': Complaint.STATUS_CHOICES,
+    }
+    return render(request, 'complaint/cluster_detail.html', context)
+
+
+@login_required
+@require_POST
+def cluster_update_status(request, pk):
+    """Set the status (and optionally the resolution) of every complaint in a cluster."""
+    cluster = get_object_or_404(ComplaintCluster, pk=pk)
+    status = request.POST.get('status')
+    if status not in dict(Complaint.STATUS_CHOICES):
+        messages.error(request, 'Choose a valid status.')
+        return redirect('complaint:cluster_detail', pk=pk)
+
+    updated = update_cluster_status(cluster, status, request.POST.get('resolution', '').strip())
+    messages.success(request, f'{updated} complaints in cluster {cluster.pk} set to {dict(Complaint.STATUS_CHOICES)[status]}.')
+    return redirect('complaint:cluster_detail', pk=pk)
@@ -0,0 +1,18 @@
+from django.contrib import admin
+from .models import DashboardStat, DailyRollup
+
+
+@admin.register(DashboardStat)
+class DashboardStatAdmin(admin.ModelAdmin):
+    list_display = ('scope', 'key', 'value', 'updated_at')
+    list_filter = ('scope',)
+    search_fields = ('scope', 'key')
+    readonly_fields = ('updated_at',)
+
+
+@admin.register(DailyRollup)
+class DailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('series', 'day', 'value', 'updated_at')
+    list_filter = ('series', 'day')
+    date_hierarchy = 'day'
+    readonly_fields = ('updated_at',)
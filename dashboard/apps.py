@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class DashboardConfig(AppConfig):
+    name = 'dashboard'
+
+    def ready(self):
+        # Connect the shared cache's and reference tables' invalidation signals
+        from city_corporation import caching, reference_data  # noqa: F401
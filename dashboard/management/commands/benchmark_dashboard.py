@@ -0,0 +1,136 @@
+"""
+Management command to benchmark dashboard statistics.
+
+Compares the legacy per-status COUNT(*) approach with the single-pass
+aggregated counters and the summary table, reporting query count and
+latency for each. Use --seed to top the database up to the requested
+volume first, e.g.:
+
+    python manage.py benchmark_dashboard --seed --citizens 1000000 --holding-taxes 5000000
+"""
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from citizen.models import Citizen
+from holdingtax.models import PropertyType, Property, TaxPeriod, HoldingTax
+from dashboard.stats import (
+    DASHBOARD_SOURCES, RECENT_DAYS, compute_dashboard_counts,
+    refresh_dashboard_summary, read_dashboard_summary,
+)
+
+
+def legacy_dashboard_counts():
+    """The original dashboard: one COUNT(*) per model, status and recent window."""
+    since = timezone.now() - timedelta(days=RECENT_DAYS)
+    counts = {}
+    for scope, (model, statuses, recent_field) in DASHBOARD_SOURCES.items():
+        values = {'total': model.objects.count()}
+        for key, value in statuses.items():
+            values[key] = model.objects.filter(status=value).count()
+        if recent_field:
+            values['recent'] = model.objects.filter(**{f'{recent_field}__gte': since}).count()
+        counts[scope] = values
+    return counts
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks dashboard statistics (query count and latency)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true', help='Top up benchmark data before measuring')
+        parser.add_argument('--citizens', type=int, default=1_000_000)
+        parser.add_argument('--holding-taxes', type=int, default=5_000_000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['citizens'], options['holding_taxes'], options['batch_size'])
+
+        self.stdout.write(
+            f"Citizens: {Citizen.objects.count()}, Holding taxes: {HoldingTax.objects.count()}"
+        )
+
+        refresh_dashboard_summary()
+        variants = [
+            ('legacy per-status COUNT', legacy_dashboard_counts),
+            ('single-pass aggregate', compute_dashboard_counts),
+            ('summary table', read_dashboard_summary),
+        ]
+        self.stdout.write(f"{'variant':<26}{'queries':>8}{'min ms':>12}{'mean ms':>12}")
+        for name, func in variants:
+            timings = []
+            for _ in range(options['repeat']):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    func()
+                    timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f"{name:<26}{len(queries):>8}{min(timings):>12.1f}{statistics.mean(timings):>12.1f}"
+            )
+
+    def seed(self, citizen_target, tax_target, batch_size):
+        """Bulk insert citizens, properties and holding taxes up to the targets."""
+        rng = random.Random(42)
+
+        existing = Citizen.objects.count()
+        for start in range(existing, citizen_target, batch_size):
+            stop = min(start + batch_size, citizen_target)
+            Citizen.objects.bulk_create([
+                Citizen(
+                    first_name=f'Bench{n}',
+                    last_name='Citizen',
+                    national_id=f'BENCH{n:012d}',
+                ) for n in range(start, stop)
+            ])
+
+        if tax_target <= HoldingTax.objects.count():
+            return
+
+        property_type, _ = PropertyType.objects.get_or_create(code='BENCH', defaults={'name': 'Benchmark'})
+        owner_ids = list(Citizen.objects.values_list('pk', flat=True)[:max(tax_target // 5, 1)])
+        existing = Property.objects.filter(property_number__startswith='BENCH-P').count()
+        for start in range(existing, len(owner_ids), batch_size):
+            Property.objects.bulk_create([
+                Property(
+                    property_number=f'BENCH-P{n:010d}',
+                    property_type=property_type,
+                    owner_id=owner_ids[n],
+                    address='Benchmark',
+                    area_sqft=Decimal('1000.00'),
+                    assessed_value=Decimal('500000.00'),
+                    tax_rate=Decimal('1.00'),
+                    status='APPROVED',
+                ) for n in range(start, min(start + batch_size, len(owner_ids)))
+            ])
+
+        property_ids = list(
+            Property.objects.filter(property_number__startswith='BENCH-P').values_list('pk', flat=True)
+        )
+        # A property has one demand per period, so spread the taxes over enough periods
+        tax_periods = []
+        for year in range(2025, 2025 - -(-tax_target // len(property_ids)), -1):
+            tax_period, _ = TaxPeriod.objects.get_or_create(
+                name=f'Benchmark {year}', defaults={'start_date': date(year, 7, 1), 'end_date': date(year + 1, 6, 30)}
+            )
+            tax_periods.append(tax_period)
+        statuses = [value for value, _label in HoldingTax.STATUS_CHOICES]
+        existing = HoldingTax.objects.filter(tax_number__startswith='BENCH-T').count()
+        for start in range(existing, tax_target, batch_size):
+            HoldingTax.objects.bulk_create([
+                HoldingTax(
+                    tax_number=f'BENCH-T{n:012d}',
+                    holding_property_id=property_ids[n % len(property_ids)],
+                    tax_period=tax_periods[n // len(property_ids)],
+                    tax_amount=Decimal('5000.00'),
+                    due_date=tax_periods[n // len(property_ids)].end_date,
+                    status=rng.choice(statuses),
+                ) for n in range(start, min(start + batch_size, tax_target))
+            ])
+            self.stdout.write(f'  holding taxes: {min(start + batch_size, tax_target)}/{tax_target}')
@@ -0,0 +1,46 @@
+"""
+Management command to check the views' SQL query budgets.
+
+Seeds realistic data inside a transaction that is rolled back, renders
+every list, detail and dashboard view declared in
+``city_corporation.query_budgets.BUDGETS`` and fails when a view runs more
+queries than its budget or repeats a query once per row (an N+1):
+
+    python manage.py check_query_budgets
+    python manage.py check_query_budgets --view citizen:list --verbosity 2
+"""
+from django.core.management.base import BaseCommand, CommandError
+from city_corporation.query_budgets import BUDGETS, DEFAULT_ROWS, check_budgets
+
+
+class Command(BaseCommand):
+    help = 'Fails when a view exceeds its SQL query budget or runs a query per row'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--view', action='append', default=[], help='URL name to check (repeatable)')
+        parser.add_argument('--rows', type=int, default=DEFAULT_ROWS, help='Objects seeded of each kind')
+
+    def handle(self, *args, **options):
+        if options['rows'] < 20:
+            raise CommandError('--rows must be at least 20 so that per-row queries stand out')
+        views = BUDGETS
+        if options['view']:
+            known = {view.url_name: view for view in BUDGETS}
+            unknown = [name for name in options['view'] if name not in known]
+            if unknown:
+                raise CommandError(f"No budget declared for {', '.join(unknown)}")
+            views = [known[name] for name in options['view']]
+
+        results = check_budgets(views, options['rows'])
+        self.stdout.write(f"{'view':<40}{'status':>7}{'queries':>9}{'budget':>8}")
+        for result in results:
+            line = f'{result.view.url_name:<40}{result.status:>7}{result.queries:>9}{result.view.budget:>8}'
+            self.stdout.write(self.style.ERROR(line) if result.failed else line)
+            repeats = result.per_row if options['verbosity'] < 2 else result.repeated
+            for entry in repeats:
+                self.stdout.write(f"    {entry['count']}x {entry['sql'][:160]}")
+
+        failed = [result.view.url_name for result in results if result.failed]
+        if failed:
+            raise CommandError(f"{len(failed)} view(s) over budget or running per-row queries: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS(f'All {len(results)} views within their query budgets'))
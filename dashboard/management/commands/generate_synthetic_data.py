@@ -0,0 +1,72 @@
+"""
+Management command to generate a synthetic municipal dataset.
+
+Inserts citizens, wards and roads, properties, tax periods, holding taxes
+and payments, certifications, trade licenses, complaints and tenders with
+realistic distributions (see ``dashboard.synthetic``). The default profile
+is a city of a million citizens; --scale shrinks or grows every volume and
+--profile overrides counts and distributions from a JSON file, e.g.
+``{"counts": {"complaints": 2000000}, "weights": {"complaint_status": {"submitted": 1}}}``.
+Generated complaints are clustered into near-duplicates at the end
+(single process; --skip-duplicate-index leaves it to
+``index_complaint_duplicates``). The same --seed on the same starting
+database produces the same data:
+
+    python manage.py generate_synthetic_data --seed 42 --workers 8
+    python manage.py generate_synthetic_data --scale 0.01 --batch-size 2000
+"""
+import json
+import time
+from django.core.management.base import BaseCommand, CommandError
+from dashboard.synthetic import DEFAULT_BATCH_SIZE, generate, load_profile
+
+
+class Command(BaseCommand):
+    help = 'Generates a reproducible synthetic dataset for load and regression benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--scale', type=float, default=1.0, help='Multiplier applied to every volume')
+        parser.add_argument('--profile', help='JSON file overriding counts and distributions')
+        parser.add_argument('--workers', type=int, default=4, help='Worker processes (SQLite always uses one)')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--show-profile', action='store_true', help='Print the effective profile and exit')
+        parser.add_argument(
+            '--skip-duplicate-index', action='store_true',
+            help='Do not cluster the generated complaints (run index_complaint_duplicates later)',
+        )
+
+    def handle(self, *args, **options):
+        if options['scale'] <= 0 or options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--scale, --workers and --batch-size must be positive')
+        try:
+            profile = load_profile(options['profile'], options['scale'])
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f'Invalid profile: {exc}')
+        if options['show_profile']:
+            self.stdout.write(json.dumps(profile, indent=2))
+            return
+
+        last_report = {}
+
+        def progress(kind, rows):
+            done = last_report[kind] = last_report.get(kind, 0) + rows
+            target = profile['counts'].get(kind)
+            self.stdout.write(f'  {kind}: {done}/{target}' if target else f'  {kind}: {done}')
+
+        started = time.perf_counter()
+        try:
+            totals = generate(
+                profile, seed=options['seed'], workers=options['workers'],
+                batch_size=options['batch_size'], progress=progress,
+                index_duplicates=not options['skip_duplicate_index'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        rows = sum(totals.values())
+        summary = ', '.join(f'{count} {kind}' for kind, count in totals.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {summary} in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)'
+        ))
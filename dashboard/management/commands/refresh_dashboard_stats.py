@@ -0,0 +1,17 @@
+"""
+Management command to rebuild the dashboard summary table.
+
+Schedule it (e.g. every few minutes from cron) when
+DASHBOARD_STATS_SOURCE is set to 'summary'.
+"""
+from django.core.management.base import BaseCommand
+from dashboard.stats import refresh_dashboard_summary
+
+
+class Command(BaseCommand):
+    help = 'Recomputes dashboard counters and stores them in the summary table'
+
+    def handle(self, *args, **options):
+        counts = refresh_dashboard_summary()
+        rows = sum(len(values) for values in counts.values())
+        self.stdout.write(self.style.SUCCESS(f'Refreshed {rows} dashboard counters'))
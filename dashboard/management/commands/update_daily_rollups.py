@@ -0,0 +1,32 @@
+"""
+Management command to fill the daily dashboard rollups.
+
+Run it from cron (e.g. every few minutes); it only recomputes the days
+since the last stored bucket. Use --since to rebuild older history, for
+example after back-dated payments were entered.
+"""
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from dashboard.rollups import ROLLUP_SERIES, update_daily_rollups
+
+
+class Command(BaseCommand):
+    help = 'Incrementally updates the daily dashboard rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Recompute buckets from this date (YYYY-MM-DD)')
+        parser.add_argument(
+            '--series', nargs='+', choices=sorted(ROLLUP_SERIES),
+            help='Only update these series (default: all)'
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since must be a date in YYYY-MM-DD format')
+
+        rows = update_daily_rollups(since=since, series=options['series'])
+        self.stdout.write(self.style.SUCCESS(f'Updated {rows} daily rollup buckets'))
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=50, verbose_name='Scope')),
+                ('key', models.CharField(max_length=50, verbose_name='Key')),
+                ('value', models.BigIntegerField(default=0, verbose_name='Value')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'Dashboard Statistic',
+                'verbose_name_plural': 'Dashboard Statistics',
+                'ordering': ['scope', 'key'],
+                'constraints': [models.UniqueConstraint(fields=('scope', 'key'), name='dashboard_stat_scope_key_uniq')],
+            },
+        ),
+    ]
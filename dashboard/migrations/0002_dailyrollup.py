@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('series', models.CharField(max_length=50, verbose_name='Series')),
+                ('day', models.DateField(verbose_name='Day')),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=18, verbose_name='Value')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'Daily Rollup',
+                'verbose_name_plural': 'Daily Rollups',
+                'ordering': ['series', 'day'],
+                'constraints': [models.UniqueConstraint(fields=('series', 'day'), name='dashboard_rollup_series_day_uniq')],
+            },
+        ),
+    ]
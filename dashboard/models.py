@@ -0,0 +1,42 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class DashboardStat(models.Model):
+    """Pre-computed dashboard counter (one row per scope/key pair)."""
+
+    scope = models.CharField(_("Scope"), max_length=50)
+    key = models.CharField(_("Key"), max_length=50)
+    value = models.BigIntegerField(_("Value"), default=0)
+    updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Dashboard Statistic")
+        verbose_name_plural = _("Dashboard Statistics")
+        ordering = ["scope", "key"]
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "key"], name="dashboard_stat_scope_key_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}.{self.key} = {self.value}"
+
+
+class DailyRollup(models.Model):
+    """One bucket per series per day, used for the dashboard time-series charts."""
+
+    series = models.CharField(_("Series"), max_length=50)
+    day = models.DateField(_("Day"))
+    value = models.DecimalField(_("Value"), max_digits=18, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Daily Rollup")
+        verbose_name_plural = _("Daily Rollups")
+        ordering = ["series", "day"]
+        constraints = [
+            models.UniqueConstraint(fields=["series", "day"], name="dashboard_rollup_series_day_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.series} {self.day} = {self.value}"
@@ -0,0 +1,134 @@
+"""
+Daily time-series rollups for the dashboard charts.
+
+Each series is bucketed per day into ``DailyRollup`` with one GROUP BY query
+over an indexed range (no per-day ``__date`` lookups), and only the days since
+the last stored bucket are recomputed. Chart requests then read a single
+window of pre-computed rows.
+"""
+from datetime import datetime, time, timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum, DateTimeField
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from city_corporation.caching import get_or_set
+from citizen.models import Citizen
+from holdingtax.models import TaxPayment
+from tradelicense.models import TradeLicense
+from certification.models import Certification
+from complaint.models import Complaint
+from .models import DailyRollup
+
+
+# series -> (model, date field, aggregate, extra filter)
+ROLLUP_SERIES = {
+    'citizens': (Citizen, 'created_at', Count('pk'), None),
+    'complaints': (Complaint, 'submitted_at', Count('pk'), None),
+    'licenses': (TradeLicense, 'created_at', Count('pk'), None),
+    'payments': (TaxPayment, 'payment_date', Sum('amount'), None),
+    'certifications_issued': (Certification, 'issue_date', Count('pk'), Q(status='approved')),
+}
+
+# Cache namespaces (app labels) of each series' source model
+SERIES_NAMESPACES = {name: model._meta.app_label for name, (model, *_rest) in ROLLUP_SERIES.items()}
+
+# Series reported as money rather than as a count
+AMOUNT_SERIES = {'payments'}
+
+DEFAULT_SERIES = ['citizens', 'complaints', 'licenses']
+ALLOWED_WINDOWS = (7, 30, 90, 365)
+DEFAULT_WINDOW = 30
+
+
+def _series_buckets(name, start):
+    """Return {day: value} for one series from ``start`` (a date) onwards."""
+    model, field_name, aggregate, condition = ROLLUP_SERIES[name]
+    queryset = model.objects.all()
+    if condition is not None:
+        queryset = queryset.filter(condition)
+
+    if isinstance(model._meta.get_field(field_name), DateTimeField):
+        since = timezone.make_aware(datetime.combine(start, time.min))
+        queryset = queryset.filter(**{f'{field_name}__gte': since}).annotate(day=TruncDate(field_name))
+    else:
+        queryset = queryset.filter(**{f'{field_name}__gte': start}).annotate(day=F(field_name))
+
+    rows = queryset.order_by().values('day').annotate(value=aggregate).values_list('day', 'value')
+    return {day: value or 0 for day, value in rows}
+
+
+def update_daily_rollups(since=None, series=None):
+    """
+    Recompute daily buckets from ``since`` up to today.
+
+    Without ``since`` the rollup resumes from the last stored day (which is
+    recomputed because it may have been partial), or starts one full window
+    back on an empty table. Buckets are written densely so days whose rows
+    were deleted go back to zero.
+    """
+    today = timezone.localdate()
+    if since is None:
+        last_day = DailyRollup.objects.aggregate(last=Max('day'))['last']
+        since = last_day or today - timedelta(days=max(ALLOWED_WINDOWS) - 1)
+
+    days = [since + timedelta(days=offset) for offset in range((today - since).days + 1)]
+    rows = []
+    for name in series or ROLLUP_SERIES:
+        buckets = _series_buckets(name, since)
+        rows.extend(DailyRollup(series=name, day=day, value=buckets.get(day, 0)) for day in days)
+
+    with transaction.atomic():
+        DailyRollup.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['series', 'day'],
+            update_fields=['value', 'updated_at'],
+        )
+    return len(rows)
+
+
+def _read_window(series, first_day, last_day):
+    return list(
+        DailyRollup.objects
+        .filter(series__in=series, day__gte=first_day, day__lte=last_day)
+        .values_list('series', 'day', 'value', 'updated_at')
+    )
+
+
+def get_daily_series(series=None, days=DEFAULT_WINDOW):
+    """
+    Return ``(dates, {series: values})`` for the last ``days`` days.
+
+    The window is read in one query. Today's buckets are brought up to date
+    first only when they are missing or older than DASHBOARD_ROLLUP_MAX_AGE.
+    The result is cached for the same age, or until a source app is written.
+    """
+    series = list(series or DEFAULT_SERIES)
+    namespaces = sorted({SERIES_NAMESPACES[name] for name in series})
+    return get_or_set(
+        namespaces, 'dashboard:series', lambda: _daily_series(series, days), series, days,
+        timeout=getattr(settings, 'DASHBOARD_ROLLUP_MAX_AGE', 300),
+    )
+
+
+def _daily_series(series, days):
+    today = timezone.localdate()
+    first_day = today - timedelta(days=days - 1)
+
+    rows = _read_window(series, first_day, today)
+    max_age = timedelta(seconds=getattr(settings, 'DASHBOARD_ROLLUP_MAX_AGE', 300))
+    todays = [updated_at for name, day, _value, updated_at in rows if day == today]
+    if len(todays) < len(series) or min(todays) < timezone.now() - max_age:
+        update_daily_rollups()
+        rows = _read_window(series, first_day, today)
+
+    dates = [first_day + timedelta(days=offset) for offset in range(days)]
+    values = {(name, day): value for name, day, value, _updated_at in rows}
+    data = {}
+    for name in series:
+        cast = float if name in AMOUNT_SERIES else int
+        data[name] = [cast(values.get((name, day), 0)) for day in dates]
+    return dates, data
@@ -0,0 +1,358 @@
+"""
+Partitioned columnar snapshots for off-box analytics.
+
+``write_snapshots()`` (run by ``python manage.py export_analytics_snapshot``)
+writes holding taxes, payments, properties and citizens, plus the small
+lookup tables needed to label them (areas, streets, property types, tax
+periods), as Parquet (or Arrow IPC) files under ANALYTICS_SNAPSHOT_DIR:
+
+    holding_taxes/tax_period_id=7/part.parquet
+    payments/month=2026-05/part.parquet
+    properties/month=2026-05/part.parquet
+    citizens/month=2026-05/part.parquet
+    areas.parquet, streets.parquet, property_types.parquet, tax_periods.parquet
+
+The hive-style directories are read as partition columns by pyarrow,
+DuckDB, pandas and Spark (``tax_period_id`` is only stored there).
+
+Snapshots are incremental: ``_state.json`` records when each table was
+last exported, and a run only rewrites the partitions holding rows created
+or updated since then (minus ``CLOCK_SKEW`` for transactions still open at
+the time). A changed row whose partition value moved (a demand moved to
+another tax period, a payment re-dated) also has its old partition
+rewritten: the ``id`` column of the other partition files is checked for
+changed rows. Lookup tables are rewritten every run. Rows deleted from the
+database stay in the snapshot until the next ``full`` run. Each partition
+is streamed from one ``.iterator()`` query in batches into a temporary file
+that replaces the old one, so readers never see a half-written partition.
+
+Names, national IDs and contact details of citizens (and property
+addresses) are only written with ``include_pii``; switching it, or the
+file format, forces a full run so partitions never mix schemas.
+
+pyarrow is an optional dependency (``pip install -r requirements-analytics.txt``).
+"""
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from citizen.models import Citizen
+from holdingtax.models import Area, HoldingTax, Property, PropertyType, Street, TaxPayment, TaxPeriod
+
+try:
+    import pyarrow
+    import pyarrow.compute
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+DEFAULT_BATCH_SIZE = 50000
+FORMATS = ('parquet', 'arrow')
+STATE_FILE = '_state.json'
+# Rows committed after a run started may carry an earlier timestamp
+CLOCK_SKEW = timedelta(minutes=10)
+
+
+@dataclass(frozen=True)
+class SnapshotTable:
+    name: str
+    model: type
+    # (column name, field path)
+    columns: tuple
+    # Foreign key column (one partition per value) or date field (one per month)
+    partition_field: str = ''
+    # Timestamp marking rows changed since the last run
+    changed_field: str = ''
+    # Columns only written with include_pii
+    pii: tuple = ()
+
+    @property
+    def monthly(self):
+        return isinstance(self.model._meta.get_field(self.partition_field), models.DateField)
+
+    @property
+    def movable(self):
+        """Whether a row can change partition (its partition field is not set once on creation)."""
+        return not getattr(self.model._meta.get_field(self.partition_field), 'auto_now_add', False)
+
+
+TABLES = [
+    SnapshotTable(
+        'holding_taxes', HoldingTax,
+        (('id', 'id'), ('tax_number', 'tax_number'), ('property_id', 'holding_property_id'),
+         ('tax_period_id', 'tax_period_id'), ('tax_amount', 'tax_amount'), ('penalty_amount', 'penalty_amount'),
+         ('paid_amount', 'paid_amount'), ('due_date', 'due_date'), ('status', 'status'),
+         ('created_at', 'created_at'), ('updated_at', 'updated_at')),
+        partition_field='tax_period_id', changed_field='updated_at',
+    ),
+    SnapshotTable(
+        'payments', TaxPayment,
+        (('id', 'id'), ('payment_number', 'payment_number'), ('holding_tax_id', 'holding_tax_id'),
+         ('payment_date', 'payment_date'), ('amount', 'amount'), ('payment_method', 'payment_method'),
+         ('balance_after', 'balance_after'), ('created_at', 'created_at'), ('updated_at', 'updated_at')),
+        partition_field='payment_date', changed_field='updated_at',
+    ),
+    SnapshotTable(
+        'properties', Property,
+        (('id', 'id'), ('property_number', 'property_number'), ('property_type_id', 'property_type_id'),
+         ('owner_id', 'owner_id'), ('area_id', 'area_id'), ('street_id', 'street_id'), ('address', 'address'),
+         ('city', 'city'), ('area_sqft', 'area_sqft'), ('assessed_value', 'assessed_value'),
+         ('tax_rate', 'tax_rate'), ('status', 'status'), ('is_active', 'is_active'),
+         ('created_at', 'created_at'), ('updated_at', 'updated_at')),
+        partition_field='created_at', changed_field='updated_at', pii=('address',),
+    ),
+    SnapshotTable(
+        'citizens', Citizen,
+        (('id', 'id'), ('first_name', 'first_name'), ('last_name', 'last_name'), ('national_id', 'national_id'),
+         ('date_of_birth', 'date_of_birth'), ('phone_number', 'phone_number'), ('email', 'email'),
+         ('address', 'address'), ('gender', 'gender'), ('marital_status', 'marital_status'), ('city', 'city'),
+         ('is_active', 'is_active'), ('created_at', 'created_at'), ('updated_at', 'updated_at')),
+        partition_field='created_at', changed_field='updated_at',
+        pii=('first_name', 'last_name', 'national_id', 'date_of_birth', 'phone_number', 'email', 'address'),
+    ),
+    SnapshotTable('areas', Area, (('id', 'id'), ('name', 'name'), ('code', 'code'), ('is_active', 'is_active'))),
+    SnapshotTable(
+        'streets', Street,
+        (('id', 'id'), ('name', 'name'), ('code', 'code'), ('area_id', 'area_id'), ('is_active', 'is_active')),
+    ),
+    SnapshotTable(
+        'property_types', PropertyType, (('id', 'id'), ('name', 'name'), ('code', 'code'), ('is_active', 'is_active')),
+    ),
+    SnapshotTable(
+        'tax_periods', TaxPeriod,
+        (('id', 'id'), ('name', 'name'), ('start_date', 'start_date'), ('end_date', 'end_date'),
+         ('is_active', 'is_active')),
+    ),
+]
+
+TABLE_NAMES = [table.name for table in TABLES]
+
+
+def snapshot_dir():
+    return Path(getattr(settings, 'ANALYTICS_SNAPSHOT_DIR', settings.BASE_DIR / 'analytics'))
+
+
+def _arrow_type(field):
+    if isinstance(field, models.ForeignKey):
+        field = field.target_field
+    if isinstance(field, models.BooleanField):
+        return pyarrow.bool_()
+    if isinstance(field, models.DecimalField):
+        return pyarrow.decimal128(field.max_digits, field.decimal_places)
+    if isinstance(field, models.DateTimeField):
+        return pyarrow.timestamp('us', tz='UTC')
+    if isinstance(field, models.DateField):
+        return pyarrow.date32()
+    if isinstance(field, (models.AutoField, models.IntegerField)):
+        return pyarrow.int64()
+    if isinstance(field, models.FloatField):
+        return pyarrow.float64()
+    return pyarrow.string()
+
+
+def _columns(table, include_pii):
+    # A key partition's value is in its directory name, not in the file
+    key = table.partition_field if table.partition_field and not table.monthly else None
+    return [
+        (name, path) for name, path in table.columns
+        if (include_pii or name not in table.pii) and path != key
+    ]
+
+
+def _schema(table, columns):
+    meta = table.model._meta
+    return pyarrow.schema([
+        pyarrow.field(name, _arrow_type(meta.get_field(path))) for name, path in columns
+    ])
+
+
+def _month_start(value):
+    if isinstance(value, datetime):
+        value = timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value.replace(day=1)
+
+
+def _month_filter(table, month):
+    following = (month + timedelta(days=32)).replace(day=1)
+    field = table.model._meta.get_field(table.partition_field)
+    if isinstance(field, models.DateTimeField):
+        month, following = (
+            timezone.make_aware(datetime.combine(day, datetime.min.time())) for day in (month, following)
+        )
+    return {f'{table.partition_field}__gte': month, f'{table.partition_field}__lt': following}
+
+
+def _partitions(table, queryset):
+    """``{directory name: filter}`` of the partitions holding rows of ``queryset``."""
+    queryset = queryset.order_by()
+    if table.monthly:
+        months = queryset.annotate(_month=TruncMonth(table.partition_field)).values_list('_month', flat=True)
+        return {
+            f'month={month:%Y-%m}': _month_filter(table, month)
+            for month in sorted({_month_start(value) for value in months.distinct() if value is not None})
+        }
+    keys = queryset.values_list(table.partition_field, flat=True).distinct()
+    return {f'{table.partition_field}={key}': {table.partition_field: key} for key in sorted(keys, key=str)}
+
+
+def _partition_filter(table, name):
+    """The filter of partition directory ``name`` (``tax_period_id=7`` or ``month=2026-05``)."""
+    value = name.split('=', 1)[1]
+    if table.monthly:
+        return _month_filter(table, datetime.strptime(value, '%Y-%m').date())
+    return {table.partition_field: value}
+
+
+def _holds_any(path, pks, file_format):
+    """Whether the file at ``path`` has a row whose ``id`` is in ``pks`` (a pyarrow array)."""
+    if file_format == 'parquet':
+        ids = pyarrow.parquet.read_table(path, columns=['id']).column('id')
+        return bool(pyarrow.compute.any(pyarrow.compute.is_in(ids, value_set=pks)).as_py())
+    with pyarrow.memory_map(str(path)) as source:
+        ids = pyarrow.ipc.open_file(source).read_all().column('id')
+        return bool(pyarrow.compute.any(pyarrow.compute.is_in(ids, value_set=pks)).as_py())
+
+
+def _vacated_partitions(table, table_dir, changed, rewritten, extension, file_format):
+    """``{directory name: filter}`` of the partitions outside ``rewritten`` still holding a changed row."""
+    if not table.movable or not table_dir.exists():
+        return {}
+    pks = pyarrow.array(list(changed.order_by().values_list('pk', flat=True)), type=pyarrow.int64())
+    if not len(pks):
+        return {}
+    return {
+        path.parent.name: _partition_filter(table, path.parent.name)
+        for path in sorted(table_dir.glob(f'*/part.{extension}'))
+        if path.parent.name not in rewritten and _holds_any(path, pks, file_format)
+    }
+
+
+def _write_file(path, queryset, columns, schema, file_format, batch_size):
+    """Stream ``queryset`` into ``path`` (replaced atomically); returns the row count."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'.{path.name}.tmp')
+    if file_format == 'parquet':
+        writer = pyarrow.parquet.ParquetWriter(tmp_path, schema, compression='zstd')
+    else:
+        writer = pyarrow.ipc.new_file(str(tmp_path), schema)
+    rows = 0
+    try:
+        batch = []
+        values = queryset.order_by('pk').values_list(*[p for _n, p in columns]).iterator(chunk_size=batch_size)
+        for row in values:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                writer.write_table(_batch_table(batch, schema))
+                rows += len(batch)
+                batch = []
+        if batch or not rows:
+            writer.write_table(_batch_table(batch, schema))
+            rows += len(batch)
+    except BaseException:
+        writer.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    writer.close()
+    os.replace(tmp_path, path)
+    return rows
+
+
+def _batch_table(batch, schema):
+    arrays = [list(column) for column in zip(*batch)] if batch else [[] for _field in schema]
+    return pyarrow.Table.from_arrays(
+        [pyarrow.array(values, type=field.type) for values, field in zip(arrays, schema)], schema=schema
+    )
+
+
+def _read_state(output_dir):
+    try:
+        with open(output_dir / STATE_FILE) as state_file:
+            return json.load(state_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_state(output_dir, state):
+    tmp_path = output_dir / f'.{STATE_FILE}.tmp'
+    with open(tmp_path, 'w') as state_file:
+        json.dump(state, state_file, indent=2)
+    os.replace(tmp_path, output_dir / STATE_FILE)
+
+
+def write_snapshots(output_dir=None, tables=None, full=False, include_pii=False, file_format='parquet',
+                    batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Export ``tables`` (names, default all) under ``output_dir``.
+
+    ``progress(table, partition, rows)`` is called after every file. Returns
+    ``{table: (files written, rows written)}``.
+    """
+    if pyarrow is None:
+        raise ImproperlyConfigured('Analytics snapshots need pyarrow: pip install -r requirements-analytics.txt')
+    if file_format not in FORMATS:
+        raise ValueError(f'Unknown snapshot format {file_format!r}')
+    output_dir = Path(output_dir or snapshot_dir())
+    output_dir.mkdir(parents=True, exist_ok=True)
+    extension = 'parquet' if file_format == 'parquet' else 'arrow'
+
+    state = _read_state(output_dir)
+    options = {'format': file_format, 'include_pii': include_pii}
+    if state.get('options') != options:
+        full = True
+        state = {'options': options, 'tables': {}}
+    exported = state.setdefault('tables', {})
+
+    totals = {}
+    for table in TABLES:
+        if tables and table.name not in tables:
+            continue
+        started = timezone.now()
+        columns = _columns(table, include_pii)
+        schema = _schema(table, columns)
+        queryset = table.model._default_manager.all()
+        files = rows = 0
+
+        if not table.partition_field:
+            rows = _write_file(output_dir / f'{table.name}.{extension}', queryset, columns, schema, file_format, batch_size)
+            files = 1
+            if progress:
+                progress(table.name, '', rows)
+        else:
+            table_dir = output_dir / table.name
+            since = exported.get(table.name)
+            if full or since is None:
+                if table_dir.exists():
+                    shutil.rmtree(table_dir)
+                partitions = _partitions(table, queryset)
+            else:
+                changed = queryset.filter(**{
+                    f'{table.changed_field}__gte': datetime.fromisoformat(since) - CLOCK_SKEW
+                })
+                partitions = _partitions(table, changed)
+                partitions.update(
+                    _vacated_partitions(table, table_dir, changed, partitions, extension, file_format)
+                )
+            for partition, lookup in sorted(partitions.items()):
+                count = _write_file(
+                    table_dir / partition / f'part.{extension}', queryset.filter(**lookup),
+                    columns, schema, file_format, batch_size,
+                )
+                files += 1
+                rows += count
+                if progress:
+                    progress(table.name, partition, count)
+
+        exported[table.name] = started.isoformat()
+        _write_state(output_dir, state)
+        totals[table.name] = (files, rows)
+    return totals
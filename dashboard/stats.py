@@ -0,0 +1,156 @@
+"""
+Dashboard statistics.
+
+Every model is counted with a single conditional-aggregation query
+(``COUNT(*) FILTER (WHERE ...)``) instead of one ``COUNT(*)`` per status,
+and the result can optionally be kept in the ``DashboardStat`` summary table
+so the dashboard reads one small table regardless of data volume. Either
+way the counters are cached until one of the counted apps is written.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from city_corporation.caching import get_or_set
+from citizen.models import Citizen
+from holdingtax.models import HoldingTax
+from tradelicense.models import TradeLicense
+from certification.models import Certification
+from tender.models import Tender
+from citizencharter.models import CitizenCharter
+from complaint.models import Complaint
+from contact.models import Contact
+from .models import DashboardStat
+
+
+RECENT_DAYS = 7
+
+# scope -> (model, {key: status value}, field used for the "recent" count)
+DASHBOARD_SOURCES = {
+    'citizens': (Citizen, {}, 'created_at'),
+    'holding_taxes': (HoldingTax, {
+        'pending': 'PENDING',
+        'paid': 'PAID',
+        'partial': 'PARTIAL',
+        'overdue': 'OVERDUE',
+        'waived': 'WAIVED',
+    }, None),
+    'trade_licenses': (TradeLicense, {
+        'pending': 'pending',
+        'approved': 'approved',
+        'expired': 'expired',
+        'rejected': 'rejected',
+    }, 'created_at'),
+    'certifications': (Certification, {
+        'pending': 'pending',
+        'approved': 'approved',
+        'rejected': 'rejected',
+    }, 'created_at'),
+    'tenders': (Tender, {}, None),
+    'citizen_charters': (CitizenCharter, {}, None),
+    'complaints': (Complaint, {
+        'submitted': 'submitted',
+        'in_progress': 'in_progress',
+        'resolved': 'resolved',
+        'closed': 'closed',
+    }, 'submitted_at'),
+    'contacts': (Contact, {}, None),
+}
+
+
+# Cache namespaces (app labels) the counters depend on
+DASHBOARD_NAMESPACES = tuple(sorted({model._meta.app_label for model, _s, _r in DASHBOARD_SOURCES.values()}))
+
+
+def count_model(model, statuses=None, recent_field=None, since=None):
+    """Return total, per-status and recent counts for a model in one query."""
+    aggregates = {'total': Count('pk')}
+    for key, value in (statuses or {}).items():
+        aggregates[key] = Count('pk', filter=Q(status=value))
+    if recent_field:
+        aggregates['recent'] = Count('pk', filter=Q(**{f'{recent_field}__gte': since}))
+    return model.objects.aggregate(**aggregates)
+
+
+def compute_dashboard_counts(now=None):
+    """Compute all dashboard counters live, one query per model."""
+    since = (now or timezone.now()) - timedelta(days=RECENT_DAYS)
+    return {
+        scope: count_model(model, statuses, recent_field, since)
+        for scope, (model, statuses, recent_field) in DASHBOARD_SOURCES.items()
+    }
+
+
+def refresh_dashboard_summary(counts=None):
+    """Recompute the counters and upsert them into the summary table."""
+    if counts is None:
+        counts = compute_dashboard_counts()
+    rows = [
+        DashboardStat(scope=scope, key=key, value=value)
+        for scope, values in counts.items()
+        for key, value in values.items()
+    ]
+    with transaction.atomic():
+        DashboardStat.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['scope', 'key'],
+            update_fields=['value', 'updated_at'],
+        )
+    return counts
+
+
+def read_dashboard_summary(max_age=None):
+    """
+    Read counters from the summary table.
+
+    Returns None when the table is empty, incomplete or older than
+    ``max_age`` seconds so the caller can fall back to a live computation.
+    """
+    counts = {}
+    oldest = None
+    for row in DashboardStat.objects.all():
+        counts.setdefault(row.scope, {})[row.key] = row.value
+        if oldest is None or row.updated_at < oldest:
+            oldest = row.updated_at
+
+    if any(scope not in counts for scope in DASHBOARD_SOURCES):
+        return None
+    if max_age is not None and oldest < timezone.now() - timedelta(seconds=max_age):
+        return None
+    return counts
+
+
+def _counts_from_source():
+    if getattr(settings, 'DASHBOARD_STATS_SOURCE', 'live') != 'summary':
+        return compute_dashboard_counts()
+
+    counts = read_dashboard_summary(max_age=getattr(settings, 'DASHBOARD_SUMMARY_MAX_AGE', 300))
+    if counts is None:
+        counts = refresh_dashboard_summary()
+    return counts
+
+
+def get_dashboard_counts():
+    """Return dashboard counters from the configured source (cached between writes)."""
+    return get_or_set(DASHBOARD_NAMESPACES, 'dashboard:counts', _counts_from_source)
+
+
+def build_dashboard_context(counts):
+    """Shape the counters into the context expected by admin/dashboard.html."""
+    def statuses(scope):
+        return {key: value for key, value in counts[scope].items() if key not in ('total', 'recent')}
+
+    return {
+        'stats': {scope: values['total'] for scope, values in counts.items()},
+        'tax_stats': statuses('holding_taxes'),
+        'license_stats': statuses('trade_licenses'),
+        'complaint_stats': statuses('complaints'),
+        'cert_stats': statuses('certifications'),
+        'recent_citizens': counts['citizens']['recent'],
+        'recent_complaints': counts['complaints']['recent'],
+        'recent_licenses': counts['trade_licenses']['recent'],
+        'recent_certifications': counts['certifications']['recent'],
+    }
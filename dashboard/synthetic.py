@@ -0,0 +1,568 @@
+"""
+Synthetic municipal dataset for load and regression benchmarks.
+
+``generate()`` inserts citizens, areas and streets, properties, tax
+periods, holding taxes with their payments, certifications, trade
+licenses, complaints and tenders. Volumes and value distributions come
+from a profile (``DEFAULT_PROFILE``, optionally overridden from a JSON
+file and scaled).
+
+Rows are produced in chunks of ``batch_size`` with one ``bulk_create`` per
+chunk, on a pool of worker processes (generating model instances is CPU
+bound). Every chunk draws from its own ``random.Random`` seeded with
+``(seed, kind, chunk)`` and primary keys are assigned up front, so
+children can reference parents without a lookup and the same seed on the
+same starting database gives the same data whatever the number of
+workers. Reference numbers are reserved from the sequence allocator in
+one block per kind, so numbers issued later by the application do not
+collide with generated ones.
+
+Creation timestamps and business dates (issue, due, payment dates) are
+spread over the profile's ``years``. ``auto_now_add`` fields cannot be set
+through ``bulk_create``, so each chunk backdates them afterwards with one
+``UPDATE`` per month present in the chunk.
+
+``bulk_create`` also skips ``Complaint.save()``, so the generated
+complaints are MinHash-indexed and clustered at the end, in pk order, like
+``index_complaint_duplicates`` does (``index_duplicates=False`` leaves that
+to the command).
+"""
+import json
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+import django
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from certification.models import Certification, CertificationType
+from city_corporation.caching import NAMESPACES, invalidate
+from city_corporation.reference_data import invalidate_reference_tables
+from citizen.models import Citizen
+from complaint.duplicates import index_complaints
+from complaint.models import Complaint
+from holdingtax.models import Area, HoldingTax, Property, PropertyType, Street, TaxPayment, TaxPeriod
+from sequences.allocator import CERTIFICATE, COMPLAINT, HOLDING_TAX, PAYMENT, TRADE_LICENSE, reserve_block
+from tender.models import Tender
+from tradelicense.models import TradeLicense
+
+
+DEFAULT_BATCH_SIZE = 5000
+CENT = Decimal('0.01')
+
+DEFAULT_PROFILE = {
+    'counts': {
+        'citizens': 1_000_000,
+        'areas': 40,
+        'streets': 1_600,
+        'properties': 400_000,
+        'tax_periods': 5,
+        # At most properties x tax_periods: one demand per property and period
+        'holding_taxes': 1_600_000,
+        'certifications': 250_000,
+        'trade_licenses': 120_000,
+        'complaints': 200_000,
+        'tenders': 4_000,
+    },
+    # Business dates are spread over this many past years
+    'years': 5,
+    'citizen_email_rate': 0.4,
+    'anonymous_complaint_rate': 0.2,
+    # Log-normal assessed property values (median ~ e**mu)
+    'assessed_value': {'mu': 14.0, 'sigma': 0.7},
+    'tax_rates': {'0.50': 2, '1.00': 5, '1.50': 2, '2.00': 1},
+    'weights': {
+        'property_status': {'APPROVED': 85, 'PENDING_APPROVAL': 8, 'DRAFT': 5, 'REJECTED': 2},
+        'holding_tax_status': {'PAID': 55, 'PENDING': 20, 'PARTIAL': 10, 'OVERDUE': 13, 'WAIVED': 2},
+        'payment_method': {'CASH': 35, 'BANK_TRANSFER': 25, 'ONLINE': 30, 'CHEQUE': 8, 'OTHER': 2},
+        'certification_status': {'approved': 70, 'pending': 22, 'rejected': 8},
+        'trade_license_status': {'approved': 65, 'pending': 15, 'expired': 15, 'rejected': 5},
+        'complaint_status': {'resolved': 45, 'closed': 20, 'in_progress': 15, 'submitted': 20},
+        'complaint_priority': {'low': 25, 'medium': 45, 'high': 22, 'urgent': 8},
+        'complaint_category': {
+            'Roads': 20, 'Waste': 22, 'Drainage': 15, 'Streetlights': 12, 'Water Supply': 12,
+            'Mosquitoes': 9, 'Noise': 5, 'Encroachment': 5,
+        },
+        'tender_status': {'published': 30, 'closed': 35, 'awarded': 30, 'draft': 5},
+    },
+}
+
+FIRST_NAMES = [
+    'Abdul', 'Mohammad', 'Rahim', 'Karim', 'Hasan', 'Hossain', 'Rafiq', 'Jamal', 'Kamal', 'Nasir',
+    'Fatema', 'Ayesha', 'Nusrat', 'Sharmin', 'Taslima', 'Rokeya', 'Shirin', 'Nasrin', 'Sadia', 'Farhana',
+    'Arif', 'Imran', 'Sabbir', 'Tanvir', 'Mahmud', 'Shahin', 'Rubina', 'Jannat', 'Mitu', 'Lipi',
+]
+LAST_NAMES = [
+    'Rahman', 'Islam', 'Hossain', 'Ahmed', 'Khan', 'Chowdhury', 'Uddin', 'Mia', 'Sarker', 'Das',
+    'Begum', 'Akter', 'Khatun', 'Sheikh', 'Talukder', 'Bhuiyan', 'Mollah', 'Sikder', 'Roy', 'Paul',
+]
+OCCUPATIONS = ['Service', 'Business', 'Teacher', 'Farmer', 'Student', 'Homemaker', 'Driver', 'Engineer', '']
+BUSINESS_TYPES = ['Retail', 'Grocery', 'Pharmacy', 'Restaurant', 'Workshop', 'Tailoring', 'Electronics', 'Wholesale']
+PROPERTY_TYPES = [('SYN-RES', 'Residential'), ('SYN-COM', 'Commercial'), ('SYN-IND', 'Industrial'), ('SYN-MIX', 'Mixed Use')]
+CERTIFICATION_TYPES = [
+    ('SYN-CIT', 'Citizenship Certificate', 365), ('SYN-CHR', 'Character Certificate', 180),
+    ('SYN-INC', 'Income Certificate', 365), ('SYN-HEIR', 'Heirship Certificate', 3650),
+]
+COMPLAINT_SUBJECTS = {
+    'Roads': ['Potholes on {street}', 'Broken road surface near {street}', 'Road dug up and not repaired on {street}'],
+    'Waste': ['Garbage not collected on {street}', 'Overflowing dustbin at {street}', 'Waste dumped beside {street}'],
+    'Drainage': ['Blocked drain on {street}', 'Waterlogging after rain at {street}', 'Open manhole on {street}'],
+    'Streetlights': ['Streetlight not working on {street}', 'Several streetlights off along {street}'],
+    'Water Supply': ['No water supply in {street}', 'Dirty water from supply line at {street}'],
+    'Mosquitoes': ['Mosquito breeding near {street}', 'No spraying done in {street}'],
+    'Noise': ['Loudspeaker noise late at night on {street}', 'Construction noise at night near {street}'],
+    'Encroachment': ['Footpath occupied by shops on {street}', 'Illegal structure blocking {street}'],
+}
+COMPLAINT_DETAILS = [
+    'The problem has continued for {days} days.', 'Residents have complained several times.',
+    'It is causing trouble for children and elderly people.', 'Please take action as soon as possible.',
+    'The situation gets worse after rain.', 'Nobody from the ward office has visited yet.',
+]
+TENDER_WORKS = [
+    'Resurfacing of {street}', 'Construction of drain along {street}', 'Installation of LED streetlights on {street}',
+    'Supply of waste collection vehicles', 'Renovation of ward office', 'Construction of footpath on {street}',
+]
+
+# Kinds generated in worker processes, in dependency order
+PHASES = [
+    ['citizens'],
+    ['properties'],
+    ['holding_taxes', 'certifications', 'trade_licenses', 'complaints', 'tenders'],
+]
+KIND_MODELS = {
+    'citizens': Citizen,
+    'properties': Property,
+    'holding_taxes': HoldingTax,
+    'certifications': Certification,
+    'trade_licenses': TradeLicense,
+    'complaints': Complaint,
+    'tenders': Tender,
+}
+KIND_PREFIXES = {
+    'holding_taxes': HOLDING_TAX,
+    'certifications': CERTIFICATE,
+    'trade_licenses': TRADE_LICENSE,
+    'complaints': COMPLAINT,
+}
+
+
+def load_profile(path=None, scale=1.0):
+    """
+    ``DEFAULT_PROFILE`` updated from the JSON file at ``path``.
+
+    Row counts are multiplied by ``scale``; areas, streets and tax periods
+    describe the city itself and are not scaled.
+    """
+    profile = json.loads(json.dumps(DEFAULT_PROFILE))
+    if path:
+        with open(path) as handle:
+            overrides = json.load(handle)
+        for key, value in overrides.items():
+            if isinstance(value, dict) and isinstance(profile.get(key), dict):
+                profile[key].update(value)  # a distribution is replaced as a whole
+            else:
+                profile[key] = value
+    counts = profile['counts']
+    for kind, count in counts.items():
+        if kind not in ('areas', 'streets', 'tax_periods'):
+            counts[kind] = max(int(count * scale), 0)
+    counts['holding_taxes'] = min(counts['holding_taxes'], counts['properties'] * counts['tax_periods'])
+    if counts['citizens'] < 1 and any(counts[kind] for kind in ('properties', 'certifications', 'trade_licenses')):
+        raise ValueError('Properties, certifications and trade licenses need at least one citizen')
+    return profile
+
+
+class _Chooser:
+    """Weighted choice from a ``{value: weight}`` distribution."""
+
+    def __init__(self, weights):
+        self.values = list(weights)
+        self.cum_weights = []
+        total = 0
+        for weight in weights.values():
+            total += weight
+            self.cum_weights.append(total)
+
+    def __call__(self, rng):
+        return rng.choices(self.values, cum_weights=self.cum_weights)[0]
+
+
+def _choosers(profile):
+    return {name: _Chooser(weights) for name, weights in profile['weights'].items()}
+
+
+def _created(rng, ctx):
+    """Creation time in one of the last ``years * 12`` months (month granularity keeps backdating cheap)."""
+    return ctx['now'] - timedelta(days=30 * rng.randrange(max(ctx['profile']['years'] * 12, 1)))
+
+
+def _after(rng, moment, ctx, days):
+    return min(moment + timedelta(days=rng.randint(1, days)), ctx['now'])
+
+
+def _number(ctx, kind, index):
+    prefix = KIND_PREFIXES[kind]
+    return f"{prefix}-{ctx['year']}-{ctx['numbers'][kind] + index:06d}"
+
+
+def _street_name(ctx, street_index):
+    return f'Road {street_index + 1}, {ctx["areas"][ctx["streets"][street_index][1]][1]}'
+
+
+def _citizens(rng, start, stop, ctx, choose):
+    base = ctx['bases']['citizens']
+    email_rate = ctx['profile']['citizen_email_rate']
+    rows = []
+    for n in range(start, stop):
+        pk = base + n
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        rows.append((_created(rng, ctx), Citizen(
+            pk=pk,
+            first_name=first,
+            last_name=last,
+            gender=rng.choice('MF'),
+            marital_status=rng.choice('SMMMDW'),
+            date_of_birth=ctx['today'] - timedelta(days=rng.randrange(18 * 365, 85 * 365)),
+            national_id=f'{9_000_000_000_000 + pk:013d}',
+            phone_number=f'01{rng.randint(3, 9)}{rng.randrange(10 ** 8):08d}',
+            email=f'{first.lower()}.{last.lower()}{pk}@example.com' if rng.random() < email_rate else '',
+            address=f'House {rng.randint(1, 200)}, {_street_name(ctx, rng.randrange(len(ctx["streets"])))}',
+            city=ctx['city'],
+            occupation=rng.choice(OCCUPATIONS),
+        )))
+    return rows
+
+
+def _properties(rng, start, stop, ctx, choose):
+    base, owners = ctx['bases']['properties'], ctx['counts']['citizens']
+    value = ctx['profile']['assessed_value']
+    rates = _Chooser(ctx['profile']['tax_rates'])
+    rows = []
+    for n in range(start, stop):
+        street_index = rng.randrange(len(ctx['streets']))
+        street_id, area_index = ctx['streets'][street_index]
+        area_sqft = Decimal(rng.randint(400, 6000))
+        rows.append((_created(rng, ctx), Property(
+            pk=base + n,
+            property_number=f'SYN-{base + n:09d}',
+            property_type_id=rng.choice(ctx['property_types']),
+            owner_id=ctx['bases']['citizens'] + rng.randrange(owners),
+            address=f'Holding {rng.randint(1, 400)}, {_street_name(ctx, street_index)}',
+            area_id=ctx['areas'][area_index][0],
+            street_id=street_id,
+            city=ctx['city'],
+            area_sqft=area_sqft,
+            assessed_value=Decimal(int(rng.lognormvariate(value['mu'], value['sigma']))),
+            tax_rate=Decimal(rates(rng)),
+            status=choose['property_status'](rng),
+        )))
+    return rows
+
+
+def _holding_taxes(rng, start, stop, ctx, choose):
+    base, properties = ctx['bases']['holding_taxes'], ctx['counts']['properties']
+    property_base = ctx['bases']['properties']
+    property_values = {
+        pk: (assessed, rate) for pk, assessed, rate in Property.objects.filter(
+            pk__in={property_base + n % properties for n in range(start, stop)}
+        ).values_list('pk', 'assessed_value', 'tax_rate')
+    }
+    taxes, payments = [], []
+    for n in range(start, stop):
+        property_id = property_base + n % properties
+        period_id, period_start, period_end = ctx['periods'][(n // properties) % len(ctx['periods'])]
+        assessed, rate = property_values[property_id]
+        amount = max((assessed * rate / Decimal('100')).quantize(CENT, ROUND_HALF_UP), CENT)
+        status = choose['holding_tax_status'](rng)
+        penalty = (amount * Decimal('0.05')).quantize(CENT) if status == 'OVERDUE' else Decimal('0.00')
+        paid = {'PAID': amount, 'PARTIAL': (amount * Decimal(rng.randint(10, 90)) / 100).quantize(CENT)}.get(
+            status, Decimal('0.00')
+        )
+        tax = HoldingTax(
+            pk=base + n,
+            tax_number=_number(ctx, 'holding_taxes', n),
+            holding_property_id=property_id,
+            tax_period_id=period_id,
+            tax_amount=amount,
+            paid_amount=paid,
+            penalty_amount=penalty,
+            due_date=period_end,
+            status=status,
+        )
+        created = timezone.make_aware(datetime.combine(period_start, time(9)))
+        taxes.append((min(created, ctx['now']), tax))
+        if paid:
+            payment_date = min(period_end - timedelta(days=rng.randrange(300)), ctx['today'])
+            payments.append(TaxPayment(
+                payment_number=f"{PAYMENT}-{ctx['year']}-{ctx['numbers']['payments'] + n:06d}",
+                holding_tax_id=tax.pk,
+                payment_date=payment_date,
+                amount=paid,
+                payment_method=choose['payment_method'](rng),
+                reference_number=f'SYN{rng.randrange(10 ** 10):010d}',
+                balance_after=amount + penalty - paid,
+            ))
+    return taxes, payments
+
+
+def _certifications(rng, start, stop, ctx, choose):
+    base, citizens = ctx['bases']['certifications'], ctx['counts']['citizens']
+    rows = []
+    for n in range(start, stop):
+        type_id, validity_days = rng.choice(ctx['certification_types'])
+        status = choose['certification_status'](rng)
+        created = _created(rng, ctx)
+        issue_date = _after(rng, created, ctx, 15).date() if status == 'approved' else None
+        rows.append((created, Certification(
+            pk=base + n,
+            citizen_id=ctx['bases']['citizens'] + rng.randrange(citizens),
+            certification_type_id=type_id,
+            certificate_number=_number(ctx, 'certifications', n),
+            status=status,
+            issue_date=issue_date,
+            expiry_date=issue_date + timedelta(days=validity_days) if issue_date else None,
+            rejection_reason='Supporting documents missing' if status == 'rejected' else '',
+        )))
+    return rows
+
+
+def _trade_licenses(rng, start, stop, ctx, choose):
+    base, citizens = ctx['bases']['trade_licenses'], ctx['counts']['citizens']
+    rows = []
+    for n in range(start, stop):
+        business_type = rng.choice(BUSINESS_TYPES)
+        created = _created(rng, ctx)
+        issue_date = _after(rng, created, ctx, 10).date()
+        rows.append((created, TradeLicense(
+            pk=base + n,
+            citizen_id=ctx['bases']['citizens'] + rng.randrange(citizens),
+            license_number=_number(ctx, 'trade_licenses', n),
+            business_name=f'{rng.choice(LAST_NAMES)} {business_type} {rng.randint(1, 99)}',
+            business_type=business_type,
+            business_address=f'Shop {rng.randint(1, 300)}, {_street_name(ctx, rng.randrange(len(ctx["streets"])))}',
+            issue_date=issue_date,
+            expiry_date=issue_date + timedelta(days=365),
+            status=choose['trade_license_status'](rng),
+            license_fee=Decimal(rng.choice([500, 1000, 2000, 3000, 5000])),
+        )))
+    return rows
+
+
+def _complaints(rng, start, stop, ctx, choose):
+    base, citizens = ctx['bases']['complaints'], ctx['counts']['citizens']
+    anonymous = ctx['profile']['anonymous_complaint_rate']
+    rows = []
+    for n in range(start, stop):
+        category = choose['complaint_category'](rng)
+        street = _street_name(ctx, rng.randrange(len(ctx['streets'])))
+        status = choose['complaint_status'](rng)
+        details = rng.sample(COMPLAINT_DETAILS, 2)
+        created = _created(rng, ctx)
+        closed = status in ('resolved', 'closed')
+        rows.append((created, Complaint(
+            pk=base + n,
+            citizen_id=None if not citizens or rng.random() < anonymous else ctx['bases']['citizens'] + rng.randrange(citizens),
+            complaint_number=_number(ctx, 'complaints', n),
+            subject=rng.choice(COMPLAINT_SUBJECTS.get(category, ['Problem at {street}'])).format(street=street),
+            description=' '.join(details).format(days=rng.randint(2, 60)),
+            category=category,
+            status=status,
+            priority=choose['complaint_priority'](rng),
+            resolution='Resolved by the ward office.' if closed else '',
+            resolved_at=_after(rng, created, ctx, 30) if closed else None,
+        )))
+    return rows
+
+
+def _tenders(rng, start, stop, ctx, choose):
+    base = ctx['bases']['tenders']
+    rows = []
+    for n in range(start, stop):
+        created = _created(rng, ctx)
+        opening = _after(rng, created, ctx, 7)
+        rows.append((created, Tender(
+            pk=base + n,
+            title=rng.choice(TENDER_WORKS).format(street=_street_name(ctx, rng.randrange(len(ctx['streets'])))),
+            description='Sealed tenders are invited from eligible contractors.',
+            tender_number=f'SYN-TN-{base + n:08d}',
+            opening_date=opening,
+            closing_date=opening + timedelta(days=rng.choice([15, 21, 30])),
+            estimated_value=Decimal(rng.randrange(5, 500) * 100_000),
+            status=choose['tender_status'](rng),
+        )))
+    return rows
+
+
+# Field each kind's creation time is written to
+CREATED_FIELDS = {
+    'citizens': 'created_at',
+    'properties': 'created_at',
+    'holding_taxes': 'created_at',
+    'certifications': 'created_at',
+    'trade_licenses': 'created_at',
+    'complaints': 'submitted_at',
+    'tenders': 'created_at',
+}
+
+GENERATORS = {
+    'citizens': _citizens,
+    'properties': _properties,
+    'holding_taxes': _holding_taxes,
+    'certifications': _certifications,
+    'trade_licenses': _trade_licenses,
+    'complaints': _complaints,
+    'tenders': _tenders,
+}
+
+
+def _insert(kind, rows, batch_size):
+    """bulk_create ``(created, instance)`` rows, then backdate their creation time."""
+    model = KIND_MODELS[kind]
+    model.objects.bulk_create([instance for _created, instance in rows], batch_size=batch_size)
+    by_created = {}
+    for created, instance in rows:
+        by_created.setdefault(created, []).append(instance.pk)
+    for created, pks in by_created.items():
+        model.objects.filter(pk__in=pks).update(**{CREATED_FIELDS[kind]: created})
+
+
+def generate_chunk(kind, chunk, start, stop, ctx):
+    """Generate and insert rows ``start``..``stop`` of ``kind``; returns ``[(kind, rows inserted)]``."""
+    rng = random.Random(f"{ctx['seed']}:{kind}:{chunk}")
+    rows = GENERATORS[kind](rng, start, stop, ctx, _choosers(ctx['profile']))
+    try:
+        with transaction.atomic():
+            if kind == 'holding_taxes':
+                taxes, payments = rows
+                _insert(kind, taxes, ctx['batch_size'])
+                TaxPayment.objects.bulk_create(payments, batch_size=ctx['batch_size'])
+                return [(kind, len(taxes)), ('payments', len(payments))]
+            _insert(kind, rows, ctx['batch_size'])
+            return [(kind, len(rows))]
+    finally:
+        if ctx['workers'] > 1:
+            connection.close()
+
+
+def _next_pk(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+def _reference_data(ctx, counts, rng):
+    """Areas, streets, tax periods and types (small; created in this process)."""
+    area_base = _next_pk(Area)
+    Area.objects.bulk_create([
+        Area(pk=area_base + n, name=f'Ward {n + 1}', code=f'SYN-A{area_base + n}') for n in range(counts['areas'])
+    ])
+    ctx['areas'] = [(area_base + n, f'Ward {n + 1}') for n in range(counts['areas'])]
+
+    street_base = _next_pk(Street)
+    area_indexes = [rng.randrange(len(ctx['areas'])) for _ in range(counts['streets'])]
+    Street.objects.bulk_create([
+        Street(pk=street_base + n, name=f'Road {n + 1}', code=f'SYN-S{street_base + n}', area_id=ctx['areas'][area_index][0])
+        for n, area_index in enumerate(area_indexes)
+    ])
+    ctx['streets'] = [(street_base + n, area_index) for n, area_index in enumerate(area_indexes)]
+
+    ctx['property_types'] = [
+        PropertyType.objects.get_or_create(code=code, defaults={'name': f'{name} (synthetic)'})[0].pk
+        for code, name in PROPERTY_TYPES
+    ]
+    ctx['certification_types'] = [
+        (CertificationType.objects.get_or_create(
+            code=code, defaults={'name': f'{name} (synthetic)', 'validity_days': validity}
+        )[0].pk, validity)
+        for code, name, validity in CERTIFICATION_TYPES
+    ]
+    periods = []
+    first_year = ctx['today'].year - counts['tax_periods'] + (1 if ctx['today'].month >= 7 else 0)
+    for year in range(first_year, first_year + counts['tax_periods']):
+        period, _created = TaxPeriod.objects.get_or_create(
+            name=f'FY {year}-{year + 1} (synthetic)',
+            defaults={'start_date': date(year, 7, 1), 'end_date': date(year + 1, 6, 30)},
+        )
+        periods.append((period.pk, period.start_date, period.end_date))
+    ctx['periods'] = periods
+
+
+def _reset_sequences():
+    models = list(KIND_MODELS.values()) + [Area, Street]
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+
+def generate(profile, seed=1, workers=4, batch_size=DEFAULT_BATCH_SIZE, progress=None, index_duplicates=True):
+    """
+    Insert the dataset described by ``profile``; returns rows created per kind.
+
+    ``progress(kind, rows)`` is called after every chunk. SQLite allows a
+    single writer, so it always runs with one worker. With
+    ``index_duplicates`` the generated complaints are clustered afterwards
+    and ``progress('clustered_complaints', rows)`` reports how many joined
+    a cluster.
+    """
+    if connection.vendor == 'sqlite':
+        workers = 1
+    counts = profile['counts']
+    if counts['streets'] and not counts['areas']:
+        raise ValueError('Streets need at least one area')
+    if any(counts[kind] for kind in ('citizens', 'properties', 'complaints', 'trade_licenses', 'tenders')) \
+            and not counts['streets']:
+        raise ValueError('Addresses are drawn from streets; generate at least one street')
+    today = timezone.localdate()
+    ctx = {
+        'seed': seed,
+        'profile': profile,
+        'counts': counts,
+        'batch_size': batch_size,
+        'workers': workers,
+        'today': today,
+        # Dates are relative to the start of today, so reruns on the same day match
+        'now': timezone.make_aware(datetime.combine(today, time())),
+        'year': today.year,
+        'city': profile.get('city', 'Rangpur'),
+        'bases': {kind: _next_pk(model) for kind, model in KIND_MODELS.items()},
+        'numbers': {kind: reserve_block(prefix, today.year, max(counts[kind], 1))[0] for kind, prefix in KIND_PREFIXES.items()},
+    }
+    # One payment number per holding tax at most
+    ctx['numbers']['payments'] = reserve_block(PAYMENT, today.year, max(counts['holding_taxes'], 1))[0]
+    _reference_data(ctx, counts, random.Random(f'{seed}:reference'))
+    totals = {'areas': counts['areas'], 'streets': counts['streets'], 'tax_periods': counts['tax_periods']}
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup
+        )
+    try:
+        for phase in PHASES:
+            jobs = [
+                (kind, chunk, start, min(start + batch_size, counts[kind]), ctx)
+                for kind in phase
+                for chunk, start in enumerate(range(0, counts[kind], batch_size))
+            ]
+            results = pool.map(generate_chunk, *zip(*jobs)) if pool and jobs else map(lambda job: generate_chunk(*job), jobs)
+            for result in results:
+                for kind, rows in result:
+                    totals[kind] = totals.get(kind, 0) + rows
+                    if progress:
+                        progress(kind, rows)
+    finally:
+        if pool:
+            pool.shutdown()
+    _reset_sequences()
+    if index_duplicates and counts['complaints']:
+        clustered = index_complaints(Complaint.objects.filter(
+            pk__gte=ctx['bases']['complaints'], minhash__isnull=True,
+        ))
+        if progress:
+            progress('clustered_complaints', clustered)
+    invalidate(*NAMESPACES)
+    invalidate_reference_tables()
+    return totals
@@ -0,0 +1,92 @@
+import shutil
+import tempfile
+from datetime import date
+from pathlib import Path
+from unittest import skipUnless
+from django.test import TestCase
+from django.utils import timezone
+
+from city_corporation.query_budgets import check_budgets
+from holdingtax.models import HoldingTax, TaxPeriod
+from holdingtax.tests import create_holding_taxes
+from . import snapshots
+
+
+class QueryBudgetTests(TestCase):
+    def test_views_within_query_budgets(self):
+        failures = [
+            (result.view.url_name, result.status, result.queries, result.view.budget, result.per_row)
+            for result in check_budgets()
+            if result.failed
+        ]
+        self.assertEqual(failures, [])
+
+
+@skipUnless(snapshots.pyarrow, 'needs pyarrow')
+class AnalyticsSnapshotTests(TestCase):
+    def setUp(self):
+        self.output = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.output)
+        self.holding_taxes = create_holding_taxes(3)
+        self.period = self.holding_taxes[0].tax_period
+        self.other_period = TaxPeriod.objects.create(
+            name='2027', start_date=date(2027, 1, 1), end_date=date(2027, 12, 31),
+        )
+        HoldingTax.objects.filter(pk=self.holding_taxes[2].pk).update(tax_period=self.other_period)
+
+    def snapshot(self, **kwargs):
+        totals = snapshots.write_snapshots(self.output, tables=['holding_taxes', 'citizens', 'areas'], **kwargs)
+        # Rows written before this run are older than the clock-skew window by the next one
+        for model in (HoldingTax, snapshots.Citizen):
+            model.objects.update(updated_at=timezone.now() - snapshots.CLOCK_SKEW * 2)
+        return totals
+
+    def partition(self, path):
+        return snapshots.pyarrow.parquet.read_table(self.output / path / 'part.parquet')
+
+    def ids(self, period):
+        return sorted(self.partition(f'holding_taxes/tax_period_id={period.pk}').column('id').to_pylist())
+
+    def test_full_run_partitions_rows_and_leaves_out_pii(self):
+        totals = self.snapshot()
+        self.assertEqual(totals['holding_taxes'], (2, 3))
+        self.assertEqual(totals['areas'], (1, 1))
+        self.assertEqual(self.ids(self.period), [self.holding_taxes[0].pk, self.holding_taxes[1].pk])
+        self.assertEqual(self.ids(self.other_period), [self.holding_taxes[2].pk])
+
+        citizens = self.partition(f'citizens/month={timezone.localdate():%Y-%m}')
+        self.assertNotIn('national_id', citizens.column_names)
+        self.assertEqual(citizens.num_rows, 1)
+
+    def test_unchanged_tables_write_no_partitions(self):
+        self.snapshot()
+        totals = self.snapshot()
+        self.assertEqual((totals['holding_taxes'], totals['citizens']), ((0, 0), (0, 0)))
+        self.assertEqual(totals['areas'], (1, 1))
+
+    def test_only_changed_partitions_are_rewritten(self):
+        self.snapshot()
+        changed = self.holding_taxes[0]
+        changed.refresh_from_db()
+        changed.paid_amount = changed.tax_amount
+        changed.save()
+
+        self.assertEqual(self.snapshot()['holding_taxes'], (1, 2))
+        table = self.partition(f'holding_taxes/tax_period_id={self.period.pk}')
+        paid = dict(zip(table.column('id').to_pylist(), table.column('paid_amount').to_pylist()))
+        self.assertEqual(paid[changed.pk], changed.tax_amount)
+
+    def test_row_moved_to_another_partition_leaves_the_old_one(self):
+        self.snapshot()
+        moved = self.holding_taxes[0]
+        HoldingTax.objects.filter(pk=moved.pk).update(tax_period=self.other_period, updated_at=timezone.now())
+
+        self.assertEqual(self.snapshot()['holding_taxes'], (2, 3))
+        self.assertEqual(self.ids(self.period), [self.holding_taxes[1].pk])
+        self.assertEqual(self.ids(self.other_period), [moved.pk, self.holding_taxes[2].pk])
+
+    def test_changing_options_forces_a_full_run(self):
+        self.snapshot()
+        self.assertEqual(self.snapshot(include_pii=True)['holding_taxes'], (2, 3))
+        self.assertEqual(self.snapshot(file_format='arrow')['holding_taxes'], (2, 3))
+        self.assertFalse(list(self.output.glob('holding_taxes/*/part.parquet')))
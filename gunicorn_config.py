@@ -9,8 +9,12 @@ bind = "unix:/run/rcc_gunicorn.sock"
 backlog = 2048
 
 # Worker processes
+# gthread workers heartbeat from their main thread, so `timeout` only kills
+# a hung worker, not one streaming a long download (CSV/XLSX list exports,
+# certificate ZIPs); a sync worker is killed 30s into any response.
 workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = "sync"
+worker_class = "gthread"
+threads = 4
 worker_connections = 1000
 timeout = 30
 keepalive = 2
@@ -39,8 +43,10 @@ tmp_upload_dir = None
 # Preload app
 preload_app = True
 
-# Worker timeout
-graceful_timeout = 30
+# Seconds a recycled or restarted worker may spend finishing in-flight
+# requests, so running exports complete across max_requests recycling and
+# deploys (systemd's TimeoutStopSec must be longer)
+graceful_timeout = 600
 
 # Restart workers after this many requests
 max_requests = 1000
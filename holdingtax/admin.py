@@ -1,7 +1,9 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from .demands import queue_demand_generation
+from .payments import post_payment
 from .models import (
     Area, Street, PropertyType, Property, TaxPeriod,
-    HoldingTax, AttachmentType, PropertyAttachment, TaxPayment
+    HoldingTax, AttachmentType, PropertyAttachment, TaxPayment, DemandGenerationRun, OverdueSweepRun
 )
 
 
@@ -61,6 +63,41 @@ class TaxPeriodAdmin(admin.ModelAdmin):
     list_filter = ('is_active', 'created_at')
     search_fields = ('name',)
     readonly_fields = ('created_at',)
+    actions = ['generate_demands']
+
+    @admin.action(description='Generate holding tax demands (background)')
+    def generate_demands(self, request, queryset):
+        for tax_period in queryset:
+            if queue_demand_generation(tax_period, user=request.user):
+                self.message_user(
+                    request, f'Demand generation queued for {tax_period.name}; the demand run worker will start it.'
+                )
+            else:
+                self.message_user(
+                    request, f'Demand generation is already queued or running for {tax_period.name}.', messages.WARNING
+                )
+
+
+@admin.register(DemandGenerationRun)
+class DemandGenerationRunAdmin(admin.ModelAdmin):
+    list_display = ('tax_period', 'status', 'created_count', 'skipped_count', 'started_by', 'started_at', 'finished_at')
+    list_filter = ('status', 'tax_period')
+    readonly_fields = (
+        'tax_period', 'status', 'due_date', 'created_count', 'skipped_count', 'error',
+        'started_by', 'started_at', 'heartbeat_at', 'finished_at', 'created_at'
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(OverdueSweepRun)
+class OverdueSweepRunAdmin(admin.ModelAdmin):
+    list_display = ('as_of', 'marked_overdue', 'penalties_updated', 'started_at', 'finished_at')
+    readonly_fields = ('as_of', 'marked_overdue', 'penalties_updated', 'rule', 'started_at', 'finished_at')
+
+    def has_add_permission(self, request):
+        return False
 
 
 @admin.register(HoldingTax)
@@ -103,7 +140,7 @@ class TaxPaymentAdmin(admin.ModelAdmin):
     list_display = ('payment_number', 'holding_tax', 'payment_date', 'amount', 'payment_method', 'received_by', 'created_at')
     list_filter = ('payment_method', 'payment_date', 'created_at')
     search_fields = ('payment_number', 'holding_tax__tax_number', 'reference_number', 'cheque_number')
-    readonly_fields = ('created_at',)
+    readonly_fields = ('balance_after', 'idempotency_key', 'created_at')
     fieldsets = (
         ('Payment Information', {
             'fields': ('payment_number', 'holding_tax', 'payment_date', 'amount', 'payment_method')
@@ -112,6 +149,20 @@ class TaxPaymentAdmin(admin.ModelAdmin):
             'fields': ('reference_number', 'cheque_number', 'bank_name', 'notes', 'received_by')
         }),
         ('System', {
-            'fields': ('created_at',)
+            'fields': ('balance_after', 'idempotency_key', 'created_at')
         }),
     )
+
+    def get_readonly_fields(self, request, obj=None):
+        # Posted amounts are part of the holding tax ledger
+        if obj:
+            return self.readonly_fields + ('holding_tax', 'amount')
+        return self.readonly_fields
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            super().save_model(request, obj, form, change)
+            return
+        if not obj.received_by:
+            obj.received_by = request.user
+        post_payment(obj.holding_tax_id, obj)
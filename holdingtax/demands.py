@@ -0,0 +1,216 @@
+"""
+Bulk holding-tax demand generation.
+
+At fiscal-year rollover every approved, active property gets one
+``HoldingTax`` demand for the new ``TaxPeriod``, computed like
+``Property.annual_tax_amount``. Properties are walked in primary-key order
+in chunks (one ``bulk_create`` per chunk, each in its own transaction), and
+areas are processed in parallel worker threads.
+
+Generation is idempotent and resumable: properties that already have a
+demand for the period are skipped, and the unique constraint on
+(``tax_period``, ``holding_property``) also rejects duplicates from an
+overlapping run. Each chunk takes its tax numbers (``HT-YYYY-NNNNNN``, the
+same series ``HoldingTax.save()`` uses) as one block from the sequence
+allocator. An interrupted run is completed by simply running it again.
+
+Runs are recorded as ``DemandGenerationRun`` rows. The admin action only
+queues one (``queue_demand_generation``); ``python manage.py
+process_demand_runs``, a worker service outside gunicorn, claims and
+executes queued runs. At most one run per period is queued or running (a
+unique constraint), and a running run renews ``heartbeat_at`` after every
+chunk: when the heartbeat is older than ``DEMAND_RUN_LEASE`` its worker is
+gone and the next worker takes the run over.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from city_corporation.caching import invalidate_on_commit
+from sequences.allocator import HOLDING_TAX, format_number, reserve_block
+from .models import DemandGenerationRun, HoldingTax, Property
+
+
+DEFAULT_BATCH_SIZE = 5000
+CENT = Decimal("0.01")
+# A running run whose heartbeat is older than this is taken over
+DEMAND_RUN_LEASE = timedelta(minutes=10)
+
+
+def _number_demands(demands):
+    """Give ``demands`` consecutive tax numbers from one reserved block."""
+    year = timezone.localdate().year
+    first, _last = reserve_block(HOLDING_TAX, year, len(demands))
+    for value, demand in enumerate(demands, start=first):
+        demand.tax_number = format_number(HOLDING_TAX, year, value)
+
+
+def billable_properties():
+    """Properties that receive a demand each period."""
+    return Property.objects.filter(status="APPROVED", is_active=True)
+
+
+def _area_filter(queryset, area_id):
+    if area_id is None:
+        return queryset.filter(area__isnull=True)
+    return queryset.filter(area_id=area_id)
+
+
+def _generate_for_area(tax_period, area_id, due_date, batch_size, created_by_id, progress):
+    """Create the missing demands for one area; returns (created, skipped)."""
+    properties = _area_filter(billable_properties(), area_id).order_by("pk")
+    created = skipped = 0
+    last_pk = 0
+    while True:
+        rows = list(
+            properties.filter(pk__gt=last_pk)
+            .values_list("pk", "assessed_value", "tax_rate")[:batch_size]
+        )
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+
+        pks = [pk for pk, _v, _r in rows]
+        with transaction.atomic():
+            billed = set(
+                HoldingTax.objects.filter(
+                    tax_period=tax_period, holding_property_id__in=pks
+                ).values_list("holding_property_id", flat=True)
+            )
+            demands = []
+            for pk, assessed_value, tax_rate in rows:
+                amount = (assessed_value * tax_rate / Decimal("100.00")).quantize(CENT, ROUND_HALF_UP)
+                if pk in billed or amount <= 0:
+                    continue
+                demands.append(HoldingTax(
+                    holding_property_id=pk,
+                    tax_period=tax_period,
+                    tax_amount=amount,
+                    due_date=due_date,
+                    created_by_id=created_by_id,
+                ))
+            inserted = 0
+            if demands:
+                _number_demands(demands)
+                HoldingTax.objects.bulk_create(demands, ignore_conflicts=True)
+                # ignore_conflicts hides rows an overlapping run inserted first
+                inserted = HoldingTax.objects.filter(
+                    tax_period=tax_period, holding_property_id__in=pks
+                ).count() - len(billed)
+                invalidate_on_commit("holdingtax")
+        created += inserted
+        skipped += len(rows) - inserted
+        if progress:
+            progress(inserted, len(rows) - inserted)
+    return created, skipped
+
+
+def _worker(*args):
+    """Run one area in a worker thread (each thread has its own connection)."""
+    try:
+        return _generate_for_area(*args)
+    finally:
+        connection.close()
+
+
+def generate_demands(tax_period, due_date=None, batch_size=DEFAULT_BATCH_SIZE, workers=1,
+                     created_by=None, progress=None):
+    """
+    Generate the missing demands for ``tax_period``.
+
+    ``progress(created, skipped)`` is called after every chunk. Returns a dict
+    with the totals. SQLite allows a single writer, so it always runs with
+    one worker.
+    """
+    due_date = due_date or tax_period.end_date
+    created_by_id = created_by.pk if created_by else None
+    area_ids = list(
+        billable_properties().order_by("area_id").values_list("area_id", flat=True).distinct()
+    )
+    if connection.vendor == "sqlite":
+        workers = 1
+
+    jobs = [(tax_period, area_id, due_date, batch_size, created_by_id, progress) for area_id in area_ids]
+    if workers > 1 and len(jobs) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda job: _worker(*job), jobs))
+    else:
+        results = [_generate_for_area(*job) for job in jobs]
+
+    return {
+        "areas": len(area_ids),
+        "created": sum(created for created, _skipped in results),
+        "skipped": sum(skipped for _created, skipped in results),
+    }
+
+
+def queue_demand_generation(tax_period, user=None, due_date=None):
+    """
+    Queue a run for ``tax_period`` for the ``process_demand_runs`` worker.
+
+    Returns the new run, or None when a run for the period is already
+    queued or running.
+    """
+    try:
+        with transaction.atomic():
+            return DemandGenerationRun.objects.create(
+                tax_period=tax_period, due_date=due_date or tax_period.end_date, started_by=user
+            )
+    except IntegrityError:
+        return None
+
+
+def claim_demand_run(run_id=None, tax_period=None):
+    """
+    Lease the oldest queued run, or a running one whose heartbeat is stale.
+
+    Returns the claimed run (now RUNNING), or None when there is nothing to
+    run. ``run_id`` or ``tax_period`` restrict the candidates.
+    """
+    stale = timezone.now() - DEMAND_RUN_LEASE
+    candidates = DemandGenerationRun.objects.filter(
+        Q(status="QUEUED") | Q(status="RUNNING", heartbeat_at__lt=stale) | Q(status="RUNNING", heartbeat_at=None)
+    ).order_by("created_at", "pk")
+    if run_id is not None:
+        candidates = candidates.filter(pk=run_id)
+    if tax_period is not None:
+        candidates = candidates.filter(tax_period=tax_period)
+
+    for run in candidates[:5]:
+        now = timezone.now()
+        # Conditional on the state read, so only one worker wins the run
+        taken = DemandGenerationRun.objects.filter(
+            pk=run.pk, status=run.status, heartbeat_at=run.heartbeat_at
+        ).update(status="RUNNING", heartbeat_at=now, started_at=run.started_at or now, error="")
+        if taken:
+            run.refresh_from_db()
+            return run
+    return None
+
+
+def run_demand_generation(run, batch_size=DEFAULT_BATCH_SIZE, workers=1):
+    """Execute a claimed DemandGenerationRun, recording progress and outcome on it."""
+    def progress(created, skipped):
+        DemandGenerationRun.objects.filter(pk=run.pk).update(
+            created_count=F("created_count") + created,
+            skipped_count=F("skipped_count") + skipped,
+            heartbeat_at=timezone.now(),
+        )
+
+    try:
+        totals = generate_demands(
+            run.tax_period, run.due_date, batch_size=batch_size, workers=workers,
+            created_by=run.started_by, progress=progress,
+        )
+    except Exception as exc:
+        DemandGenerationRun.objects.filter(pk=run.pk).update(
+            status="FAILED", error=str(exc), finished_at=timezone.now()
+        )
+        raise
+    DemandGenerationRun.objects.filter(pk=run.pk).update(
+        status="COMPLETED", finished_at=timezone.now()
+    )
+    return totals
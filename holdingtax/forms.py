@@ -1,8 +1,10 @@
+import uuid
 from django import forms
-from decimal import Decimal
+from city_corporation.autocomplete import AutocompleteSelect
+from city_corporation.reference_data import ReferenceChoiceField
 from .models import (
     Area, Street, PropertyType, Property, TaxPeriod, 
-    HoldingTax, AttachmentType, PropertyAttachment, TaxPayment
+    HoldingTax, PropertyAttachment, TaxPayment
 )
 
 
@@ -26,6 +28,7 @@ class StreetForm(forms.ModelForm):
     class Meta:
         model = Street
         fields = ['name', 'code', 'area', 'description', 'is_active']
+        field_classes = {'area': ReferenceChoiceField}
         widgets = {
             'name': forms.TextInput(attrs={'class': 'form-control', 'required': True}),
             'code': forms.TextInput(attrs={'class': 'form-control'}),
@@ -34,10 +37,6 @@ class StreetForm(forms.ModelForm):
             'is_active': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
         }
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields['area'].queryset = Area.objects.filter(is_active=True)
-
 
 class PropertyTypeForm(forms.ModelForm):
     """Form for PropertyType."""
@@ -63,13 +62,20 @@ class PropertyForm(forms.ModelForm):
             'area', 'street', 'city', 'postal_code', 'area_sqft',
             'assessed_value', 'tax_rate', 'status', 'notes', 'is_active'
         ]
+        field_classes = {
+            'property_type': ReferenceChoiceField,
+            'area': ReferenceChoiceField,
+            'street': ReferenceChoiceField,
+        }
         widgets = {
             'property_number': forms.TextInput(attrs={'class': 'form-control', 'required': True}),
             'property_type': forms.Select(attrs={'class': 'form-control', 'required': True}),
-            'owner': forms.Select(attrs={'class': 'form-control', 'required': True}),
+            'owner': AutocompleteSelect('citizen:autocomplete', attrs={'class': 'form-control', 'required': True}),
             'address': forms.Textarea(attrs={'class': 'form-control', 'rows': 3, 'required': True}),
             'area': forms.Select(attrs={'class': 'form-control'}),
-            'street': forms.Select(attrs={'class': 'form-control'}),
+            'street': AutocompleteSelect(
+                'holdingtax:street_autocomplete', attrs={'class': 'form-control'}, forward={'area': 'area'}
+            ),
             'city': forms.TextInput(attrs={'class': 'form-control'}),
             'postal_code': forms.TextInput(attrs={'class': 'form-control'}),
             'area_sqft': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'required': True}),
@@ -83,10 +89,15 @@ class PropertyForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         from citizen.models import Citizen
-        self.fields['property_type'].queryset = PropertyType.objects.filter(is_active=True)
         self.fields['owner'].queryset = Citizen.objects.filter(is_active=True)
-        self.fields['area'].queryset = Area.objects.filter(is_active=True)
-        self.fields['street'].queryset = Street.objects.filter(is_active=True)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        area = cleaned_data.get('area')
+        street = cleaned_data.get('street')
+        if area and street and street.area_id != area.pk:
+            self.add_error('street', 'Selected street is not in the selected area.')
+        return cleaned_data
 
 
 class TaxPeriodForm(forms.ModelForm):
@@ -112,9 +123,12 @@ class HoldingTaxForm(forms.ModelForm):
             'tax_number', 'holding_property', 'tax_period', 'tax_amount',
             'paid_amount', 'due_date', 'status', 'penalty_amount', 'notes'
         ]
+        field_classes = {'tax_period': ReferenceChoiceField}
         widgets = {
-            'tax_number': forms.TextInput(attrs={'class': 'form-control', 'required': True}),
-            'holding_property': forms.Select(attrs={'class': 'form-control', 'required': True}),
+            'tax_number': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Leave blank to assign automatically'}),
+            'holding_property': AutocompleteSelect(
+                'holdingtax:property_autocomplete', attrs={'class': 'form-control', 'required': True}
+            ),
             'tax_period': forms.Select(attrs={'class': 'form-control', 'required': True}),
             'tax_amount': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'required': True}),
             'paid_amount': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
@@ -126,8 +140,7 @@ class HoldingTaxForm(forms.ModelForm):
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields['holding_property'].queryset = Property.objects.filter(is_active=True)
-        self.fields['tax_period'].queryset = TaxPeriod.objects.filter(is_active=True)
+        self.fields['holding_property'].queryset = Property.objects.filter(is_active=True).select_related('owner')
 
 
 class TaxPaymentForm(forms.ModelForm):
@@ -136,13 +149,12 @@ class TaxPaymentForm(forms.ModelForm):
     class Meta:
         model = TaxPayment
         fields = [
-            'payment_number', 'holding_tax', 'payment_date', 'amount',
-            'payment_method', 'reference_number', 'cheque_number', 
-            'bank_name', 'notes'
+            'payment_number', 'payment_date', 'amount',
+            'payment_method', 'reference_number', 'cheque_number',
+            'bank_name', 'notes', 'idempotency_key'
         ]
         widgets = {
-            'payment_number': forms.TextInput(attrs={'class': 'form-control', 'required': True}),
-            'holding_tax': forms.Select(attrs={'class': 'form-control', 'required': True}),
+            'payment_number': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Leave blank to assign automatically'}),
             'payment_date': forms.DateInput(attrs={'type': 'date', 'class': 'form-control', 'required': True}),
             'amount': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'required': True}),
             'payment_method': forms.Select(attrs={'class': 'form-control', 'required': True}),
@@ -150,11 +162,15 @@ class TaxPaymentForm(forms.ModelForm):
             'cheque_number': forms.TextInput(attrs={'class': 'form-control'}),
             'bank_name': forms.TextInput(attrs={'class': 'form-control'}),
             'notes': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
+            'idempotency_key': forms.HiddenInput(),
         }
-    
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Don't filter holding_tax queryset here as it's set in the view
+        # holding_tax is taken from the URL by the view; the hidden idempotency
+        # key is issued when the form is rendered so a double-submit posts once
+        if not self.is_bound and not self.initial.get('idempotency_key'):
+            self.initial['idempotency_key'] = uuid.uuid4().hex
 
 
 class PropertyAttachmentForm(forms.ModelForm):
@@ -163,6 +179,7 @@ class PropertyAttachmentForm(forms.ModelForm):
     class Meta:
         model = PropertyAttachment
         fields = ['attachment_type', 'title', 'description', 'file', 'is_active']
+        field_classes = {'attachment_type': ReferenceChoiceField}
         widgets = {
             'attachment_type': forms.Select(attrs={'class': 'form-control', 'required': True}),
             'title': forms.TextInput(attrs={'class': 'form-control', 'required': True}),
@@ -170,7 +187,3 @@ class PropertyAttachmentForm(forms.ModelForm):
             'file': forms.FileInput(attrs={'class': 'form-control', 'required': True}),
             'is_active': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
         }
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields['attachment_type'].queryset = AttachmentType.objects.filter(is_active=True)
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""
+Management command to benchmark concurrent payment posting.
+
+Posts payments from several threads against the same holding tax (the
+worst case: one hot row) and reports throughput and whether the ledger
+stayed consistent: paid_amount must equal the sum of the payments and every
+balance snapshot must be distinct. The legacy variant (save, then
+re-aggregate SUM(amount) without a lock) is run for comparison. Benchmark
+rows are removed afterwards. For example:
+
+    python manage.py benchmark_payment_posting --threads 16 --payments 200
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.db.models import Sum
+from citizen.models import Citizen
+from holdingtax.models import HoldingTax, Property, PropertyType, TaxPayment, TaxPeriod
+from holdingtax.payments import post_payment
+
+
+AMOUNT = Decimal("1.00")
+
+
+def legacy_post(holding_tax_id, payment):
+    """The original tax_payment_add logic: save, then re-aggregate without a lock."""
+    holding_tax = HoldingTax.objects.get(pk=holding_tax_id)
+    payment.holding_tax = holding_tax
+    payment.save()
+    total_paid = holding_tax.payments.aggregate(Sum("amount"))["amount__sum"] or Decimal("0.00")
+    holding_tax.paid_amount = total_paid
+    if total_paid >= holding_tax.tax_amount + holding_tax.penalty_amount:
+        holding_tax.status = "PAID"
+    elif total_paid > Decimal("0.00"):
+        holding_tax.status = "PARTIAL"
+    holding_tax.save()
+
+
+def ledger_post(holding_tax_id, payment):
+    post_payment(holding_tax_id, payment, idempotency_key=uuid.uuid4().hex)
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks concurrent holding tax payment posting (throughput and correctness)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--payments', type=int, default=100, help='Payments per thread')
+        parser.add_argument('--skip-legacy', action='store_true', help='Only benchmark post_payment()')
+
+    def handle(self, *args, **options):
+        variants = [('post_payment (ledger)', ledger_post)]
+        if not options['skip_legacy']:
+            variants.insert(0, ('legacy re-aggregate', legacy_post))
+
+        self.stdout.write(
+            f"{'variant':<24}{'posted':>8}{'errors':>8}{'per sec':>10}{'paid_amount':>14}{'SUM(amount)':>14}  consistent"
+        )
+        for name, func in variants:
+            holding_tax = self.create_holding_tax(options['threads'] * options['payments'])
+            try:
+                self.run_variant(name, func, holding_tax, options['threads'], options['payments'])
+            finally:
+                TaxPayment.objects.filter(holding_tax=holding_tax).delete()
+                holding_tax.delete()
+
+    def run_variant(self, name, func, holding_tax, threads, per_thread):
+        errors = []
+        lock = threading.Lock()
+
+        def worker(thread_no):
+            try:
+                for n in range(per_thread):
+                    payment = TaxPayment(
+                        payment_number=f'BENCH-PAY-{uuid.uuid4().hex[:20]}',
+                        payment_date=date.today(),
+                        amount=AMOUNT,
+                        payment_method='CASH',
+                    )
+                    try:
+                        func(holding_tax.pk, payment)
+                    except OperationalError as exc:
+                        with lock:
+                            errors.append(exc)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(worker, range(threads)))
+        elapsed = time.perf_counter() - started
+
+        holding_tax.refresh_from_db()
+        payments = TaxPayment.objects.filter(holding_tax=holding_tax)
+        posted = payments.count()
+        total = payments.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+        snapshots = list(payments.exclude(balance_after=None).values_list('balance_after', flat=True))
+        consistent = holding_tax.paid_amount == total and len(set(snapshots)) == len(snapshots)
+
+        style = self.style.SUCCESS if consistent else self.style.ERROR
+        self.stdout.write(style(
+            f"{name:<24}{posted:>8}{len(errors):>8}{posted / elapsed:>10.1f}"
+            f"{holding_tax.paid_amount:>14.2f}{total:>14.2f}  {'yes' if consistent else 'NO'}"
+        ))
+
+    def create_holding_tax(self, payment_count):
+        """A fresh demand large enough to take every benchmark payment."""
+        citizen, _ = Citizen.objects.get_or_create(
+            national_id='BENCH-PAYMENTS', defaults={'first_name': 'Bench', 'last_name': 'Payments'}
+        )
+        property_type, _ = PropertyType.objects.get_or_create(code='BENCH', defaults={'name': 'Benchmark'})
+        tax_period, _ = TaxPeriod.objects.get_or_create(
+            name='Benchmark', defaults={'start_date': date(2025, 7, 1), 'end_date': date(2026, 6, 30)}
+        )
+        holding_property, _ = Property.objects.get_or_create(
+            property_number='BENCH-PAYMENTS',
+            defaults={
+                'property_type': property_type, 'owner': citizen, 'address': 'Benchmark',
+                'area_sqft': Decimal('1000.00'), 'assessed_value': Decimal('500000.00'),
+            },
+        )
+        return HoldingTax.objects.create(
+            tax_number=f'BENCH-PAY-{uuid.uuid4().hex[:12]}',
+            holding_property=holding_property,
+            tax_period=tax_period,
+            tax_amount=AMOUNT * payment_count * 2,
+            due_date=tax_period.end_date,
+        )
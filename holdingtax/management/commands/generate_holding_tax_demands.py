@@ -0,0 +1,54 @@
+"""
+Management command to generate holding-tax demands for a tax period.
+
+Creates one HoldingTax per approved, active property that does not yet
+have a demand for the period. Safe to re-run: an interrupted run is
+resumed, already billed properties are skipped. Runs queued from the admin
+are executed by ``process_demand_runs`` instead. For example:
+
+    python manage.py generate_holding_tax_demands --period 7 --workers 8
+"""
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from holdingtax.demands import (
+    DEFAULT_BATCH_SIZE, claim_demand_run, queue_demand_generation, run_demand_generation,
+)
+from holdingtax.models import TaxPeriod
+
+
+class Command(BaseCommand):
+    help = 'Generates holding tax demands for every approved property in a tax period'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--period', type=int, required=True, help='TaxPeriod id')
+        parser.add_argument('--due-date', help='Due date (YYYY-MM-DD, default: period end date)')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=4, help='Areas processed in parallel')
+
+    def handle(self, *args, **options):
+        try:
+            tax_period = TaxPeriod.objects.get(pk=options['period'])
+        except TaxPeriod.DoesNotExist:
+            raise CommandError(f"Tax period {options['period']} does not exist")
+
+        due_date = tax_period.end_date
+        if options['due_date']:
+            try:
+                due_date = date.fromisoformat(options['due_date'])
+            except ValueError:
+                raise CommandError('--due-date must be a date in YYYY-MM-DD format')
+
+        queued = queue_demand_generation(tax_period, due_date=due_date)
+        # Either the run just queued or one whose worker died
+        run = claim_demand_run(run_id=queued.pk) if queued else claim_demand_run(tax_period=tax_period)
+        if run is None:
+            raise CommandError(f'Demand generation for {tax_period.name} is already queued or running')
+        started = time.perf_counter()
+        totals = run_demand_generation(run, batch_size=options['batch_size'], workers=options['workers'])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {totals['created']} demands for {tax_period.name} across {totals['areas']} areas "
+            f"({totals['skipped']} properties skipped) in {elapsed:.1f}s"
+        ))
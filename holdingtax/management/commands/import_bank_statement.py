@@ -0,0 +1,98 @@
+"""
+Management command to import a bank statement and post matched payments.
+
+CSV files need a header row; use --columns when the bank's headers differ
+from the statement field names (date, amount, tax_number, reference,
+cheque_number, bank_name, narration). Fixed-width files need --layout with
+0-based character slices. Unmatched and duplicate lines are written to the
+exceptions report. Examples:
+
+    python manage.py import_bank_statement stmt.csv --columns amount=Credit reference="Ref No"
+    python manage.py import_bank_statement stmt.txt --format fixed \\
+        --layout date=0:10 amount=10:25 reference=25:45 narration=45:120 --skip 1
+"""
+import csv
+import sys
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from holdingtax.statements import (
+    DEFAULT_BATCH_SIZE, EXCEPTION_FIELDS, STATEMENT_FIELDS,
+    read_csv_statement, read_fixed_width_statement, reconcile_statement,
+)
+
+
+def parse_pairs(pairs, option):
+    """Parse ``field=value`` arguments, checking the field names."""
+    parsed = {}
+    for pair in pairs or []:
+        name, sep, value = pair.partition('=')
+        if not sep or name not in STATEMENT_FIELDS:
+            raise CommandError(f'{option} expects field=value with field one of {", ".join(STATEMENT_FIELDS)}')
+        parsed[name] = value
+    return parsed
+
+
+class Command(BaseCommand):
+    help = 'Imports a bank statement (CSV or fixed-width) and posts matched holding tax payments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('statement', help='Statement file path')
+        parser.add_argument('--format', choices=['csv', 'fixed'], default='csv')
+        parser.add_argument('--columns', nargs='+', help='CSV header names, e.g. amount=Credit')
+        parser.add_argument('--layout', nargs='+', help='Fixed-width slices, e.g. amount=10:25')
+        parser.add_argument('--skip', type=int, default=0, help='Fixed-width header lines to skip')
+        parser.add_argument('--date-format', default='%Y-%m-%d')
+        parser.add_argument('--encoding', default='utf-8-sig')
+        parser.add_argument('--exceptions', help='Exceptions report path (default: stdout)')
+        parser.add_argument('--user', help='Username recorded as receiver of the payments')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Match only, post nothing')
+
+    def handle(self, *args, **options):
+        received_by = None
+        if options['user']:
+            try:
+                received_by = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User {options['user']} does not exist")
+
+        if options['format'] == 'fixed':
+            layout = {}
+            for name, value in parse_pairs(options['layout'], '--layout').items():
+                try:
+                    start, end = (int(part) for part in value.split(':'))
+                except ValueError:
+                    raise CommandError('--layout slices must look like field=start:end')
+                layout[name] = (start, end)
+            if 'date' not in layout or 'amount' not in layout:
+                raise CommandError('--layout must include date and amount')
+        columns = parse_pairs(options['columns'], '--columns')
+
+        report = open(options['exceptions'], 'w', newline='') if options['exceptions'] else sys.stdout
+        started = time.perf_counter()
+        try:
+            writer = csv.DictWriter(report, fieldnames=EXCEPTION_FIELDS)
+            writer.writeheader()
+            with open(options['statement'], newline='', encoding=options['encoding']) as stream:
+                if options['format'] == 'fixed':
+                    lines = read_fixed_width_statement(stream, layout, options['date_format'], options['skip'])
+                else:
+                    lines = read_csv_statement(stream, columns, options['date_format'])
+                result = reconcile_statement(
+                    lines, writer, received_by=received_by,
+                    batch_size=options['batch_size'], dry_run=options['dry_run'],
+                )
+        except OSError as exc:
+            raise CommandError(str(exc))
+        finally:
+            if report is not sys.stdout:
+                report.close()
+
+        elapsed = time.perf_counter() - started
+        verb = 'Matched' if options['dry_run'] else 'Posted'
+        self.stderr.write(self.style.SUCCESS(
+            f'{verb} {result.posted} of {result.lines} lines ({result.amount}) in {elapsed:.1f}s'
+        ))
+        for reason, count in sorted(result.exceptions.items()):
+            self.stderr.write(f'  {reason}: {count}')
@@ -0,0 +1,51 @@
+"""
+Management command to execute queued holding-tax demand generation runs.
+
+Run it as a long-lived service next to gunicorn (see
+``systemd_worker_template.service``); it claims the runs queued from the
+admin one at a time and sleeps while there are none. A run whose worker
+died (no heartbeat for ``DEMAND_RUN_LEASE``) is taken over and resumed.
+Use --once from cron to execute what is queued and exit.
+"""
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from holdingtax.demands import DEFAULT_BATCH_SIZE, claim_demand_run, run_demand_generation
+
+
+class Command(BaseCommand):
+    help = 'Executes queued holding tax demand generation runs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=4, help='Areas processed in parallel')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when nothing is queued')
+        parser.add_argument('--once', action='store_true', help='Execute the queued runs and exit')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+
+        completed = 0
+        while True:
+            run = claim_demand_run()
+            if run is None:
+                if options['once']:
+                    break
+                connection.close()
+                time.sleep(options['interval'])
+                continue
+
+            started = time.perf_counter()
+            try:
+                totals = run_demand_generation(run, batch_size=options['batch_size'], workers=options['workers'])
+            except Exception as exc:
+                self.stderr.write(f'Demand generation for {run.tax_period.name} failed: {exc}')
+                continue
+            completed += 1
+            self.stdout.write(
+                f"Created {totals['created']} demands for {run.tax_period.name} "
+                f"({totals['skipped']} properties skipped) in {time.perf_counter() - started:.1f}s"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Completed {completed} demand generation runs'))
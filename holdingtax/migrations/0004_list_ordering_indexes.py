@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('citizen', '0005_citizen_search'),
+        ('holdingtax', '0003_rename_holdingtax_a_name_idx_holdingtax__name_794503_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='holdingtax',
+            index=models.Index(fields=['due_date', 'created_at'], name='holdingtax__due_dat_3e6188_idx'),
+        ),
+        # The composite index serves due_date lookups too
+        migrations.RemoveIndex(
+            model_name='holdingtax',
+            name='holdingtax__due_dat_c33202_idx',
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['created_at'], name='holdingtax__created_6ca490_idx'),
+        ),
+    ]
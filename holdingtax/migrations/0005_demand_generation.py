@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holdingtax', '0004_list_ordering_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DemandGenerationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='QUEUED', max_length=20, verbose_name='Status')),
+                ('due_date', models.DateField(verbose_name='Due Date')),
+                ('created_count', models.PositiveIntegerField(default=0, verbose_name='Demands Created')),
+                ('skipped_count', models.PositiveIntegerField(default=0, help_text='Already billed or zero tax', verbose_name='Properties Skipped')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Started At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Demand Generation Run',
+                'verbose_name_plural': 'Demand Generation Runs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='holdingtax',
+            constraint=models.UniqueConstraint(fields=('tax_period', 'holding_property'), name='holdingtax_one_demand_per_period'),
+        ),
+        migrations.AddField(
+            model_name='demandgenerationrun',
+            name='started_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='demand_runs_started', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='demandgenerationrun',
+            name='tax_period',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='demand_runs', to='holdingtax.taxperiod'),
+        ),
+        migrations.AddIndex(
+            model_name='demandgenerationrun',
+            index=models.Index(fields=['tax_period', 'status'], name='holdingtax__tax_per_fe712b_idx'),
+        ),
+    ]
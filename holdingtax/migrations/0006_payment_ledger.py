@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holdingtax', '0005_demand_generation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taxpayment',
+            name='balance_after',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Outstanding balance of the holding tax once this payment was posted', max_digits=15, null=True, verbose_name='Balance After Payment'),
+        ),
+        migrations.AddField(
+            model_name='taxpayment',
+            name='idempotency_key',
+            field=models.CharField(blank=True, help_text='Client-supplied key that makes re-submitting the same payment a no-op', max_length=64, null=True, unique=True, verbose_name='Idempotency Key'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holdingtax', '0006_payment_ledger'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taxpayment',
+            index=models.Index(fields=['reference_number'], name='holdingtax__referen_78984c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taxpayment',
+            index=models.Index(fields=['cheque_number'], name='holdingtax__cheque__546d1b_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-18 05:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holdingtax', '0007_taxpayment_reference_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OverdueSweepRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of', models.DateField(verbose_name='As Of')),
+                ('marked_overdue', models.PositiveIntegerField(default=0, verbose_name='Marked Overdue')),
+                ('penalties_updated', models.PositiveIntegerField(default=0, verbose_name='Penalties Updated')),
+                ('rule', models.JSONField(blank=True, default=dict, verbose_name='Penalty Rule')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='Started At')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finished At')),
+            ],
+            options={
+                'verbose_name': 'Overdue Sweep Run',
+                'verbose_name_plural': 'Overdue Sweep Runs',
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
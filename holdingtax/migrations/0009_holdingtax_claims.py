@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holdingtax', '0008_overduesweeprun'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='holdingtax',
+            name='claim_expires_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Claim Expires At'),
+        ),
+        migrations.AddField(
+            model_name='holdingtax',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='holding_taxes_claimed', to=settings.AUTH_USER_MODEL, verbose_name='Claimed By'),
+        ),
+        migrations.AddIndex(
+            model_name='holdingtax',
+            index=models.Index(fields=['status', 'claimed_by', 'created_at'], name='holdingtax__status_31f3dd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='holdingtax',
+            index=models.Index(fields=['claim_expires_at'], name='holdingtax__claim_e_45c0a7_idx'),
+        ),
+    ]
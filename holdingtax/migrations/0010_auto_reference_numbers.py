@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holdingtax', '0009_holdingtax_claims'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='holdingtax',
+            name='tax_number',
+            field=models.CharField(blank=True, max_length=50, unique=True, verbose_name='Tax Number'),
+        ),
+        migrations.AlterField(
+            model_name='taxpayment',
+            name='payment_number',
+            field=models.CharField(blank=True, max_length=50, unique=True, verbose_name='Payment Number'),
+        ),
+    ]
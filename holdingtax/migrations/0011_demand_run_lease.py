@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:40
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def fail_duplicate_active_runs(apps, schema_editor):
+    # Runs orphaned by a killed web worker; keep the newest active run per period
+    DemandGenerationRun = apps.get_model('holdingtax', 'DemandGenerationRun')
+    active = DemandGenerationRun.objects.filter(status__in=['QUEUED', 'RUNNING'])
+    newest = active.values('tax_period').annotate(newest=Max('pk')).values_list('newest', flat=True)
+    active.exclude(pk__in=list(newest)).update(status='FAILED', error='Interrupted')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holdingtax', '0010_auto_reference_numbers'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='demandgenerationrun',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last progress of the worker running it; a stale heartbeat lets another worker take over', null=True, verbose_name='Heartbeat At'),
+        ),
+        migrations.RunPython(fail_duplicate_active_runs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='demandgenerationrun',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['QUEUED', 'RUNNING'])), fields=('tax_period',), name='holdingtax_one_active_demand_run'),
+        ),
+    ]
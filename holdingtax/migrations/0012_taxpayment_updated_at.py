@@ -0,0 +1,26 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:47
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_created_at(apps, schema_editor):
+    # Existing payments were last changed when created, not when migrated
+    TaxPayment = apps.get_model('holdingtax', 'TaxPayment')
+    TaxPayment.objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('holdingtax', '0011_demand_run_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taxpayment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Updated At'),
+        ),
+        migrations.RunPython(copy_created_at, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,8 @@ from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator
 from citizen.models import Citizen
+from citizen.roles import OFFICER, has_role
+from sequences.allocator import HOLDING_TAX, PAYMENT, next_number
 
 
 class Area(models.Model):
@@ -174,6 +176,7 @@ class Property(models.Model):
             models.Index(fields=["area"]),
             models.Index(fields=["street"]),
             models.Index(fields=["status"]),
+            models.Index(fields=["created_at"]),
         ]
 
     def __str__(self):
@@ -206,7 +209,7 @@ class Property(models.Model):
         """Check if user can approve this holding."""
         if self.status != "PENDING_APPROVAL":
             return False
-        return user.groups.filter(name="Officer").exists()
+        return has_role(user, OFFICER)
 
 
 class TaxPeriod(models.Model):
@@ -238,7 +241,7 @@ class HoldingTax(models.Model):
         ("WAIVED", _("Waived")),
     ]
 
-    tax_number = models.CharField(_("Tax Number"), max_length=50, unique=True)
+    tax_number = models.CharField(_("Tax Number"), max_length=50, unique=True, blank=True)
     holding_property = models.ForeignKey(
         Property, on_delete=models.PROTECT, related_name="holding_taxes"
     )
@@ -276,6 +279,15 @@ class HoldingTax(models.Model):
         null=True,
         related_name="holding_taxes_created",
     )
+    claimed_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="holding_taxes_claimed",
+        verbose_name=_("Claimed By"),
+    )
+    claim_expires_at = models.DateTimeField(_("Claim Expires At"), null=True, blank=True)
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
 
@@ -287,12 +299,25 @@ class HoldingTax(models.Model):
             models.Index(fields=["tax_number"]),
             models.Index(fields=["holding_property"]),
             models.Index(fields=["status"]),
-            models.Index(fields=["due_date"]),
+            models.Index(fields=["due_date", "created_at"]),
+            models.Index(fields=["status", "claimed_by", "created_at"]),
+            models.Index(fields=["claim_expires_at"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tax_period", "holding_property"],
+                name="holdingtax_one_demand_per_period",
+            ),
         ]
 
     def __str__(self):
         return f"{self.tax_number} - {self.holding_property.property_number} - {self.tax_amount}"
 
+    def save(self, *args, **kwargs):
+        if not self.tax_number:
+            self.tax_number = next_number(HOLDING_TAX)
+        super().save(*args, **kwargs)
+
     @property
     def balance_amount(self):
         """Calculate remaining balance."""
@@ -374,7 +399,7 @@ class TaxPayment(models.Model):
     ]
 
     payment_number = models.CharField(
-        _("Payment Number"), max_length=50, unique=True
+        _("Payment Number"), max_length=50, unique=True, blank=True
     )
     holding_tax = models.ForeignKey(
         HoldingTax, on_delete=models.PROTECT, related_name="payments"
@@ -393,6 +418,22 @@ class TaxPayment(models.Model):
     cheque_number = models.CharField(_("Cheque Number"), max_length=50, blank=True)
     bank_name = models.CharField(_("Bank Name"), max_length=100, blank=True)
     notes = models.TextField(_("Notes"), blank=True)
+    balance_after = models.DecimalField(
+        _("Balance After Payment"),
+        max_digits=15,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text=_("Outstanding balance of the holding tax once this payment was posted"),
+    )
+    idempotency_key = models.CharField(
+        _("Idempotency Key"),
+        max_length=64,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text=_("Client-supplied key that makes re-submitting the same payment a no-op"),
+    )
     received_by = models.ForeignKey(
         User,
         on_delete=models.SET_NULL,
@@ -400,6 +441,7 @@ class TaxPayment(models.Model):
         related_name="tax_payments_received",
     )
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
 
     class Meta:
         verbose_name = _("Tax Payment")
@@ -408,7 +450,89 @@ class TaxPayment(models.Model):
         indexes = [
             models.Index(fields=["payment_date"]),
             models.Index(fields=["holding_tax"]),
+            models.Index(fields=["reference_number"]),
+            models.Index(fields=["cheque_number"]),
         ]
 
     def __str__(self):
         return f"{self.payment_number} - {self.holding_tax.tax_number} - {self.amount}"
+
+    def save(self, *args, **kwargs):
+        if not self.payment_number:
+            self.payment_number = next_number(PAYMENT)
+        super().save(*args, **kwargs)
+
+
+class DemandGenerationRun(models.Model):
+    """Bulk holding-tax demand generation run for a tax period."""
+
+    STATUS_CHOICES = [
+        ("QUEUED", _("Queued")),
+        ("RUNNING", _("Running")),
+        ("COMPLETED", _("Completed")),
+        ("FAILED", _("Failed")),
+    ]
+
+    tax_period = models.ForeignKey(
+        TaxPeriod, on_delete=models.CASCADE, related_name="demand_runs"
+    )
+    status = models.CharField(
+        _("Status"), max_length=20, choices=STATUS_CHOICES, default="QUEUED"
+    )
+    due_date = models.DateField(_("Due Date"))
+    created_count = models.PositiveIntegerField(_("Demands Created"), default=0)
+    skipped_count = models.PositiveIntegerField(
+        _("Properties Skipped"), default=0, help_text=_("Already billed or zero tax")
+    )
+    error = models.TextField(_("Error"), blank=True)
+    started_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="demand_runs_started",
+    )
+    started_at = models.DateTimeField(_("Started At"), null=True, blank=True)
+    heartbeat_at = models.DateTimeField(
+        _("Heartbeat At"), null=True, blank=True,
+        help_text=_("Last progress of the worker running it; a stale heartbeat lets another worker take over")
+    )
+    finished_at = models.DateTimeField(_("Finished At"), null=True, blank=True)
+    created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Demand Generation Run")
+        verbose_name_plural = _("Demand Generation Runs")
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["tax_period", "status"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tax_period"],
+                condition=models.Q(status__in=["QUEUED", "RUNNING"]),
+                name="holdingtax_one_active_demand_run",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.tax_period.name} - {self.get_status_display()}"
+
+
+class OverdueSweepRun(models.Model):
+    """Record of one overdue sweep and the penalty rule it applied."""
+
+    as_of = models.DateField(_("As Of"))
+    marked_overdue = models.PositiveIntegerField(_("Marked Overdue"), default=0)
+    penalties_updated = models.PositiveIntegerField(_("Penalties Updated"), default=0)
+    rule = models.JSONField(_("Penalty Rule"), default=dict, blank=True)
+    started_at = models.DateTimeField(_("Started At"), auto_now_add=True)
+    finished_at = models.DateTimeField(_("Finished At"), null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Overdue Sweep Run")
+        verbose_name_plural = _("Overdue Sweep Runs")
+        ordering = ["-started_at"]
+
+    def __str__(self):
+        return f"{self.as_of}: {self.marked_overdue} overdue, {self.penalties_updated} penalties"
@@ -0,0 +1,146 @@
+"""
+Overdue sweep and penalty engine for holding taxes.
+
+Replaces per-object ``HoldingTax.is_overdue_check`` with set-based updates:
+
+1. unpaid (PENDING / PARTIAL) demands past their due date plus the grace
+   period are flipped to OVERDUE;
+2. OVERDUE demands are charged the penalty given by ``PenaltyRule``.
+
+Both steps run as ``UPDATE`` statements over primary-key windows of
+``chunk_size`` rows, so each transaction stays short on large tables.
+Penalties depend only on the tax amount and the number of months overdue,
+so the sweep issues one UPDATE per distinct due date and window. Penalties
+are recomputed from scratch and never lowered, which makes the sweep safe
+to re-run and keeps manually raised penalties.
+"""
+import logging
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Max, Min, Value
+from django.db.models.functions import Least, Round
+from django.utils import timezone
+
+from city_corporation.caching import invalidate_on_commit
+from .models import HoldingTax, OverdueSweepRun
+
+
+logger = logging.getLogger(__name__)
+
+UNPAID_STATUSES = ["PENDING", "PARTIAL"]
+DEFAULT_CHUNK_SIZE = 50000
+
+
+def months_overdue(due_date, as_of):
+    """Number of started months between ``due_date`` and ``as_of``."""
+    if as_of <= due_date:
+        return 0
+    months = (as_of.year - due_date.year) * 12 + (as_of.month - due_date.month)
+    if as_of.day > due_date.day:
+        months += 1
+    return max(months, 1)
+
+
+@dataclass(frozen=True)
+class PenaltyRule:
+    """Penalty = flat + monthly_rate % of the tax per month overdue, capped at cap % of the tax."""
+
+    flat: Decimal = Decimal("0.00")
+    monthly_rate: Decimal = Decimal("0.00")
+    cap: Decimal = Decimal("0.00")
+    grace_days: int = 0
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            flat=Decimal(str(getattr(settings, "HOLDING_TAX_PENALTY_FLAT", "0.00"))),
+            monthly_rate=Decimal(str(getattr(settings, "HOLDING_TAX_PENALTY_MONTHLY_RATE", "0.00"))),
+            cap=Decimal(str(getattr(settings, "HOLDING_TAX_PENALTY_CAP", "0.00"))),
+            grace_days=int(getattr(settings, "HOLDING_TAX_GRACE_DAYS", 0)),
+        )
+
+    @property
+    def is_active(self):
+        return self.flat > 0 or self.monthly_rate > 0
+
+    def as_dict(self):
+        return {key: str(value) for key, value in asdict(self).items()}
+
+    def expression(self, months):
+        """SQL expression for the penalty of demands ``months`` overdue."""
+        money = DecimalField(max_digits=15, decimal_places=2)
+        penalty = Value(self.flat, output_field=money) + F("tax_amount") * Value(
+            self.monthly_rate * months / Decimal("100"), output_field=DecimalField(max_digits=15, decimal_places=6)
+        )
+        if self.cap > 0:
+            penalty = Least(penalty, F("tax_amount") * Value(
+                self.cap / Decimal("100"), output_field=DecimalField(max_digits=15, decimal_places=6)
+            ))
+        return ExpressionWrapper(Round(penalty, 2), output_field=money)
+
+
+def _windows(queryset, chunk_size):
+    """Yield (low, high) primary-key windows covering ``queryset``."""
+    bounds = queryset.aggregate(low=Min("pk"), high=Max("pk"))
+    if bounds["low"] is None:
+        return
+    for low in range(bounds["low"], bounds["high"] + 1, chunk_size):
+        yield low, low + chunk_size
+
+
+def mark_overdue(as_of, rule, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Flip unpaid demands past due (plus grace) to OVERDUE; returns the row count."""
+    cutoff = as_of - timedelta(days=rule.grace_days)
+    candidates = HoldingTax.objects.filter(status__in=UNPAID_STATUSES, due_date__lt=cutoff)
+    changed = 0
+    for low, high in _windows(candidates, chunk_size):
+        with transaction.atomic():
+            changed += candidates.filter(pk__gte=low, pk__lt=high).update(
+                status="OVERDUE", updated_at=timezone.now()
+            )
+            invalidate_on_commit("holdingtax")
+    logger.info("Marked %s holding taxes overdue (due before %s)", changed, cutoff)
+    return changed
+
+
+def apply_penalties(as_of, rule, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Raise penalty_amount on OVERDUE demands to the rule's amount; returns the row count."""
+    if not rule.is_active:
+        return 0
+    overdue = HoldingTax.objects.filter(status="OVERDUE", due_date__lt=as_of)
+    due_dates = overdue.order_by().values_list("due_date", flat=True).distinct()
+    changed = 0
+    for due_date in due_dates:
+        months = months_overdue(due_date, as_of)
+        penalty = rule.expression(months)
+        bucket = overdue.filter(due_date=due_date).alias(new_penalty=penalty).filter(
+            penalty_amount__lt=F("new_penalty")
+        )
+        bucket_changed = 0
+        for low, high in _windows(bucket, chunk_size):
+            with transaction.atomic():
+                bucket_changed += bucket.filter(pk__gte=low, pk__lt=high).update(
+                    penalty_amount=penalty, updated_at=timezone.now()
+                )
+                invalidate_on_commit("holdingtax")
+        if bucket_changed:
+            logger.info(
+                "Penalty raised on %s holding taxes due %s (%s months overdue)", bucket_changed, due_date, months
+            )
+        changed += bucket_changed
+    return changed
+
+
+def sweep_overdue(as_of=None, rule=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Run both sweep steps and record the run; returns the OverdueSweepRun."""
+    as_of = as_of or timezone.localdate()
+    rule = rule or PenaltyRule.from_settings()
+    run = OverdueSweepRun.objects.create(as_of=as_of, rule=rule.as_dict())
+    run.marked_overdue = mark_overdue(as_of, rule, chunk_size)
+    run.penalties_updated = apply_penalties(as_of, rule, chunk_size)
+    run.finished_at = timezone.now()
+    run.save(update_fields=["marked_overdue", "penalties_updated", "finished_at"])
+    return run
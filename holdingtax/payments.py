@@ -0,0 +1,164 @@
+"""
+Holding-tax payment posting.
+
+Every path that records a ``TaxPayment`` (admin views, Django admin, field
+officers, future APIs) goes through ``post_payment()``, which in a single
+transaction:
+
+1. increments ``HoldingTax.paid_amount`` with an ``UPDATE ... SET
+   paid_amount = paid_amount + amount``; the UPDATE takes the row lock, so
+   concurrent postings to the same demand serialize instead of losing an
+   update, and the cost no longer grows with payment history;
+2. re-reads the locked row and updates its status;
+3. saves the payment with a snapshot of the balance left after it.
+
+An optional idempotency key makes re-submitting the same payment return
+the payment that was already posted.
+"""
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from city_corporation.caching import invalidate_on_commit
+from sequences.allocator import PAYMENT, format_number, reserve_block
+from .models import HoldingTax, TaxPayment
+
+
+def payment_status(tax_amount, penalty_amount, paid_amount, current_status):
+    """Status of a holding tax after a payment brings it to ``paid_amount``."""
+    if paid_amount >= tax_amount + penalty_amount:
+        return "PAID"
+    if paid_amount > Decimal("0.00"):
+        return "PARTIAL"
+    return current_status
+
+
+def find_posted_payment(idempotency_key):
+    """Return the payment already posted under ``idempotency_key``, if any."""
+    if not idempotency_key:
+        return None
+    return TaxPayment.objects.filter(idempotency_key=idempotency_key).first()
+
+
+def post_payment(holding_tax, payment, idempotency_key=None):
+    """
+    Post an unsaved ``payment`` against ``holding_tax`` (an instance or pk).
+
+    Returns ``(payment, created)``; ``created`` is False when a payment with
+    the same idempotency key had already been posted, in which case that
+    payment is returned and nothing is changed.
+    """
+    holding_tax_id = getattr(holding_tax, "pk", holding_tax)
+    idempotency_key = idempotency_key or payment.idempotency_key or None
+
+    existing = find_posted_payment(idempotency_key)
+    if existing:
+        return existing, False
+
+    try:
+        with transaction.atomic():
+            updated = HoldingTax.objects.filter(pk=holding_tax_id).update(
+                paid_amount=F("paid_amount") + payment.amount,
+                updated_at=timezone.now(),
+            )
+            if not updated:
+                raise HoldingTax.DoesNotExist(f"Holding tax {holding_tax_id} does not exist")
+
+            tax_amount, penalty_amount, paid_amount, status = (
+                HoldingTax.objects.filter(pk=holding_tax_id)
+                .values_list("tax_amount", "penalty_amount", "paid_amount", "status")
+                .get()
+            )
+            new_status = payment_status(tax_amount, penalty_amount, paid_amount, status)
+            if new_status != status:
+                HoldingTax.objects.filter(pk=holding_tax_id).update(status=new_status)
+
+            payment.holding_tax_id = holding_tax_id
+            payment.idempotency_key = idempotency_key
+            payment.balance_after = tax_amount + penalty_amount - paid_amount
+            payment.save()
+    except IntegrityError:
+        # A concurrent submit with the same key won the race
+        existing = find_posted_payment(idempotency_key)
+        if existing:
+            return existing, False
+        raise
+
+    if isinstance(holding_tax, HoldingTax):
+        holding_tax.paid_amount = paid_amount
+        holding_tax.status = new_status
+    return payment, True
+
+
+def post_payment_batch(payments):
+    """
+    Post many unsaved payments (``holding_tax_id`` already set) at once.
+
+    Payments whose idempotency key was already posted are skipped. The rest
+    are numbered from one reserved block (``bulk_create`` skips ``save()``)
+    and applied in one transaction: one increment per holding tax (taken in
+    pk order so concurrent batches cannot deadlock), one read of the locked
+    rows, then a single ``bulk_create``. Returns the list of posted payments.
+    """
+    keys = [payment.idempotency_key for payment in payments if payment.idempotency_key]
+    posted_keys = set(
+        TaxPayment.objects.filter(idempotency_key__in=keys).values_list("idempotency_key", flat=True)
+    )
+    pending, seen = [], set()
+    for payment in payments:
+        key = payment.idempotency_key
+        if key and (key in posted_keys or key in seen):
+            continue
+        seen.add(key)
+        pending.append(payment)
+    if not pending:
+        return []
+
+    unnumbered = [payment for payment in pending if not payment.payment_number]
+    if unnumbered:
+        year = timezone.localdate().year
+        first, _last = reserve_block(PAYMENT, year, len(unnumbered))
+        for value, payment in enumerate(unnumbered, start=first):
+            payment.payment_number = format_number(PAYMENT, year, value)
+
+    totals = {}
+    for payment in pending:
+        totals[payment.holding_tax_id] = totals.get(payment.holding_tax_id, Decimal("0.00")) + payment.amount
+
+    try:
+        with transaction.atomic():
+            now = timezone.now()
+            for holding_tax_id in sorted(totals):
+                HoldingTax.objects.filter(pk=holding_tax_id).update(
+                    paid_amount=F("paid_amount") + totals[holding_tax_id], updated_at=now
+                )
+            rows = {
+                pk: [tax_amount + penalty_amount, paid_amount - totals[pk], status]
+                for pk, tax_amount, penalty_amount, paid_amount, status in
+                HoldingTax.objects.filter(pk__in=totals).values_list(
+                    "pk", "tax_amount", "penalty_amount", "paid_amount", "status"
+                )
+            }
+
+            # Balance snapshots in posting order within each holding tax
+            for payment in pending:
+                row = rows[payment.holding_tax_id]
+                row[1] += payment.amount
+                payment.balance_after = row[0] - row[1]
+
+            for pk, (due, paid, status) in rows.items():
+                new_status = payment_status(due, Decimal("0.00"), paid, status)
+                if new_status != status:
+                    HoldingTax.objects.filter(pk=pk).update(status=new_status)
+
+            TaxPayment.objects.bulk_create(pending)
+            invalidate_on_commit("holdingtax")
+    except IntegrityError:
+        # A concurrent import posted some of these keys; fall back to one by one
+        return [
+            payment for payment, created in
+            (post_payment(payment.holding_tax_id, payment) for payment in pending)
+            if created
+        ]
+    return pending
@@ -0,0 +1,231 @@
+"""
+Bank statement import and payment reconciliation.
+
+Statement files (CSV or fixed-width) are read as a stream of
+``StatementLine`` objects and reconciled in batches, so memory stays
+bounded however long the file is. For each batch:
+
+* the holding taxes referenced by the batch are loaded with one query into
+  a hash index keyed by ``tax_number`` (the statement's tax number column,
+  falling back to the payment reference, which customers are asked to set
+  to their tax number);
+* reference and cheque numbers that are already on posted payments are
+  loaded into hash sets, so payments keyed in by hand are not posted twice;
+* matched lines are posted with ``post_payment_batch()``, each under an
+  idempotency key derived from the line, so re-importing a file is a no-op.
+  Identical lines (two equal credits on one day without a reference) are
+  numbered in file order and the number is part of the key, so they post
+  as separate payments.
+
+Lines that cannot be posted are written to an exceptions report (CSV).
+"""
+import csv
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from .models import HoldingTax, TaxPayment
+from .payments import post_payment_batch
+
+
+STATEMENT_FIELDS = ['date', 'amount', 'tax_number', 'reference', 'cheque_number', 'bank_name', 'narration']
+DEFAULT_BATCH_SIZE = 2000
+EXCEPTION_FIELDS = ['line', 'reason', 'date', 'amount', 'tax_number', 'reference', 'cheque_number', 'narration']
+
+
+@dataclass
+class StatementLine:
+    """One credit line of a bank statement."""
+
+    line: int
+    date: object = None
+    amount: object = None
+    tax_number: str = ''
+    reference: str = ''
+    cheque_number: str = ''
+    bank_name: str = ''
+    narration: str = ''
+    error: str = ''
+    # 1 for the first line with this content in the file, 2 for the next, ...
+    occurrence: int = 1
+
+    @property
+    def content(self):
+        return '|'.join(str(value) for value in (
+            self.date, self.amount, self.tax_number, self.reference, self.cheque_number, self.narration
+        ))
+
+    @property
+    def idempotency_key(self):
+        raw = self.content
+        if self.occurrence > 1:
+            raw += f'|#{self.occurrence}'
+        return hashlib.sha256(raw.encode()).hexdigest()[:64]
+
+    @property
+    def lookup_number(self):
+        return self.tax_number or self.reference
+
+
+@dataclass
+class ReconciliationResult:
+    """Counts per outcome of a statement import."""
+
+    lines: int = 0
+    posted: int = 0
+    amount: Decimal = Decimal('0.00')
+    exceptions: dict = field(default_factory=dict)
+
+    def add_exception(self, reason):
+        self.exceptions[reason] = self.exceptions.get(reason, 0) + 1
+
+
+def _parse_line(number, values, date_format):
+    line = StatementLine(line=number, **{
+        name: (values.get(name) or '').strip() for name in STATEMENT_FIELDS if name not in ('date', 'amount')
+    })
+    try:
+        line.date = datetime.strptime((values.get('date') or '').strip(), date_format).date()
+    except ValueError:
+        line.error = 'invalid date'
+    try:
+        line.amount = Decimal((values.get('amount') or '').strip().replace(',', ''))
+    except InvalidOperation:
+        line.error = line.error or 'invalid amount'
+    else:
+        if line.amount <= 0:
+            line.error = line.error or 'not a credit'
+    return line
+
+
+def read_csv_statement(stream, columns=None, date_format='%Y-%m-%d'):
+    """
+    Yield StatementLines from a CSV stream with a header row.
+
+    ``columns`` maps statement fields to header names when they differ,
+    e.g. ``{'amount': 'Credit', 'reference': 'Ref No'}``.
+    """
+    columns = columns or {}
+    for number, row in enumerate(csv.DictReader(stream), start=2):
+        values = {name: row.get(columns.get(name, name)) for name in STATEMENT_FIELDS}
+        yield _parse_line(number, values, date_format)
+
+
+def read_fixed_width_statement(stream, layout, date_format='%Y-%m-%d', skip=0):
+    """
+    Yield StatementLines from a fixed-width stream.
+
+    ``layout`` maps statement fields to ``(start, end)`` character slices;
+    ``skip`` header lines are ignored. Blank lines are skipped.
+    """
+    for number, text in enumerate(stream, start=1):
+        if number <= skip or not text.strip():
+            continue
+        values = {name: text[start:end] for name, (start, end) in layout.items()}
+        yield _parse_line(number, values, date_format)
+
+
+def number_occurrences(lines):
+    """Set ``occurrence`` on lines repeating an earlier line of the same file."""
+    seen = {}
+    for line in lines:
+        digest = hashlib.sha256(line.content.encode()).digest()[:8]
+        line.occurrence = seen[digest] = seen.get(digest, 0) + 1
+        yield line
+
+
+def _batches(lines, size):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _payment_for(line, holding_tax_id, received_by):
+    return TaxPayment(
+        payment_number=f'BNK-{line.idempotency_key[:20].upper()}',
+        holding_tax_id=holding_tax_id,
+        payment_date=line.date,
+        amount=line.amount,
+        payment_method='CHEQUE' if line.cheque_number else 'BANK_TRANSFER',
+        reference_number=line.reference[:100],
+        cheque_number=line.cheque_number[:50],
+        bank_name=line.bank_name[:100],
+        notes=line.narration,
+        idempotency_key=line.idempotency_key,
+        received_by=received_by,
+    )
+
+
+def reconcile_statement(lines, exceptions_writer=None, received_by=None,
+                        batch_size=DEFAULT_BATCH_SIZE, dry_run=False):
+    """
+    Match and post statement lines in batches.
+
+    ``exceptions_writer`` is a ``csv.DictWriter`` over EXCEPTION_FIELDS (or
+    None). Returns a ReconciliationResult.
+    """
+    result = ReconciliationResult()
+
+    def reject(line, reason):
+        result.add_exception(reason)
+        if exceptions_writer:
+            exceptions_writer.writerow({
+                'line': line.line, 'reason': reason, 'date': line.date or '', 'amount': line.amount or '',
+                'tax_number': line.tax_number, 'reference': line.reference,
+                'cheque_number': line.cheque_number, 'narration': line.narration,
+            })
+
+    for batch in _batches(number_occurrences(lines), batch_size):
+        result.lines += len(batch)
+        valid = []
+        for line in batch:
+            if line.error:
+                reject(line, line.error)
+            else:
+                valid.append(line)
+
+        numbers = {line.lookup_number for line in valid if line.lookup_number}
+        index = dict(
+            HoldingTax.objects.filter(tax_number__in=numbers).values_list('tax_number', 'pk')
+        ) if numbers else {}
+
+        references = {line.reference for line in valid if line.reference}
+        cheques = {line.cheque_number for line in valid if line.cheque_number}
+        posted_references = set(
+            TaxPayment.objects.filter(reference_number__in=references).values_list('reference_number', flat=True)
+        ) if references else set()
+        posted_cheques = set(
+            TaxPayment.objects.filter(cheque_number__in=cheques).values_list('cheque_number', flat=True)
+        ) if cheques else set()
+        keys = {line.idempotency_key for line in valid}
+        imported = set(
+            TaxPayment.objects.filter(idempotency_key__in=keys).values_list('idempotency_key', flat=True)
+        )
+
+        payments = []
+        for line in valid:
+            holding_tax_id = index.get(line.tax_number) or index.get(line.reference)
+            # A reference that is itself a tax number recurs every period
+            reference_posted = line.reference not in index and line.reference in posted_references
+            if line.idempotency_key in imported:
+                reject(line, 'already imported')
+            elif holding_tax_id is None:
+                reject(line, 'no matching holding tax')
+            elif reference_posted or line.cheque_number in posted_cheques:
+                reject(line, 'already recorded')
+            else:
+                imported.add(line.idempotency_key)
+                payments.append(_payment_for(line, holding_tax_id, received_by))
+
+        if not dry_run:
+            payments = post_payment_batch(payments)
+        result.posted += len(payments)
+        result.amount += sum((payment.amount for payment in payments), Decimal('0.00'))
+
+    return result
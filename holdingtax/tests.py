@@ -1,3 +1,181 @@
-from django.test import TestCase
+import io
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+from django.db import IntegrityError, transaction
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
 
-# Create your tests here.
+from citizen.models import Citizen
+from city_corporation.testing import run_concurrently
+from .demands import generate_demands
+from .models import Area, HoldingTax, Property, PropertyType, Street, TaxPayment, TaxPeriod
+from .payments import post_payment, post_payment_batch
+from .statements import read_csv_statement, reconcile_statement
+
+
+def create_holding_taxes(count=1, tax_amount=Decimal('1000.00')):
+    owner = Citizen.objects.create(first_name='Test', last_name='Owner', national_id='1000000001')
+    area = Area.objects.create(name='Test Area', code='TA')
+    street = Street.objects.create(name='Test Street', code='TS', area=area)
+    property_type = PropertyType.objects.create(name='Residential', code='RES')
+    period = TaxPeriod.objects.create(name='2026', start_date=date(2026, 1, 1), end_date=date(2026, 12, 31))
+    holding_taxes = []
+    for n in range(count):
+        holding_property = Property.objects.create(
+            property_number=f'P{n}', property_type=property_type, owner=owner, address=f'{n} Test Road',
+            area=area, street=street, area_sqft=Decimal('1000.00'), assessed_value=Decimal('100000.00'),
+            tax_rate=Decimal('1.00'),
+        )
+        holding_taxes.append(HoldingTax.objects.create(
+            holding_property=holding_property, tax_period=period, tax_amount=tax_amount, due_date=period.end_date,
+        ))
+    return holding_taxes
+
+
+def new_payment(amount, **kwargs):
+    return TaxPayment(payment_date=date(2026, 5, 1), amount=Decimal(amount), payment_method='CASH', **kwargs)
+
+
+class PostPaymentTests(TestCase):
+    def setUp(self):
+        self.holding_tax, = create_holding_taxes()
+
+    def test_payments_accumulate_and_update_status(self):
+        first, created = post_payment(self.holding_tax, new_payment('400.00'))
+        self.assertTrue(created)
+        self.assertEqual(first.balance_after, Decimal('600.00'))
+        self.assertEqual(self.holding_tax.status, 'PARTIAL')
+
+        second, _created = post_payment(self.holding_tax.pk, new_payment('600.00'))
+        self.assertEqual(second.balance_after, Decimal('0.00'))
+        self.holding_tax.refresh_from_db()
+        self.assertEqual(self.holding_tax.paid_amount, Decimal('1000.00'))
+        self.assertEqual(self.holding_tax.status, 'PAID')
+
+    def test_idempotency_key_posts_once(self):
+        first, created = post_payment(self.holding_tax, new_payment('250.00'), idempotency_key='k1')
+        again, created_again = post_payment(self.holding_tax, new_payment('250.00'), idempotency_key='k1')
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(again.pk, first.pk)
+        self.holding_tax.refresh_from_db()
+        self.assertEqual(self.holding_tax.paid_amount, Decimal('250.00'))
+        self.assertEqual(TaxPayment.objects.count(), 1)
+
+
+class DemandGenerationTests(TestCase):
+    def setUp(self):
+        self.billed = create_holding_taxes(2)
+        self.period = self.billed[0].tax_period
+        first = self.billed[0].holding_property
+        Property.objects.create(
+            property_number='P-new', property_type=first.property_type, owner=first.owner, address='New Road',
+            area=first.area, street=first.street, area_sqft=Decimal('500.00'), assessed_value=Decimal('50000.00'),
+            tax_rate=Decimal('2.00'),
+        )
+        Property.objects.update(status='APPROVED')
+
+    def test_only_unbilled_properties_get_a_demand(self):
+        self.assertEqual(generate_demands(self.period), {'areas': 1, 'created': 1, 'skipped': 2})
+        demand = HoldingTax.objects.get(holding_property__property_number='P-new')
+        self.assertEqual(demand.tax_amount, Decimal('1000.00'))
+        self.assertRegex(demand.tax_number, r'^HT-\d{4}-\d{6}$')
+        self.assertEqual(generate_demands(self.period)['created'], 0)
+
+    def test_a_new_period_numbers_every_demand_from_the_series(self):
+        period = TaxPeriod.objects.create(name='2027', start_date=date(2027, 1, 1), end_date=date(2027, 12, 31))
+        self.assertEqual(generate_demands(period, batch_size=2)['created'], 3)
+        numbers = [holding_tax.tax_number for holding_tax in self.billed] + list(
+            HoldingTax.objects.filter(tax_period=period).values_list('tax_number', flat=True)
+        )
+        self.assertEqual(len(set(numbers)), 5)
+        self.assertEqual(len({number.rsplit('-', 1)[0] for number in numbers}), 1)
+
+    def test_a_property_has_one_demand_per_period(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            HoldingTax.objects.create(
+                holding_property=self.billed[0].holding_property, tax_period=self.period,
+                tax_amount=Decimal('1.00'), due_date=self.period.end_date,
+            )
+
+
+# The one-by-one fallback only runs when a concurrent import posted the same keys
+no_fallback = mock.patch('holdingtax.payments.post_payment', side_effect=AssertionError('fell back to post_payment'))
+
+
+@no_fallback
+class PostPaymentBatchTests(TestCase):
+    def test_batch_numbers_payments_and_sums_per_holding_tax(self, _post_payment):
+        first, second = create_holding_taxes(2)
+
+        posted = post_payment_batch([
+            new_payment('300.00', holding_tax_id=first.pk, idempotency_key='a'),
+            new_payment('300.00', holding_tax_id=first.pk, idempotency_key='a'),
+            new_payment('700.00', holding_tax_id=first.pk, idempotency_key='b'),
+            new_payment('1000.00', holding_tax_id=second.pk, payment_number='BNK-1'),
+        ])
+
+        self.assertEqual([payment.amount for payment in posted], [
+            Decimal('300.00'), Decimal('700.00'), Decimal('1000.00'),
+        ])
+        self.assertEqual([payment.balance_after for payment in posted], [
+            Decimal('700.00'), Decimal('0.00'), Decimal('0.00'),
+        ])
+        numbers = list(TaxPayment.objects.order_by('pk').values_list('payment_number', flat=True))
+        self.assertEqual(len(set(numbers)), 3)
+        self.assertRegex(numbers[0], r'^PAY-\d{4}-\d{6}$')
+        self.assertEqual(numbers[2], 'BNK-1')
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.paid_amount, first.status), (Decimal('1000.00'), 'PAID'))
+        self.assertEqual((second.paid_amount, second.status), (Decimal('1000.00'), 'PAID'))
+
+    def test_posted_keys_are_skipped(self, _post_payment):
+        holding_tax, = create_holding_taxes()
+        self.assertEqual(len(post_payment_batch([new_payment('100.00', holding_tax_id=holding_tax.pk, idempotency_key='k')])), 1)
+        self.assertEqual(post_payment_batch([new_payment('100.00', holding_tax_id=holding_tax.pk, idempotency_key='k')]), [])
+        holding_tax.refresh_from_db()
+        self.assertEqual(holding_tax.paid_amount, Decimal('100.00'))
+
+
+@no_fallback
+class StatementReconciliationTests(TestCase):
+    def statement(self, tax_number):
+        return io.StringIO(
+            'date,amount,tax_number,reference,cheque_number,bank_name,narration\n'
+            f'2026-05-01,100.00,{tax_number},,,,counter deposit\n'
+            f'2026-05-01,100.00,{tax_number},,,,counter deposit\n'
+            '2026-05-02,50.00,UNKNOWN,,,,unknown holding\n'
+            'yesterday,50.00,UNKNOWN,,,,bad date\n'
+        )
+
+    def test_identical_lines_post_separately_and_reimport_is_a_no_op(self, _post_payment):
+        holding_tax, = create_holding_taxes()
+
+        result = reconcile_statement(read_csv_statement(self.statement(holding_tax.tax_number)))
+        self.assertEqual((result.lines, result.posted, result.amount), (4, 2, Decimal('200.00')))
+        self.assertEqual(result.exceptions, {'no matching holding tax': 1, 'invalid date': 1})
+
+        again = reconcile_statement(read_csv_statement(self.statement(holding_tax.tax_number)))
+        self.assertEqual(again.posted, 0)
+        self.assertEqual(again.exceptions, {'already imported': 2, 'no matching holding tax': 1, 'invalid date': 1})
+        holding_tax.refresh_from_db()
+        self.assertEqual(holding_tax.paid_amount, Decimal('200.00'))
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentPaymentTests(TransactionTestCase):
+    def test_concurrent_postings_lose_no_update(self):
+        holding_tax, = create_holding_taxes(tax_amount=Decimal('10000.00'))
+
+        errors = run_concurrently(
+            lambda: post_payment(holding_tax.pk, new_payment('100.00')), [()] * 8
+        )
+
+        self.assertEqual(errors, [])
+        holding_tax.refresh_from_db()
+        self.assertEqual(holding_tax.paid_amount, Decimal('800.00'))
+        self.assertEqual(
+            sorted(TaxPayment.objects.values_list('balance_after', flat=True)),
+            [Decimal(9200 + 100 * n) for n in range(8)],
+        )
@@ -7,6 +7,7 @@ urlpatterns = [
     # Holding Tax URLs
     path('', views.holding_tax_list, name='list'),
     path('create/', views.holding_tax_create, name='create'),
+    path('export/', views.holding_tax_export, name='export'),
     path('<int:pk>/', views.holding_tax_detail, name='detail'),
     path('<int:pk>/update/', views.holding_tax_update, name='update'),
     path('<int:pk>/delete/', views.holding_tax_delete, name='delete'),
@@ -15,6 +16,9 @@ urlpatterns = [
     # Property URLs
     path('properties/', views.property_list, name='property_list'),
     path('properties/create/', views.property_create, name='property_create'),
+    path('properties/export/', views.property_export, name='property_export'),
+    path('properties/autocomplete/', views.property_autocomplete, name='property_autocomplete'),
+    path('streets/autocomplete/', views.street_autocomplete, name='street_autocomplete'),
     path('properties/<int:pk>/', views.property_detail, name='property_detail'),
     path('properties/<int:pk>/update/', views.property_update, name='property_update'),
 ]
@@ -1,7 +1,11 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
+from django.db import IntegrityError
+from city_corporation.autocomplete import autocomplete_response
+from city_corporation.list_export import export_response
+from city_corporation.list_summary import count_where, list_summary
+from city_corporation.pagination import KeysetPaginator
 from django.db.models import Q, Sum
 from django.utils import timezone
 from decimal import Decimal
@@ -13,11 +17,41 @@ from .forms import (
     AreaForm, StreetForm, PropertyTypeForm, PropertyForm,
     TaxPeriodForm, HoldingTaxForm, TaxPaymentForm, PropertyAttachmentForm
 )
+from .payments import find_posted_payment, post_payment
 
 
-@login_required
-def holding_tax_list(request):
-    """List all holding taxes with search and pagination."""
+HOLDING_TAX_EXPORT_COLUMNS = [
+    ('Tax Number', 'tax_number'),
+    ('Property Number', 'holding_property__property_number'),
+    ('Owner First Name', 'holding_property__owner__first_name'),
+    ('Owner Last Name', 'holding_property__owner__last_name'),
+    ('Owner NID', 'holding_property__owner__national_id'),
+    ('Tax Period', 'tax_period__name'),
+    ('Tax Amount', 'tax_amount'),
+    ('Penalty', 'penalty_amount'),
+    ('Paid Amount', 'paid_amount'),
+    ('Due Date', 'due_date'),
+    ('Status', 'status'),
+]
+
+PROPERTY_EXPORT_COLUMNS = [
+    ('Property Number', 'property_number'),
+    ('Property Type', 'property_type__name'),
+    ('Owner First Name', 'owner__first_name'),
+    ('Owner Last Name', 'owner__last_name'),
+    ('Owner NID', 'owner__national_id'),
+    ('Address', 'address'),
+    ('Area', 'area__name'),
+    ('Street', 'street__name'),
+    ('Area (sqft)', 'area_sqft'),
+    ('Assessed Value', 'assessed_value'),
+    ('Tax Rate', 'tax_rate'),
+    ('Status', 'status'),
+]
+
+
+def _filtered_holding_taxes(request):
+    """Holding taxes matching the list's search and status filters."""
     holding_taxes = HoldingTax.objects.select_related('holding_property', 'tax_period', 'holding_property__owner').all()
     
     # Search functionality
@@ -35,31 +69,46 @@ def holding_tax_list(request):
     
     if status_filter:
         holding_taxes = holding_taxes.filter(status=status_filter)
-    
-    # Pagination
-    paginator = Paginator(holding_taxes, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    return holding_taxes, search_query, status_filter
+
+
+@login_required
+def holding_tax_list(request):
+    """List all holding taxes with search and pagination."""
+    holding_taxes, search_query, status_filter = _filtered_holding_taxes(request)
     
     # Statistics
-    total_tax = holding_taxes.aggregate(Sum('tax_amount'))['tax_amount__sum'] or Decimal('0.00')
-    total_paid = holding_taxes.aggregate(Sum('paid_amount'))['paid_amount__sum'] or Decimal('0.00')
-    total_pending = holding_taxes.filter(status='PENDING').count()
-    total_overdue = holding_taxes.filter(status='OVERDUE').count()
+    summary = list_summary(
+        holding_taxes, ('holdingtax', 'citizen'), 'holding_taxes',
+        {'search': search_query, 'status': status_filter},
+        total_tax=Sum('tax_amount'), total_paid=Sum('paid_amount'),
+        total_pending=count_where(status='PENDING'), total_overdue=count_where(status='OVERDUE'),
+    )
+    
+    # Pagination
+    paginator = KeysetPaginator(holding_taxes, 20, total=summary['total'])
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'holding_taxes': page_obj,
         'search_query': search_query,
         'status_filter': status_filter,
-        'total_count': holding_taxes.count(),
-        'total_tax': total_tax,
-        'total_paid': total_paid,
-        'total_pending': total_pending,
-        'total_overdue': total_overdue,
+        'total_count': paginator.display_count,
+        'total_tax': summary['total_tax'] or Decimal('0.00'),
+        'total_paid': summary['total_paid'] or Decimal('0.00'),
+        'total_pending': summary['total_pending'],
+        'total_overdue': summary['total_overdue'],
     }
     return render(request, 'holdingtax/list.html', context)
 
 
+@login_required
+def holding_tax_export(request):
+    """Download the filtered holding taxes as CSV or XLSX."""
+    holding_taxes = _filtered_holding_taxes(request)[0]
+    return export_response(holding_taxes, HOLDING_TAX_EXPORT_COLUMNS, 'holding_taxes', request.GET.get('format'))
+
+
 @login_required
 def holding_tax_detail(request, pk):
     """View holding tax details."""
@@ -136,9 +185,8 @@ def holding_tax_delete(request, pk):
     return render(request, 'holdingtax/delete.html', context)
 
 
-@login_required
-def property_list(request):
-    """List all properties."""
+def _filtered_properties(request):
+    """Active properties matching the list's search and status filters."""
     properties = Property.objects.select_related('owner', 'property_type', 'area', 'street').filter(is_active=True)
     
     search_query = request.GET.get('search', '')
@@ -155,26 +203,66 @@ def property_list(request):
     
     if status_filter:
         properties = properties.filter(status=status_filter)
+    return properties, search_query, status_filter
+
+
+@login_required
+def property_list(request):
+    """List all properties."""
+    properties, search_query, status_filter = _filtered_properties(request)
     
-    paginator = Paginator(properties, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(properties, 20)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'properties': page_obj,
         'search_query': search_query,
         'status_filter': status_filter,
-        'total_count': properties.count(),
+        'total_count': paginator.display_count,
     }
     return render(request, 'holdingtax/property_list.html', context)
 
 
+@login_required
+def property_export(request):
+    """Download the filtered properties as CSV or XLSX."""
+    properties = _filtered_properties(request)[0]
+    return export_response(properties, PROPERTY_EXPORT_COLUMNS, 'properties', request.GET.get('format'))
+
+
+@login_required
+def property_autocomplete(request):
+    """JSON search endpoint for property pickers (by property number or owner NID)."""
+    properties = Property.objects.filter(is_active=True).select_related('owner').only(
+        'property_number', 'owner__first_name', 'owner__middle_name', 'owner__last_name'
+    )
+    query = request.GET.get('q', '').strip()
+    if query:
+        properties = properties.filter(
+            Q(property_number__istartswith=query) | Q(owner__national_id=query)
+        )
+    return autocomplete_response(properties.order_by('property_number'), str)
+
+
+@login_required
+def street_autocomplete(request):
+    """JSON search endpoint for street pickers, optionally limited to one area."""
+    streets = Street.objects.filter(is_active=True).select_related('area').only('name', 'area__name')
+    area = request.GET.get('area', '')
+    if area.isdigit():
+        streets = streets.filter(area_id=area)
+    query = request.GET.get('q', '').strip()
+    if query:
+        streets = streets.filter(Q(name__icontains=query) | Q(code__iexact=query))
+    return autocomplete_response(streets, str)
+
+
 @login_required
 def property_detail(request, pk):
     """View property details."""
     property_obj = get_object_or_404(Property.objects.select_related('owner', 'property_type', 'area', 'street'), pk=pk)
     holding_taxes = property_obj.holding_taxes.all().order_by('-due_date')
-    attachments = property_obj.attachments.filter(is_active=True)
+    attachments = property_obj.attachments.filter(is_active=True).select_related('attachment_type')
     
     context = {
         'property': property_obj,
@@ -233,28 +321,27 @@ def tax_payment_add(request, holding_tax_pk):
     holding_tax = get_object_or_404(HoldingTax, pk=holding_tax_pk)
     
     if request.method == 'POST':
+        # A re-submitted form (double click, browser retry) was already posted
+        if find_posted_payment(request.POST.get('idempotency_key')):
+            messages.info(request, 'This payment has already been recorded.')
+            return redirect('holdingtax:detail', pk=holding_tax.pk)
+
         form = TaxPaymentForm(request.POST)
         if form.is_valid():
             payment = form.save(commit=False)
-            payment.holding_tax = holding_tax
             payment.received_by = request.user
-            payment.save()
-            
-            # Update holding tax paid amount
-            total_paid = holding_tax.payments.aggregate(Sum('amount'))['amount__sum'] or Decimal('0.00')
-            holding_tax.paid_amount = total_paid
-            
-            # Update status
-            if total_paid >= holding_tax.tax_amount + holding_tax.penalty_amount:
-                holding_tax.status = 'PAID'
-            elif total_paid > Decimal('0.00'):
-                holding_tax.status = 'PARTIAL'
-            holding_tax.save()
-            
-            messages.success(request, 'Payment recorded successfully!')
-            return redirect('holdingtax:detail', pk=holding_tax.pk)
+            try:
+                payment, created = post_payment(holding_tax, payment)
+            except IntegrityError:
+                form.add_error('payment_number', 'A payment with this number already exists.')
+            else:
+                if created:
+                    messages.success(request, 'Payment recorded successfully!')
+                else:
+                    messages.info(request, 'This payment has already been recorded.')
+                return redirect('holdingtax:detail', pk=holding_tax.pk)
     else:
-        form = TaxPaymentForm(initial={'holding_tax': holding_tax})
+        form = TaxPaymentForm()
     
     context = {
         'form': form,
@@ -5,11 +5,12 @@ Field officers can add citizens, create properties, and create holding taxes.
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
+from city_corporation.pagination import KeysetPaginator
 from django.db.models import Q
 from citizen.decorators import field_officer_required
 from citizen.models import Citizen
 from citizen.forms import CitizenForm
+from citizen.search import search_citizens
 from .models import Area, Street, PropertyType, Property, TaxPeriod, HoldingTax
 from .forms import PropertyForm, HoldingTaxForm
 
@@ -48,16 +49,10 @@ def field_officer_citizen_list(request):
     
     search_query = request.GET.get('search', '')
     if search_query:
-        citizens = citizens.filter(
-            Q(first_name__icontains=search_query) |
-            Q(last_name__icontains=search_query) |
-            Q(national_id__icontains=search_query) |
-            Q(phone_number__icontains=search_query)
-        )
+        citizens = search_citizens(citizens, search_query)
     
-    paginator = Paginator(citizens, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(citizens, 20)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'page_obj': page_obj,
@@ -103,9 +98,8 @@ def field_officer_property_list(request):
             Q(owner__last_name__icontains=search_query)
         )
     
-    paginator = Paginator(properties, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(properties, 20)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'page_obj': page_obj,
@@ -155,9 +149,8 @@ def field_officer_holdingtax_list(request):
     if status_filter:
         holding_taxes = holding_taxes.filter(status=status_filter)
     
-    paginator = Paginator(holding_taxes, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = KeysetPaginator(holding_taxes, 20)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'page_obj': page_obj,
@@ -0,0 +1,12 @@
+from django.contrib import admin
+from .models import NumberSequence
+
+
+@admin.register(NumberSequence)
+class NumberSequenceAdmin(admin.ModelAdmin):
+    list_display = ('prefix', 'year', 'last_value', 'updated_at')
+    list_filter = ('prefix', 'year')
+    readonly_fields = ('prefix', 'year', 'last_value', 'updated_at')
+
+    def has_add_permission(self, request):
+        return False
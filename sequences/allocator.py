@@ -0,0 +1,152 @@
+"""
+Reference-number allocator.
+
+Numbers look like ``COMP-2026-000123``: one sequence per prefix, restarting
+every year. Each process reserves blocks of NUMBER_SEQUENCE_BLOCK_SIZE
+values with a single ``UPDATE ... SET last_value = last_value + size`` and
+hands them out from memory, so the sequence row is written once per block
+instead of once per number and gunicorn workers do not queue on it.
+
+Numbers are unique but not gapless: the unused rest of a block is lost when
+a worker restarts, and numbers from different workers interleave.
+
+Callers usually allocate inside their own transaction (``post_payment``,
+admin saves). On backends with row locks (PostgreSQL) the block is then
+reserved on the allocator's own connection and committed at once, so the
+sequence row is never held until the caller commits and a rollback cannot
+undo a reservation whose numbers were handed out. SQLite locks the whole
+database for a writer, so a second connection would wait on the caller's
+own lock: there a reservation inside a transaction stays in it, takes only
+the value needed, and nothing is cached.
+"""
+import os
+import threading
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import NumberSequence
+
+
+COMPLAINT = 'COMP'
+CERTIFICATE = 'CERT'
+HOLDING_TAX = 'HT'
+PAYMENT = 'PAY'
+TRADE_LICENSE = 'TL'
+
+_lock = threading.Lock()
+_blocks = {}
+# Per-thread connection reserving blocks outside the callers' transactions
+_local = threading.local()
+
+
+def _reset_after_fork():
+    # Blocks and connections from before a fork (e.g. gunicorn --preload) must not be shared
+    global _lock, _local
+    _lock = threading.Lock()
+    _local = threading.local()
+    _blocks.clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def block_size():
+    return max(1, getattr(settings, 'NUMBER_SEQUENCE_BLOCK_SIZE', 50))
+
+
+def _in_shared_transaction():
+    """Whether a reservation made now would only commit with the caller's transaction."""
+    return connection.in_atomic_block and not connection.features.has_select_for_update
+
+
+def _sequence_connection():
+    """This thread's own connection to the default database (autocommit)."""
+    sequence_connection = getattr(_local, 'connection', None)
+    if sequence_connection is None:
+        sequence_connection = _local.connection = connections.create_connection(DEFAULT_DB_ALIAS)
+    sequence_connection.close_if_unusable_or_obsolete()
+    return sequence_connection
+
+
+def _reserve_on_own_connection(prefix, year, size):
+    own = _sequence_connection()
+    table = own.ops.quote_name(NumberSequence._meta.db_table)
+    now = own.ops.adapt_datetimefield_value(timezone.now())
+    for _attempt in range(2):
+        own.set_autocommit(False)
+        try:
+            with own.cursor() as cursor:
+                cursor.execute(
+                    f'UPDATE {table} SET last_value = last_value + %s, updated_at = %s WHERE prefix = %s AND year = %s',
+                    [size, now, prefix, year],
+                )
+                if cursor.rowcount:
+                    cursor.execute(f'SELECT last_value FROM {table} WHERE prefix = %s AND year = %s', [prefix, year])
+                    last = cursor.fetchone()[0]
+                else:
+                    cursor.execute(
+                        f'INSERT INTO {table} (prefix, year, last_value, updated_at) VALUES (%s, %s, %s, %s)',
+                        [prefix, year, size, now],
+                    )
+                    last = size
+            own.commit()
+            return last - size + 1, last
+        except IntegrityError:
+            own.rollback()
+            continue  # another worker created the row first
+        except BaseException:
+            own.rollback()
+            raise
+        finally:
+            own.set_autocommit(True)
+    raise RuntimeError(f'Could not reserve numbers for {prefix}-{year}')
+
+
+def reserve_block(prefix, year, size):
+    """Reserve ``size`` consecutive values; returns ``(first, last)``."""
+    if connection.in_atomic_block and connection.features.has_select_for_update:
+        return _reserve_on_own_connection(prefix, year, size)
+    for _attempt in range(2):
+        try:
+            with transaction.atomic():
+                # Write first: the row lock is taken before anything is read
+                updated = NumberSequence.objects.filter(prefix=prefix, year=year).update(
+                    last_value=F('last_value') + size, updated_at=timezone.now()
+                )
+                if not updated:
+                    NumberSequence.objects.create(prefix=prefix, year=year, last_value=size)
+                    return 1, size
+                last = NumberSequence.objects.filter(prefix=prefix, year=year).values_list(
+                    'last_value', flat=True
+                ).get()
+                return last - size + 1, last
+        except IntegrityError:
+            continue  # another worker created the row first
+    raise RuntimeError(f'Could not reserve numbers for {prefix}-{year}')
+
+
+def allocate(prefix, year=None):
+    """Next value of the ``prefix`` sequence for ``year`` (default: this year)."""
+    year = year or timezone.localdate().year
+    if _in_shared_transaction():
+        return reserve_block(prefix, year, 1)[0]
+    key = (prefix, year)
+    with _lock:
+        block = _blocks.get(key)
+        if block is None or block[0] > block[1]:
+            block = _blocks[key] = list(reserve_block(prefix, year, block_size()))
+        value = block[0]
+        block[0] += 1
+    return value
+
+
+def format_number(prefix, year, value, width=6):
+    return f'{prefix}-{year}-{value:0{width}d}'
+
+
+def next_number(prefix, year=None, width=6):
+    """Formatted reference number, e.g. ``next_number('COMP')`` -> ``COMP-2026-000123``."""
+    year = year or timezone.localdate().year
+    return format_number(prefix, year, allocate(prefix, year), width)
@@ -0,0 +1,68 @@
+"""
+Management command to benchmark the reference-number allocator.
+
+Starts --workers processes (standing in for gunicorn workers) that each
+allocate --count numbers from a scratch prefix, then checks that every
+number is unique and reports allocations per second for each block size:
+
+    python manage.py benchmark_number_allocation --workers 4 --count 5000 --block-sizes 1 50
+"""
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from sequences.models import NumberSequence
+
+
+def _allocate(prefix, count, size):
+    from django.db import connection
+    from sequences.allocator import allocate
+
+    with override_settings(NUMBER_SEQUENCE_BLOCK_SIZE=size):
+        try:
+            return [allocate(prefix) for _ in range(count)]
+        finally:
+            connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks reference-number allocation across worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--count', type=int, default=5000, help='Numbers allocated per worker')
+        parser.add_argument('--block-sizes', type=int, nargs='+', default=[1, 50])
+        parser.add_argument('--prefix', default='BENCH')
+
+    def handle(self, *args, **options):
+        workers, count, prefix = options['workers'], options['count'], options['prefix']
+        if workers < 1 or count < 1 or min(options['block_sizes']) < 1:
+            raise CommandError('--workers, --count and --block-sizes must be positive')
+        if NumberSequence.objects.filter(prefix=prefix).exists():
+            raise CommandError(f'Prefix {prefix} is already in use; pass another --prefix')
+
+        context = multiprocessing.get_context('spawn')
+        try:
+            for size in options['block_sizes']:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=django.setup) as pool:
+                    # Start the workers before timing
+                    list(pool.map(time.sleep, [0.1] * workers))
+                    started = time.perf_counter()
+                    results = list(pool.map(_allocate, [prefix] * workers, [count] * workers, [size] * workers))
+                    elapsed = time.perf_counter() - started
+
+                values = [value for result in results for value in result]
+                duplicates = len(values) - len(set(values))
+                self.stdout.write(
+                    f'block size {size:5d}: {len(values)} numbers in {elapsed:.2f}s '
+                    f'({len(values) / elapsed:,.0f}/s), {duplicates} duplicates'
+                )
+                if duplicates:
+                    raise CommandError('Duplicate numbers were allocated')
+                NumberSequence.objects.filter(prefix=prefix).delete()
+        finally:
+            NumberSequence.objects.filter(prefix=prefix).delete()
+        self.stdout.write(self.style.SUCCESS('All allocated numbers were unique'))
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=20, verbose_name='Prefix')),
+                ('year', models.IntegerField(verbose_name='Year')),
+                ('last_value', models.BigIntegerField(default=0, verbose_name='Last Value')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+            ],
+            options={
+                'verbose_name': 'Number Sequence',
+                'verbose_name_plural': 'Number Sequences',
+                'ordering': ['prefix', '-year'],
+                'constraints': [models.UniqueConstraint(fields=('prefix', 'year'), name='sequences_prefix_year_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class NumberSequence(models.Model):
+    """Last reference number handed out for a prefix in a year."""
+
+    prefix = models.CharField(_("Prefix"), max_length=20)
+    year = models.IntegerField(_("Year"))
+    last_value = models.BigIntegerField(_("Last Value"), default=0)
+    updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Number Sequence")
+        verbose_name_plural = _("Number Sequences")
+        ordering = ["prefix", "-year"]
+        constraints = [
+            models.UniqueConstraint(fields=["prefix", "year"], name="sequences_prefix_year_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.prefix}-{self.year}: {self.last_value}"
@@ -0,0 +1,77 @@
+from django.db import transaction
+from django.test import (
+    TestCase, TransactionTestCase, override_settings, skipIfDBFeature, skipUnlessDBFeature,
+)
+
+from city_corporation.testing import run_concurrently
+from . import allocator
+from .allocator import allocate, next_number
+from .models import NumberSequence
+
+
+class Rollback(Exception):
+    pass
+
+
+class AllocatorTests(TestCase):
+    def setUp(self):
+        allocator._blocks.clear()
+
+    def test_numbers_are_consecutive_per_prefix_and_year(self):
+        first = next_number('COMP', year=1901)
+        second = next_number('COMP', year=1901)
+        self.assertRegex(first, r'^COMP-1901-\d{6}$')
+        self.assertEqual(int(second.rsplit('-', 1)[1]), int(first.rsplit('-', 1)[1]) + 1)
+        self.assertEqual(next_number('COMP', year=1902), 'COMP-1902-000001')
+
+    @skipIfDBFeature('has_select_for_update')
+    def test_reserves_one_value_inside_a_transaction_without_row_locks(self):
+        # Tests run inside a transaction; SQLite keeps the reservation in it
+        allocate('HT', 1901)
+        self.assertEqual(NumberSequence.objects.get(prefix='HT', year=1901).last_value, 1)
+        self.assertEqual(allocator._blocks, {})
+
+
+@override_settings(NUMBER_SEQUENCE_BLOCK_SIZE=10)
+class AllocatorBlockTests(TransactionTestCase):
+    def setUp(self):
+        allocator._blocks.clear()
+
+    def tearDown(self):
+        allocator._blocks.clear()
+
+    def test_reserves_a_block_and_hands_it_out_from_memory(self):
+        values = [allocate('PAY', 2026) for _ in range(15)]
+        self.assertEqual(values, list(range(1, 16)))
+        self.assertEqual(NumberSequence.objects.get(prefix='PAY', year=2026).last_value, 20)
+
+    def test_other_workers_continue_after_the_reserved_block(self):
+        allocate('PAY', 2026)
+        # Another process reserving next gets the following block
+        allocator._blocks.clear()
+        self.assertEqual(allocate('PAY', 2026), 11)
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_reservation_inside_a_transaction_commits_on_its_own(self):
+        try:
+            with transaction.atomic():
+                first = allocate('PAY', 2026)
+                raise Rollback
+        except Rollback:
+            pass
+        self.assertEqual(NumberSequence.objects.get(prefix='PAY', year=2026).last_value, 10)
+        self.assertEqual(allocate('PAY', 2026), first + 1)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentAllocatorTests(TransactionTestCase):
+    def test_concurrent_reservations_never_overlap(self):
+        blocks = []
+
+        def reserve():
+            for _ in range(20):
+                blocks.append(allocator.reserve_block('COMP', 2026, 5))
+
+        self.assertEqual(run_concurrently(reserve, [()] * 6), [])
+        numbers = [number for first, last in blocks for number in range(first, last + 1)]
+        self.assertEqual(sorted(numbers), list(range(1, 6 * 20 * 5 + 1)))
@@ -0,0 +1,113 @@
+/*
+ * Remote autocomplete for <select data-autocomplete-url="..."> elements
+ * rendered by city_corporation.autocomplete.AutocompleteSelect.
+ *
+ * A search box is inserted above each select; typing fetches matching
+ * options from the endpoint and replaces the select's options. Values of
+ * other fields listed in data-autocomplete-forward ("param:field,...") are
+ * sent along, and changing one of them clears the dependent select.
+ */
+(function () {
+    'use strict';
+
+    var DELAY = 250;
+
+    function forwardedParams(select) {
+        var params = {};
+        var spec = select.getAttribute('data-autocomplete-forward');
+        if (!spec) {
+            return params;
+        }
+        spec.split(',').forEach(function (pair) {
+            var parts = pair.split(':');
+            var field = select.form && select.form.elements[parts[1]];
+            if (field && field.value) {
+                params[parts[0]] = field.value;
+            }
+        });
+        return params;
+    }
+
+    function setOptions(select, results, more) {
+        var selected = select.value;
+        var keep = [];
+        Array.prototype.forEach.call(select.options, function (option) {
+            if (option.value === '' || (option.selected && option.value === selected)) {
+                keep.push(option);
+            }
+        });
+        select.innerHTML = '';
+        keep.forEach(function (option) { select.appendChild(option); });
+        results.forEach(function (item) {
+            if (String(item.id) === selected) {
+                return;
+            }
+            var option = document.createElement('option');
+            option.value = item.id;
+            option.textContent = item.text;
+            select.appendChild(option);
+        });
+        if (more) {
+            var hint = document.createElement('option');
+            hint.disabled = true;
+            hint.textContent = '… keep typing to narrow the results';
+            select.appendChild(hint);
+        }
+    }
+
+    function search(select, term) {
+        var url = new URL(select.getAttribute('data-autocomplete-url'), window.location.href);
+        url.searchParams.set('q', term);
+        var params = forwardedParams(select);
+        Object.keys(params).forEach(function (key) { url.searchParams.set(key, params[key]); });
+
+        var request = (select._autocompleteRequest || 0) + 1;
+        select._autocompleteRequest = request;
+        fetch(url, {credentials: 'same-origin', headers: {'Accept': 'application/json'}})
+            .then(function (response) { return response.json(); })
+            .then(function (data) {
+                if (select._autocompleteRequest === request) {
+                    setOptions(select, data.results || [], data.more);
+                }
+            });
+    }
+
+    function init(select) {
+        var minLength = parseInt(select.getAttribute('data-autocomplete-min-length') || '2', 10);
+        var input = document.createElement('input');
+        input.type = 'search';
+        input.className = 'form-control autocomplete-search';
+        input.placeholder = 'Type to search…';
+        input.autocomplete = 'off';
+        input.style.marginBottom = '6px';
+        select.parentNode.insertBefore(input, select);
+
+        var timer = null;
+        input.addEventListener('input', function () {
+            clearTimeout(timer);
+            var term = input.value.trim();
+            if (term.length < minLength) {
+                return;
+            }
+            timer = setTimeout(function () { search(select, term); }, DELAY);
+        });
+
+        var spec = select.getAttribute('data-autocomplete-forward');
+        if (spec && select.form) {
+            spec.split(',').forEach(function (pair) {
+                var field = select.form.elements[pair.split(':')[1]];
+                if (field) {
+                    field.addEventListener('change', function () {
+                        select.value = '';
+                        setOptions(select, [], false);
+                        input.value = '';
+                    });
+                }
+            });
+        }
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        document.querySelectorAll('select[data-autocomplete-url]').forEach(init);
+    });
+})();
@@ -1,4 +1,5 @@
 from django import forms
+from city_corporation.autocomplete import AutocompleteSelect
 from .models import TradeLicense
 
 
@@ -12,8 +13,8 @@ class TradeLicenseForm(forms.ModelForm):
             'business_address', 'issue_date', 'expiry_date', 'status', 'license_fee'
         ]
         widgets = {
-            'license_number': forms.TextInput(attrs={'class': 'form-control', 'required': True}),
-            'citizen': forms.Select(attrs={'class': 'form-control', 'required': True}),
+            'license_number': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Leave blank to assign automatically'}),
+            'citizen': AutocompleteSelect('citizen:autocomplete', attrs={'class': 'form-control', 'required': True}),
             'business_name': forms.TextInput(attrs={'class': 'form-control', 'required': True}),
             'business_type': forms.TextInput(attrs={'class': 'form-control', 'required': True}),
             'business_address': forms.Textarea(attrs={'class': 'form-control', 'rows': 3, 'required': True}),
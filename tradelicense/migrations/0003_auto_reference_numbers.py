@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tradelicense', '0002_tradelicense_tradelicens_created_25ac9f_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tradelicense',
+            name='license_number',
+            field=models.CharField(blank=True, max_length=50, unique=True),
+        ),
+    ]
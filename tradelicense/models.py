@@ -1,5 +1,6 @@
 from django.db import models
 from citizen.models import Citizen
+from sequences.allocator import TRADE_LICENSE, next_number
 
 
 class TradeLicense(models.Model):
@@ -11,7 +12,7 @@ class TradeLicense(models.Model):
     ]
 
     citizen = models.ForeignKey(Citizen, on_delete=models.CASCADE, related_name='trade_licenses')
-    license_number = models.CharField(max_length=50, unique=True)
+    license_number = models.CharField(max_length=50, unique=True, blank=True)
     business_name = models.CharField(max_length=200)
     business_type = models.CharField(max_length=100)
     business_address = models.TextField()
@@ -26,6 +27,14 @@ class TradeLicense(models.Model):
         verbose_name = "Trade License"
         verbose_name_plural = "Trade Licenses"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
 
     def __str__(self):
         return f"{self.business_name} - {self.license_number}"
+
+    def save(self, *args, **kwargs):
+        if not self.license_number:
+            self.license_number = next_number(TRADE_LICENSE)
+        super().save(*args, **kwargs)
@@ -1,7 +1,9 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.core.paginator import Paginator
+from city_corporation.list_export import export_response
+from city_corporation.list_summary import count_where, list_summary
+from city_corporation.pagination import KeysetPaginator
 from django.db.models import Q, Sum
 from django.utils import timezone
 from datetime import date
@@ -9,9 +11,23 @@ from .models import TradeLicense
 from .forms import TradeLicenseForm
 
 
-@login_required
-def trade_license_list(request):
-    """List all trade licenses with search and pagination."""
+TRADE_LICENSE_EXPORT_COLUMNS = [
+    ('License Number', 'license_number'),
+    ('Business Name', 'business_name'),
+    ('Business Type', 'business_type'),
+    ('Business Address', 'business_address'),
+    ('Owner First Name', 'citizen__first_name'),
+    ('Owner Last Name', 'citizen__last_name'),
+    ('Owner NID', 'citizen__national_id'),
+    ('Issue Date', 'issue_date'),
+    ('Expiry Date', 'expiry_date'),
+    ('License Fee', 'license_fee'),
+    ('Status', 'status'),
+]
+
+
+def _filtered_trade_licenses(request):
+    """Trade licenses matching the list's search and status filters."""
     trade_licenses = TradeLicense.objects.select_related('citizen').all()
     
     # Search functionality
@@ -30,37 +46,51 @@ def trade_license_list(request):
     
     if status_filter:
         trade_licenses = trade_licenses.filter(status=status_filter)
+    return trade_licenses, search_query, status_filter
+
+
+@login_required
+def trade_license_list(request):
+    """List all trade licenses with search and pagination."""
+    trade_licenses, search_query, status_filter = _filtered_trade_licenses(request)
     
-    # Pagination
-    paginator = Paginator(trade_licenses, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    # Statistics
-    total_licenses = trade_licenses.count()
-    total_fee = trade_licenses.aggregate(Sum('license_fee'))['license_fee__sum'] or 0
-    pending_count = trade_licenses.filter(status='pending').count()
-    approved_count = trade_licenses.filter(status='approved').count()
-    expired_count = trade_licenses.filter(status='expired').count()
-    
-    # Check for expired licenses
+    # Statistics (expired_licenses: past expiry but not yet marked expired)
     today = date.today()
-    expired_licenses = trade_licenses.filter(expiry_date__lt=today).exclude(status='expired').count()
+    summary = list_summary(
+        trade_licenses, ('tradelicense', 'citizen'), 'trade_licenses',
+        {'search': search_query, 'status': status_filter, 'today': today},
+        total_fee=Sum('license_fee'),
+        pending_count=count_where(status='pending'),
+        approved_count=count_where(status='approved'),
+        expired_count=count_where(status='expired'),
+        expired_licenses=count_where(Q(expiry_date__lt=today) & ~Q(status='expired')),
+    )
+    
+    # Pagination
+    paginator = KeysetPaginator(trade_licenses, 20, total=summary['total'])
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
         'trade_licenses': page_obj,
         'search_query': search_query,
         'status_filter': status_filter,
-        'total_count': total_licenses,
-        'total_fee': total_fee,
-        'pending_count': pending_count,
-        'approved_count': approved_count,
-        'expired_count': expired_count,
-        'expired_licenses': expired_licenses,
+        'total_count': paginator.display_count,
+        'total_fee': summary['total_fee'] or 0,
+        'pending_count': summary['pending_count'],
+        'approved_count': summary['approved_count'],
+        'expired_count': summary['expired_count'],
+        'expired_licenses': summary['expired_licenses'],
     }
     return render(request, 'tradelicense/list.html', context)
 
 
+@login_required
+def trade_license_export(request):
+    """Download the filtered trade licenses as CSV or XLSX."""
+    trade_licenses = _filtered_trade_licenses(request)[0]
+    return export_response(trade_licenses, TRADE_LICENSE_EXPORT_COLUMNS, 'trade_licenses', request.GET.get('format'))
+
+
 @login_required
 def trade_license_detail(request, pk):
     """View trade license details."""
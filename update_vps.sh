@@ -77,7 +77,22 @@ else
     echo "⚠ Gunicorn service not found or not running"
 fi
 
-# Step 9: Restart Nginx (if using)
+# Step 9: Restart background workers (rcc-worker@<command> units)
+echo "Restarting background workers..."
+WORKER_UNITS=$(systemctl list-units --all --plain --no-legend 'rcc-worker@*' | awk '{print $1}')
+if [ -n "$WORKER_UNITS" ]; then
+    for unit in $WORKER_UNITS; do
+        sudo systemctl restart "$unit" || {
+            echo "✗ Failed to restart $unit"
+            exit 1
+        }
+        echo "✓ $unit restarted"
+    done
+else
+    echo "⚠ No background workers installed (see VPS_DEPLOYMENT.md, Background Workers)"
+fi
+
+# Step 10: Restart Nginx (if using)
 echo "Reloading Nginx..."
 if systemctl is-active --quiet nginx; then
     sudo systemctl reload nginx || {
@@ -88,7 +103,7 @@ else
     echo "⚠ Nginx not running or not installed"
 fi
 
-# Step 10: Check service status
+# Step 11: Check service status
 echo ""
 echo "=========================================="
 echo "Service Status Check"
@@ -99,6 +114,13 @@ if systemctl is-active --quiet gunicorn; then
 else
     echo "✗ Gunicorn: Not running"
 fi
+for unit in $WORKER_UNITS; do
+    if systemctl is-active --quiet "$unit"; then
+        echo "✓ $unit: Running"
+    else
+        echo "✗ $unit: Not running"
+    fi
+done
 
 echo ""
 echo "=========================================="